@@ -0,0 +1,54 @@
+"""冷启动基准：在全新解释器中测量导入转换器与首次转换的耗时
+
+用法（在仓库根目录）：python -m benchmarks.cold_start [-n 次数] [--json]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_PROBE = r'''
+import time
+t0 = time.perf_counter()
+from src.mseq2latex.converter import MSEQToLatexConverter
+t1 = time.perf_counter()
+MSEQToLatexConverter().convert("{ EQ \\f(1,2) }")
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+'''
+
+
+def measure(runs):
+    """运行 runs 次探针进程，返回各阶段耗时（秒）列表"""
+    imports, first_converts = [], []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', _PROBE], check=True,
+                                capture_output=True, text=True).stdout
+        import_time, convert_time = map(float, output.split())
+        imports.append(import_time)
+        first_converts.append(convert_time)
+    return imports, first_converts
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('-n', '--runs', type=int, default=20)
+    arg_parser.add_argument('--json', action='store_true', help='输出机器可读的结果')
+    args = arg_parser.parse_args()
+
+    imports, first_converts = measure(args.runs)
+    result = {
+        'runs': args.runs,
+        'import_ms': statistics.median(imports) * 1000,
+        'first_convert_ms': statistics.median(first_converts) * 1000,
+    }
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"import:        {result['import_ms']:.2f} ms (median of {args.runs})")
+        print(f"first convert: {result['first_convert_ms']:.2f} ms (median of {args.runs})")
+
+
+if __name__ == '__main__':
+    main()
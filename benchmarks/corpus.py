@@ -0,0 +1,153 @@
+"""带种子的EQ域语料生成器
+
+覆盖 lexer.py 中的全部命令及其选项，可控制嵌套深度、序列宽度和选项密度。
+"""
+import random
+import string
+
+IDENTIFIERS = ('x', 'y', 'a', 'b', 'n', 'i', 'k', 'v', 'A', 'B', 'Axy', 'Bxy', 'RateChange', 'theta')
+OPERATORS = ('+', '-', '*', '/', '=', '<', '>')
+TEXTS = ('中文', '速度', '加速度', 'α', 'β', 'π', '×', '≤', '.', '!', "'", '|', '°')
+# 中日韩文本：扩展区表意文字、假名、谚文、全角/半角形式与较长的连续文字
+CJK_TEXTS = ('中文', '加速度的变化率', '𠮷野家', '㐀㐁', 'ひらがな', 'カタカナ', 'ｶﾀｶﾅ', '한국어', '속도',
+             'ＡＢＣ', '（注）', '：', '々', 'ㄅㄆㄇ', '質量と速度の関係', 'α', '°')
+BRACKET_CHARS = ('(', ')', '[', ']', '{', '}', '<', '>', '|', '\\')
+OPTION_CHARS = ('S', 'Σ', 'X', '∮')
+
+
+COMMANDS = ('fraction', 'radical', 'script', 'bracket', 'displace',
+            'integral', 'list', 'overstrike', 'array', 'box')
+
+# 预设语料：realistic 接近文档中常见的公式，其余为针对深度、宽度、选项和长标识符的对抗性语料
+PROFILES = {
+    'realistic': {},
+    # 只用单参数命令，避免分支数随深度指数增长
+    'deep': {'max_depth': 32, 'max_width': 1, 'command_ratio': 0.95,
+             'commands': ('script', 'bracket', 'displace', 'box')},
+    'wide': {'max_depth': 1, 'max_width': 48},
+    'options': {'option_density': 0.95},
+    'identifiers': {'max_width': 8, 'identifier_length': 256},
+    'cjk': {'max_width': 8, 'text_ratio': 0.45, 'texts': CJK_TEXTS},
+}
+
+
+class CorpusGenerator:
+    """生成随机但语法合法的EQ域文本，相同种子得到相同语料
+
+    commands 限定只生成给定的命令（取值见 COMMANDS），command_ratio 为非叶子项中命令所占比例，
+    identifier_length 大于0时标识符改为该长度的随机字母串，texts 为文本叶子的取值。
+    """
+
+    def __init__(self, seed=0, max_depth=3, max_width=4, option_density=0.5, text_ratio=0.15,
+                 commands=None, command_ratio=0.6, identifier_length=0, texts=TEXTS):
+        self.random = random.Random(seed)
+        self.max_depth = max_depth
+        self.max_width = max_width
+        self.option_density = option_density
+        self.text_ratio = text_ratio
+        self.command_ratio = command_ratio
+        self.identifier_length = identifier_length
+        self.texts = texts
+        self._commands = [getattr(self, name) for name in commands or COMMANDS]
+
+    def field(self):
+        keyword = self.random.choice(('EQ', 'EQ', 'eq'))
+        return f"{{ {keyword} {self.expression(0)} }}"
+
+    def fields(self, count):
+        for _ in range(count):
+            yield self.field()
+
+    def expression(self, depth):
+        width = self.random.randint(1, self.max_width)
+        terms = [self.term(depth) for _ in range(width)]
+        return ' '.join(terms)
+
+    def term(self, depth):
+        if depth < self.max_depth and self.random.random() < self.command_ratio:
+            return self.random.choice(self._commands)(depth + 1)
+        return self.leaf()
+
+    def leaf(self):
+        roll = self.random.random()
+        if roll < self.text_ratio:
+            return self.random.choice(self.texts)
+        if roll < 0.5:
+            if self.identifier_length:
+                return ''.join(self.random.choices(string.ascii_letters, k=self.identifier_length))
+            return self.random.choice(IDENTIFIERS)
+        if roll < 0.75:
+            return self.random.choice(OPERATORS)
+        return str(self.random.randint(0, 100)).zfill(self.random.choice((1, 1, 1, 3)))
+
+    def options(self, choices):
+        """按选项密度生成若干选项"""
+        options = []
+        while self.random.random() < self.option_density and len(options) < 4:
+            options.append(self.random.choice(choices)())
+        return ''.join(' ' + option for option in options) + ' ' if options else ''
+
+    def arguments(self, depth, count, separators=(',',)):
+        parts = [self.expression(depth)]
+        for _ in range(count - 1):
+            parts.append(self.random.choice(separators))
+            parts.append(self.expression(depth))
+        return '(' + ''.join(parts) + ')'
+
+    def number_suffix(self):
+        return str(self.random.randint(1, 12)) if self.random.random() < 0.5 else ''
+
+    def fraction(self, depth):
+        return '\\f' + self.arguments(depth, 2, (',', ';'))
+
+    def radical(self, depth):
+        return '\\r' + self.arguments(depth, self.random.randint(1, 2))
+
+    def script(self, depth):
+        command = self.random.choice(('up', 'do', 'ai', 'di'))
+        return f'\\s\\{command}{self.number_suffix()}' + self.arguments(depth, 1)
+
+    def bracket(self, depth):
+        option = lambda: f'\\{self.random.choice(("lc", "rc", "bc"))}\\{self.random.choice(BRACKET_CHARS)}'
+        return '\\b' + self.options((option,)) + self.arguments(depth, 1)
+
+    def displace(self, depth):
+        choices = (
+            lambda: f'\\fo{self.random.randint(1, 20)}',
+            lambda: f'\\ba{self.random.randint(1, 20)}',
+            lambda: '\\li',
+        )
+        content = '()' if self.random.random() < 0.2 else self.arguments(depth, 1)
+        return '\\d' + self.options(choices) + content
+
+    def integral(self, depth):
+        choices = (
+            lambda: '\\su',
+            lambda: '\\pr',
+            lambda: '\\in',
+            lambda: f'\\fc\\{self.random.choice(OPTION_CHARS)}',
+            lambda: f'\\vc\\{self.random.choice(OPTION_CHARS)}',
+        )
+        return '\\i' + self.options(choices) + self.arguments(depth, 3)
+
+    def list(self, depth):
+        return '\\l' + self.arguments(depth, self.random.randint(1, self.max_width + 1), (',', ';'))
+
+    def _alignment(self):
+        return f'\\{self.random.choice(("al", "ac", "ar"))}'
+
+    def overstrike(self, depth):
+        return '\\o' + self.options((self._alignment,)) + self.arguments(depth, self.random.randint(1, 3))
+
+    def array(self, depth):
+        choices = (
+            self._alignment,
+            lambda: f'\\co{self.random.randint(1, 4)}',
+            lambda: f'\\vs{self.random.randint(0, 6)}',
+            lambda: f'\\hs{self.random.randint(0, 6)}',
+        )
+        return '\\a' + self.options(choices) + self.arguments(depth, self.random.randint(1, 6))
+
+    def box(self, depth):
+        choices = tuple((lambda side=side: f'\\{side}') for side in ('to', 'bo', 'le', 'ri'))
+        return '\\x' + self.options(choices) + self.arguments(depth, 1)
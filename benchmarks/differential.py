@@ -0,0 +1,52 @@
+"""差分测试：在生成的语料上比较PLY引擎与递归下降引擎，要求输出逐字节一致
+
+用法（在仓库根目录）：python -m benchmarks.differential [-n 数量] [--seed 种子]
+"""
+import argparse
+import random
+import sys
+
+from src.mseq2latex.converter import MSEQToLatexConverter
+
+from .corpus import CorpusGenerator
+
+
+def mutate(rng, eq_text):
+    """随机删除或插入一个字符，生成大多不合法的输入"""
+    position = rng.randrange(len(eq_text))
+    if rng.random() < 0.5:
+        return eq_text[:position] + eq_text[position + 1:]
+    return eq_text[:position] + rng.choice('(),;\\{}a1 中') + eq_text[position:]
+
+
+def run(count, seed, mutate_ratio):
+    reference = MSEQToLatexConverter(engine='ply')
+    candidate = MSEQToLatexConverter(engine='descent')
+    rng = random.Random(seed)
+    mismatches = 0
+    for eq_text in CorpusGenerator(seed=seed).fields(count):
+        if rng.random() < mutate_ratio:
+            eq_text = mutate(rng, eq_text)
+        # 比较完整的转换结果，包括收集到的错误
+        expected = reference.convert_result(eq_text)
+        actual = candidate.convert_result(eq_text)
+        if expected != actual:
+            mismatches += 1
+            print(f"不一致: {eq_text!r}\n  ply:     {expected!r}\n  descent: {actual!r}")
+    return mismatches
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('-n', '--count', type=int, default=5000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--mutate', type=float, default=0.2, help='变异为非法输入的比例')
+    args = arg_parser.parse_args()
+
+    mismatches = run(args.count, args.seed, args.mutate)
+    print(f"{args.count} 个样本，{mismatches} 个不一致")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
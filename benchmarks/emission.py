@@ -0,0 +1,80 @@
+"""输出方式基准：比较先拼成字符串再写出与 to_latex_into 直接写入的耗时与峰值内存
+
+三种方式：to_latex 拼成字符串后加定界符写入文件；to_latex_into 逐个片段写入文件；to_latex_into 写入列表。
+AST在计时之前构建好，只测量生成LaTeX与写出；峰值内存在单独一轮中用 tracemalloc 测量。
+
+用法（在仓库根目录）：python -m benchmarks.emission [-n 200] [--profile wide] [--json]
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+from src.mseq2latex.ast_nodes import ASTNode
+from src.mseq2latex.converter import MSEQToLatexConverter
+
+from .corpus import PROFILES, CorpusGenerator
+
+
+def _modes(out):
+    def joined(tree):
+        out.write(f"$ {tree.to_latex()} $")
+
+    def into_file(tree):
+        out.write("$ ")
+        tree.to_latex_into(out)
+        out.write(" $")
+
+    def into_list(tree):
+        tree.to_latex_into([])
+
+    return {'joined': joined, 'into_file': into_file, 'into_list': into_list}
+
+
+def measure(count, profile, seed=0):
+    converter = MSEQToLatexConverter()
+    generator = CorpusGenerator(seed=seed, **PROFILES[profile])
+    trees = [converter._parse(generator.field()) for _ in range(count)]
+    # 只由单个叶子组成的域没有可遍历的子树
+    trees = [tree for tree in trees if tree is not None and isinstance(tree.expression, ASTNode)]
+    result = {'profile': profile, 'trees': len(trees),
+              'output_chars': sum(len(tree.to_latex()) for tree in trees)}
+    with open(os.devnull, 'w', encoding='utf-8') as out:
+        for name, emit in _modes(out).items():
+            start = time.perf_counter()
+            for tree in trees:
+                emit(tree)
+            result[f'{name}_seconds'] = time.perf_counter() - start
+            tracemalloc.start()
+            try:
+                for tree in trees:
+                    emit(tree)
+                result[f'{name}_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('-n', '--count', type=int, default=200, help='每种语料的域数')
+    arg_parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                            help='语料类型，可重复指定（默认 realistic、wide、deep）')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = arg_parser.parse_args()
+
+    for profile in args.profile or ['realistic', 'wide', 'deep']:
+        result = measure(args.count, profile, args.seed)
+        if args.json:
+            print(json.dumps(result))
+            continue
+        print(f"{profile}: {result['trees']} 棵AST，输出 {result['output_chars']} 个字符")
+        for name in _modes(None):
+            print(f"  {name:<10} {result[f'{name}_seconds'] * 1e3:9.1f} ms   "
+                  f"峰值 {result[f'{name}_peak_bytes'] / 1024:8.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
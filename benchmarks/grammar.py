@@ -0,0 +1,83 @@
+"""文法报告与长序列基准：统计LALR分析表的规模与冲突数，并测量超长表达式序列的转换耗时
+
+用法（在仓库根目录）：python -m benchmarks.grammar [--terms 1000 --terms 100000] [--json]
+"""
+import argparse
+import json
+import os
+import time
+
+import ply.yacc as yacc
+
+from src.mseq2latex import parser as grammar_module
+from src.mseq2latex.converter import MSEQToLatexConverter
+
+
+def table_report(module=grammar_module):
+    """从语法规则重新生成LALR分析表，返回规模与冲突统计"""
+    info = yacc.ParserReflect(vars(module), log=yacc.NullLogger())
+    info.get_all()
+    if info.validate_all():
+        raise yacc.YaccError("文法规则无效")
+    grammar = yacc.Grammar(info.tokens)
+    for function, (file, line, name, symbols) in info.grammar:
+        grammar.add_production(name, symbols, function, file, line)
+    grammar.set_start(info.start)
+    table = yacc.LRGeneratedTable(grammar, 'LALR', yacc.NullLogger())
+
+    tabmodule = os.path.join(os.path.dirname(module.__file__), 'parsetab.py')
+    return {
+        'productions': len(grammar.Productions) - 1,
+        'states': len(table.lr_action),
+        'action_entries': sum(len(actions) for actions in table.lr_action.values()),
+        'goto_entries': sum(len(gotos) for gotos in table.lr_goto.values()),
+        'shift_reduce_conflicts': len(table.sr_conflicts),
+        'reduce_reduce_conflicts': len(table.rr_conflicts),
+        'parsetab_bytes': os.path.getsize(tabmodule) if os.path.exists(tabmodule) else None,
+    }
+
+
+def long_sequence(terms):
+    """由 terms 个项组成的 a + b + c + ... 序列"""
+    names = [chr(ord('a') + i % 26) for i in range(terms)]
+    return "{ EQ " + " + ".join(names) + " }"
+
+
+def time_sequence(converter, terms):
+    eq_text = long_sequence(terms)
+    start = time.perf_counter()
+    result = converter.convert_result(eq_text)
+    seconds = time.perf_counter() - start
+    if not result.ok:
+        raise AssertionError(f"{terms} 项的序列转换失败: {result.errors}")
+    return {
+        'terms': terms,
+        'input_bytes': len(eq_text),
+        'seconds': seconds,
+        'us_per_term': seconds * 1e6 / terms,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--terms', type=int, action='append',
+                            help='序列的项数，可重复指定（默认 1000、10000、100000）')
+    arg_parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = arg_parser.parse_args()
+
+    report = table_report()
+    converter = MSEQToLatexConverter()
+    sequences = [time_sequence(converter, terms) for terms in args.terms or [1000, 10000, 100000]]
+
+    if args.json:
+        print(json.dumps({'tables': report, 'sequences': sequences}))
+        return
+    for name, value in report.items():
+        print(f"{name:>24}: {value}")
+    for result in sequences:
+        print(f"{result['terms']:>10} 项  {result['seconds'] * 1e3:10.1f} ms  "
+              f"{result['us_per_term']:6.2f} us/项")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""增量转换基准：在大EQ域上模拟逐键编辑，比较增量会话与完整重新转换的每次耗时
+
+用法（在仓库根目录）：python -m benchmarks.incremental [--size 50000] [--edits 500] [--verify 20] [--json]
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from src.mseq2latex.converter import MSEQToLatexConverter
+
+from .corpus import CorpusGenerator
+
+
+def build_field(size, seed):
+    """拼接生成的表达式，得到约 size 个字符的EQ域"""
+    generator = CorpusGenerator(seed=seed)
+    converter = MSEQToLatexConverter()
+    parts = []
+    length = 0
+    while length < size:
+        expression = generator.expression(0)
+        # 只保留能单独转换的表达式，保证整个域合法
+        if converter.convert_result(f"{{ EQ {expression} }}").ok:
+            parts.append(expression)
+            length += len(expression) + 1
+    return f"{{ EQ {' '.join(parts)} }}"
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return {
+        'median_us': statistics.median(samples) * 1e6,
+        'p95_us': samples[int(len(samples) * 0.95)] * 1e6,
+        'max_us': samples[-1] * 1e6,
+    }
+
+
+def run(size, edits, seed, verify):
+    rng = random.Random(seed)
+    converter = MSEQToLatexConverter()
+    field = build_field(size, seed)
+    session = converter.session(field)
+
+    incremental = []
+    samples = []
+    for _ in range(edits):
+        # 在某个命令的参数内插入一个字符，再删掉它，模拟键入与退格
+        text = session.text
+        position = text.index('(', rng.randrange(len(text) - 10)) + 1
+        for start, end, replacement in ((position, position, 'x'), (position, position + 1, '')):
+            begin = time.perf_counter()
+            result = session.edit(start, end, replacement)
+            incremental.append(time.perf_counter() - begin)
+            if len(samples) < verify:
+                samples.append((session.text, result))
+
+    # 完整转换单独计时，避免其产生的大量对象影响增量编辑的计时
+    full = []
+    mismatches = 0
+    for text, result in samples:
+        begin = time.perf_counter()
+        expected = converter.convert_result(text)
+        full.append(time.perf_counter() - begin)
+        mismatches += tuple(result) != tuple(expected)
+
+    return {
+        'field_bytes': len(field.encode('utf-8')),
+        'edits': len(incremental),
+        'verified': len(samples),
+        'mismatches': mismatches,
+        'incremental': _percentiles(incremental),
+        'full': _percentiles(full),
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--size', type=int, default=50000, help='EQ域的大致字符数')
+    arg_parser.add_argument('--edits', type=int, default=500, help='模拟的键入次数（每次键入后退格）')
+    arg_parser.add_argument('--verify', type=int, default=20,
+                            help='与完整转换比对并计时的编辑数')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = arg_parser.parse_args()
+
+    result = run(args.size, args.edits, args.seed, args.verify)
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"{result['field_bytes']} 字节，{result['edits']} 次编辑，"
+          f"比对 {result['verified']} 次，{result['mismatches']} 个不一致")
+    for mode in ('incremental', 'full'):
+        stats = result[mode]
+        print(f"{mode:>12}: median={stats['median_us']:9.1f} us  p95={stats['p95_us']:9.1f} us  "
+              f"max={stats['max_us']:9.1f} us")
+
+
+if __name__ == '__main__':
+    main()
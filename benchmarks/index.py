@@ -0,0 +1,106 @@
+"""语料索引基准：测量建立索引、复用已保存索引的耗时，并比较按索引分片转换与 convert_many 的吞吐与分发量
+
+语料文件由生成的EQ域与散文交替组成，写入临时目录。分发量为父进程发给工作进程的pickle字节数：
+convert_many 发送域文本本身，按索引转换只发送分片的序号范围。
+
+用法（在仓库根目录）：python -m benchmarks.index [-n 20000] [-j 4] [--shard-size 4096] [--json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import random
+import tempfile
+import time
+
+from src.mseq2latex.batch import DEFAULT_CHUNKSIZE
+from src.mseq2latex.converter import MSEQToLatexConverter
+from src.mseq2latex.index import DEFAULT_SHARD_SIZE, convert_index, open_index
+from src.mseq2latex.stream import iter_field_spans
+
+from .corpus import PROFILES, CorpusGenerator
+
+
+def write_corpus(path, count, seed=0):
+    """写入含 count 个EQ域的语料文件"""
+    rng = random.Random(seed)
+    generator = CorpusGenerator(seed=seed, **PROFILES['realistic'])
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(count):
+            f.write(rng.choice(("见下式 ", "where {x} is given by ", "\n")))
+            f.write(generator.field())
+    return os.path.getsize(path)
+
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def measure(count, workers, shard_size=DEFAULT_SHARD_SIZE, seed=0):
+    with tempfile.TemporaryDirectory() as directory:
+        corpus_path = os.path.join(directory, 'corpus.txt')
+        corpus_bytes = write_corpus(corpus_path, count, seed)
+
+        build_seconds, (index, _) = _timed(lambda: open_index(corpus_path, rebuild=True))
+        index.close()
+        load_seconds, (index, reused) = _timed(lambda: open_index(corpus_path))
+        fields = len(index)
+        index.close()
+        assert reused
+
+        converter = MSEQToLatexConverter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            indexed_seconds, indexed = _timed(
+                lambda: list(convert_index(corpus_path, converter, workers=workers, shard_size=shard_size)))
+
+            with open(corpus_path, 'rb') as f:
+                data = f.read()
+            texts = [data[start:end].decode('utf-8') for start, end in iter_field_spans(data)]
+            many_seconds, many = _timed(lambda: list(converter.convert_many(texts, workers=workers)))
+
+        if [item.latex for item in indexed] != [item.latex for item in many]:
+            raise AssertionError("按索引转换的结果与 convert_many 不一致")
+
+        shard_bytes = sum(len(pickle.dumps((first, min(first + shard_size, fields))))
+                          for first in range(0, fields, shard_size))
+        chunk_bytes = sum(len(pickle.dumps((start, texts[start:start + DEFAULT_CHUNKSIZE])))
+                          for start in range(0, fields, DEFAULT_CHUNKSIZE))
+
+    return {
+        'fields': fields,
+        'corpus_bytes': corpus_bytes,
+        'workers': workers,
+        'build_seconds': build_seconds,
+        'load_seconds': load_seconds,
+        'indexed_seconds': indexed_seconds,
+        'convert_many_seconds': many_seconds,
+        'indexed_dispatch_bytes': shard_bytes,
+        'convert_many_dispatch_bytes': chunk_bytes,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('-n', '--count', type=int, default=20000, help='语料中的域数')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='工作进程数')
+    arg_parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='每个分片的域数')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = arg_parser.parse_args()
+
+    result = measure(args.count, args.jobs, args.shard_size, args.seed)
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"{result['fields']} 个域，语料 {result['corpus_bytes'] / 1e6:.1f} MB，{result['workers']} 个进程")
+    print(f"  建立索引 {result['build_seconds'] * 1e3:9.1f} ms   复用索引 {result['load_seconds'] * 1e3:9.3f} ms")
+    print(f"  按索引转换 {result['indexed_seconds']:8.2f} s   分发 {result['indexed_dispatch_bytes']:>12} B")
+    print(f"  convert_many {result['convert_many_seconds']:6.2f} s   分发 {result['convert_many_dispatch_bytes']:>12} B")
+
+
+if __name__ == '__main__':
+    main()
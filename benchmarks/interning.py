@@ -0,0 +1,118 @@
+"""子树驻留基准：在生成的语料上统计结构共享的去重率，比较开启驻留前后语法分析与LaTeX生成的耗时
+
+每轮使用新的驻留器，相当于一次批量转换从空开始；--duplicates 按比例重复之前的域，模拟文档中反复出现的公式。
+
+用法（在仓库根目录）：python -m benchmarks.interning [--profile realistic] [-n 2000] [--duplicates 0.3] [--json]
+"""
+import argparse
+import contextlib
+import copy
+import io
+import json
+import random
+import time
+
+from src.mseq2latex.interning import SubtreeInterner
+from src.mseq2latex.lexer import get_lexer
+from src.mseq2latex.parser import get_parser
+
+from .corpus import PROFILES, CorpusGenerator
+from .phases import _ReplayLexer, _tokenize
+
+
+def build_corpus(profile, count, seed, duplicates):
+    """生成 count 个域，其中约 duplicates 比例为之前某个域的重复"""
+    rng = random.Random(seed)
+    generator = CorpusGenerator(seed=seed, **PROFILES[profile])
+    fields = []
+    for _ in range(count):
+        if fields and rng.random() < duplicates:
+            fields.append(rng.choice(fields))
+        else:
+            fields.append(generator.field())
+    return fields
+
+
+def _convert_all(parser, token_lists, interner):
+    """分析并生成全部域，返回 (分析秒数, 生成秒数, 输出列表)"""
+    parser.interner = interner
+    start = time.perf_counter()
+    trees = [parser.parse(lexer=_ReplayLexer(tokens)) for tokens in token_lists]
+    parse_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if interner is None:
+        outputs = [tree.to_latex() for tree in trees]
+    else:
+        outputs = [interner.to_latex(tree) for tree in trees]
+    return parse_seconds, time.perf_counter() - start, outputs
+
+
+def measure(fields, repeat=3):
+    """分别在关闭与开启驻留时分析并生成全部合法的域，各取最快一轮"""
+    lexer = get_lexer().clone()
+    parser = copy.copy(get_parser())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        token_lists = []
+        for eq_text in fields:
+            tokens = _tokenize(lexer, eq_text)
+            try:
+                tree = parser.parse(lexer=_ReplayLexer(tokens))
+                tree.to_latex()
+            except Exception:
+                continue
+            if tree is not None:
+                token_lists.append(tokens)
+
+        result = {'fields': len(token_lists), 'skipped': len(fields) - len(token_lists)}
+        expected = None
+        for mode in ('plain', 'interned'):
+            best = None
+            for _ in range(repeat):
+                interner = SubtreeInterner() if mode == 'interned' else None
+                parse_seconds, emit_seconds, outputs = _convert_all(parser, token_lists, interner)
+                if best is None or parse_seconds + emit_seconds < sum(best):
+                    best = (parse_seconds, emit_seconds)
+            if expected is None:
+                expected = outputs
+            elif outputs != expected:
+                raise AssertionError("开启驻留后的输出与关闭时不一致")
+            result[mode] = {'parse_seconds': best[0], 'emit_seconds': best[1]}
+            if interner is not None:
+                result['interner'] = interner.stats()
+
+    plain = sum(result['plain'].values())
+    interned = sum(result['interned'].values())
+    result['saved'] = (plain - interned) / plain if plain else 0.0
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                            help='语料预设，可重复指定（默认 realistic）')
+    arg_parser.add_argument('-n', '--count', type=int, default=2000, help='每组语料的域数')
+    arg_parser.add_argument('--duplicates', type=float, default=0.0, help='重复之前某个域的比例')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--repeat', type=int, default=3, help='重复轮数，取最快一轮')
+    arg_parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = arg_parser.parse_args()
+
+    for profile in args.profile or ['realistic']:
+        fields = build_corpus(profile, args.count, args.seed, args.duplicates)
+        result = {'profile': profile, **measure(fields, args.repeat)}
+        if args.json:
+            print(json.dumps(result))
+            continue
+        stats = result['interner']
+        plain, interned = result['plain'], result['interned']
+        print(f"{profile:>11} n={result['fields']:<6} dedup={stats['dedup_ratio'] * 100:5.1f}% "
+              f"shared={stats['shared']:<6} "
+              f"parse {plain['parse_seconds'] * 1e3:8.1f} -> {interned['parse_seconds'] * 1e3:8.1f} ms  "
+              f"emit {plain['emit_seconds'] * 1e3:8.1f} -> {interned['emit_seconds'] * 1e3:8.1f} ms  "
+              f"saved={result['saved'] * 100:+6.1f}%")
+
+
+if __name__ == '__main__':
+    main()
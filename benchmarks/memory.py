@@ -0,0 +1,60 @@
+"""AST内存基准：用 tracemalloc 统计保留整批AST时每个节点的字节数与峰值内存
+
+用法（在仓库根目录）：python -m benchmarks.memory [-n 字段数] [--json]
+"""
+import argparse
+import json
+import tracemalloc
+
+from src.mseq2latex.ast_nodes import count_nodes
+from src.mseq2latex.lexer import get_lexer
+from src.mseq2latex.parser import get_parser
+
+from .corpus import CorpusGenerator
+
+
+def measure(count, seed):
+    # 先生成语料并预热分析器，避免把它们计入AST占用
+    fields = list(CorpusGenerator(seed=seed).fields(count))
+    parser = get_parser()
+    lexer = get_lexer().clone()
+
+    tracemalloc.start()
+    trees = []
+    for eq_text in fields:
+        tree = parser.parse(eq_text, lexer=lexer)
+        if tree is not None:
+            trees.append(tree)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = sum(count_nodes(tree) for tree in trees)
+    return {
+        'fields': count,
+        'trees': len(trees),
+        'nodes': nodes,
+        'retained_bytes': current,
+        'peak_bytes': peak,
+        'bytes_per_node': current / nodes if nodes else 0.0,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('-n', '--fields', type=int, default=1_000_000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--json', action='store_true', help='输出机器可读的结果')
+    args = arg_parser.parse_args()
+
+    result = measure(args.fields, args.seed)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{result['fields']} fields, {result['nodes']} nodes")
+        print(f"retained: {result['retained_bytes'] / 2**20:.1f} MiB "
+              f"({result['bytes_per_node']:.1f} bytes/node)")
+        print(f"peak:     {result['peak_bytes'] / 2**20:.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
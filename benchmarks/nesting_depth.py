@@ -0,0 +1,73 @@
+"""嵌套深度基准：从10到100k层，分别测量PLY分析与LaTeX生成的耗时
+
+用法（在仓库根目录）：python -m benchmarks.nesting_depth [--shape fraction] [--max-depth 100000] [--json]
+"""
+import argparse
+import json
+import time
+
+from src.mseq2latex.lexer import get_lexer
+from src.mseq2latex.parser import get_parser
+
+# 各种嵌套形态：(前缀, 最内层, 后缀)，重复 depth 次前缀与后缀
+SHAPES = {
+    'fraction': ('\\f(1,', 'x', ')'),
+    'radical': ('\\r(', 'x', ')'),
+    'bracket': ('\\b(', 'x', ')'),
+    'script': ('a \\s\\up(', 'x', ')'),
+    'sequence': ('a ', 'b', ''),
+}
+
+
+def build_field(shape, depth):
+    prefix, inner, suffix = SHAPES[shape]
+    return f"{{ EQ {prefix * depth}{inner}{suffix * depth} }}"
+
+
+def measure(shape, depth):
+    eq_text = build_field(shape, depth)
+    parser = get_parser()
+
+    start = time.perf_counter()
+    tree = parser.parse(eq_text, lexer=get_lexer().clone())
+    parsed = time.perf_counter()
+    latex = tree.to_latex()
+    emitted = time.perf_counter()
+
+    return {
+        'shape': shape,
+        'depth': depth,
+        'parse_ms': (parsed - start) * 1000,
+        'emit_ms': (emitted - parsed) * 1000,
+        'output_bytes': len(latex),
+        'emit_ns_per_byte': (emitted - parsed) * 1e9 / len(latex),
+    }
+
+
+def depths(max_depth):
+    depth = 10
+    while depth <= max_depth:
+        yield depth
+        depth *= 10
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--shape', choices=sorted(SHAPES), action='append',
+                            help='嵌套形态，可重复指定（默认全部）')
+    arg_parser.add_argument('--max-depth', type=int, default=100000)
+    arg_parser.add_argument('--json', action='store_true', help='每行输出一条JSON结果')
+    args = arg_parser.parse_args()
+
+    for shape in args.shape or sorted(SHAPES):
+        for depth in depths(args.max_depth):
+            result = measure(shape, depth)
+            if args.json:
+                print(json.dumps(result))
+            else:
+                print(f"{shape:>9} depth={depth:<7} parse={result['parse_ms']:10.2f} ms  "
+                      f"emit={result['emit_ms']:9.2f} ms  {result['emit_ns_per_byte']:6.1f} ns/byte")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""选项密集语料基准：每个命令都带多个选项，分别测量词法分析、语法分析与LaTeX生成
+
+默认语料由 \\a \\al \\co2 \\vs3 \\hs3(...) 这样的数组组成；--mixed 时混入带选项的括号、置换、积分、重叠与边框。
+结果格式与 benchmarks.phases 相同，可用 python -m benchmarks.phases --compare old.json new.json 比较两次运行。
+
+用法（在仓库根目录）：python -m benchmarks.options [-n 2000] [--width 16] [--mixed] [--lexer table] [-o results.json]
+"""
+import argparse
+import json
+import platform
+import random
+
+from src.mseq2latex.lexer import LEXER_MODES
+
+from .corpus import IDENTIFIERS, OPTION_CHARS
+from .phases import _print_result, measure
+
+
+def _elements(rng, count, separator=','):
+    return separator.join(rng.choice(IDENTIFIERS + ('1', '23', '456')) for _ in range(count))
+
+
+def _array(rng):
+    columns = rng.randint(1, 4)
+    return (f"\\a \\{rng.choice(('al', 'ac', 'ar'))} \\co{columns} \\vs{rng.randint(0, 6)} "
+            f"\\hs{rng.randint(0, 6)}({_elements(rng, columns * rng.randint(1, 3))})")
+
+
+def _bracket(rng):
+    return (f"\\b \\lc\\{rng.choice('([{<')} \\rc\\{rng.choice(')]}>')} \\bc\\{rng.choice('([{<|')} "
+            f"({_elements(rng, 2, ' ')})")
+
+
+def _displace(rng):
+    return f"\\d \\fo{rng.randint(1, 20)} \\ba{rng.randint(1, 20)} \\li ({_elements(rng, 1)})"
+
+
+def _integral(rng):
+    return (f"\\i \\{rng.choice(('su', 'pr', 'in'))} \\fc\\{rng.choice(OPTION_CHARS)} "
+            f"\\vc\\{rng.choice(OPTION_CHARS)} ({_elements(rng, 1)},{_elements(rng, 1)},{_elements(rng, 2, ' ')})")
+
+
+def _overstrike(rng):
+    return f"\\o \\al \\{rng.choice(('ac', 'ar'))} ({_elements(rng, 3)})"
+
+
+def _box(rng):
+    return f"\\x \\to \\bo \\le \\ri ({_elements(rng, 2, ' ')})"
+
+
+def generate(count, width, mixed=False, seed=0):
+    """生成 count 个域，每个域由 width 个带选项的命令组成"""
+    rng = random.Random(seed)
+    makers = (_array, _bracket, _displace, _integral, _overstrike, _box) if mixed else (_array,)
+    return [f"{{ EQ {' '.join(rng.choice(makers)(rng) for _ in range(width))} }}" for _ in range(count)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('-n', '--count', type=int, default=2000, help='域数')
+    arg_parser.add_argument('--width', type=int, default=16, help='每个域中的命令数')
+    arg_parser.add_argument('--mixed', action='store_true', help='混入其他带选项的命令')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--repeat', type=int, default=3, help='每个阶段重复轮数，取最快一轮')
+    arg_parser.add_argument('--lexer', choices=LEXER_MODES, default='ply', help='词法分析模式')
+    arg_parser.add_argument('-o', '--output', help='将结果写入JSON文件')
+    args = arg_parser.parse_args()
+
+    fields = generate(args.count, args.width, args.mixed, args.seed)
+    result = {'profile': 'options', 'command': 'mixed' if args.mixed else 'array',
+              **measure(fields, args.repeat, args.lexer)}
+    _print_result(result)
+
+    if args.output:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'count': args.count,
+            'repeat': args.repeat,
+            'lexer': args.lexer,
+            'results': [result],
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""持久缓存基准：比较无缓存、首次运行（写入缓存）与再次运行（命中缓存）的耗时
+
+语料由生成器产生，缓存数据库写入临时目录；-j 大于 1 时由 convert_many 的工作进程并发读写同一个数据库。
+
+用法（在仓库根目录）：python -m benchmarks.persistent_cache [-n 5000] [-j 1] [--json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from src.mseq2latex.cache import PersistentCache
+from src.mseq2latex.converter import MSEQToLatexConverter
+
+from .corpus import PROFILES, CorpusGenerator
+
+
+def _run(fields, workers, cache=None):
+    converter = MSEQToLatexConverter(cache=cache)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        items = list(converter.convert_many(fields, workers=workers))
+        if cache is not None:
+            cache.flush()
+    return time.perf_counter() - start, [item.latex for item in items]
+
+
+def measure(count, workers, seed=0):
+    generator = CorpusGenerator(seed=seed, **PROFILES['realistic'])
+    fields = [generator.field() for _ in range(count)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'cache.db')
+        plain_seconds, plain = _run(fields, workers)
+        cold_seconds, cold = _run(fields, workers, PersistentCache(path))
+        warm_cache = PersistentCache(path)
+        warm_seconds, warm = _run(fields, workers, warm_cache)
+        if not plain == cold == warm:
+            raise AssertionError("使用持久缓存的结果与不使用缓存时不一致")
+        stats = warm_cache.stats()
+        database_bytes = os.path.getsize(path)
+    return {
+        'fields': count,
+        'workers': workers,
+        'plain_seconds': plain_seconds,
+        'cold_seconds': cold_seconds,
+        'warm_seconds': warm_seconds,
+        'entries': stats['entries'],
+        'database_bytes': database_bytes,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('-n', '--count', type=int, default=5000, help='域数')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=1, help='工作进程数')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = arg_parser.parse_args()
+
+    result = measure(args.count, args.jobs, args.seed)
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"{result['fields']} 个域，{result['workers']} 个进程，缓存 {result['entries']} 条，"
+          f"数据库 {result['database_bytes'] / 1e6:.1f} MB")
+    print(f"  无缓存   {result['plain_seconds']:8.2f} s")
+    print(f"  首次运行 {result['cold_seconds']:8.2f} s")
+    print(f"  再次运行 {result['warm_seconds']:8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""分阶段微基准：在生成的语料上分别测量词法分析、语法分析和LaTeX生成的吞吐
+
+语法分析阶段重放预先切好的标记，不包含词法分析的耗时。结果可写成JSON文件，并与另一版本的结果比较。
+
+用法（在仓库根目录）：
+    python -m benchmarks.phases [--profile deep] [--command fraction] [--lexer table] [-n 2000] [-o results.json]
+    python -m benchmarks.phases --compare old.json new.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+
+from src.mseq2latex.lexer import LEXER_MODES, get_lexer
+from src.mseq2latex.parser import get_parser
+
+from .corpus import COMMANDS, PROFILES, CorpusGenerator
+
+PHASES = ('lex', 'parse', 'emit')
+
+
+class _ReplayLexer:
+    """按顺序重放预先切好的标记，供语法分析器使用"""
+
+    def __init__(self, tokens):
+        self._next = iter(tokens).__next__
+
+    def input(self, data):
+        pass
+
+    def token(self):
+        try:
+            return self._next()
+        except StopIteration:
+            return None
+
+
+def _tokenize(lexer, eq_text):
+    lexer.lineno = 1
+    lexer.input(eq_text)
+    return list(iter(lexer.token, None))
+
+
+def _time(function, items, repeat):
+    """执行 repeat 轮取最快一轮，返回 (秒, 最后一轮的结果)"""
+    best = None
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [function(item) for item in items]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def measure(fields, repeat=3, lexer_mode='ply'):
+    """分别测量三个阶段，语法错误或无法生成的域不计入"""
+    lexer = get_lexer(lexer_mode).clone()
+    parser = get_parser()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        valid = []
+        for eq_text in fields:
+            try:
+                tree = parser.parse(eq_text, lexer=_ReplayLexer(_tokenize(lexer, eq_text)))
+                tree.to_latex()
+            except Exception:
+                continue
+            if tree is not None:
+                valid.append(eq_text)
+
+        lex_seconds, token_lists = _time(lambda eq_text: _tokenize(lexer, eq_text), valid, repeat)
+        parse_seconds, trees = _time(lambda tokens: parser.parse(lexer=_ReplayLexer(tokens)),
+                                     token_lists, repeat)
+        emit_seconds, outputs = _time(lambda tree: tree.to_latex(), trees, repeat)
+
+    count = len(valid)
+    result = {
+        'fields': count,
+        'skipped': len(fields) - count,
+        'input_bytes': sum(len(eq_text) for eq_text in valid),
+        'tokens': sum(len(tokens) for tokens in token_lists),
+        'output_bytes': sum(len(latex) for latex in outputs),
+    }
+    for phase, seconds in zip(PHASES, (lex_seconds, parse_seconds, emit_seconds)):
+        result[phase] = {
+            'seconds': seconds,
+            'fields_per_second': count / seconds if seconds else None,
+            'us_per_field': seconds * 1e6 / count if count else None,
+        }
+    return result
+
+
+def run(profiles, commands, count, seed, repeat, lexer_mode='ply'):
+    for profile in profiles:
+        for command in commands:
+            options = dict(PROFILES[profile])
+            if command:
+                options['commands'] = [command]
+            generator = CorpusGenerator(seed=seed, **options)
+            fields = list(generator.fields(count))
+            result = measure(fields, repeat, lexer_mode)
+            yield {'profile': profile, 'command': command or 'all', **result}
+
+
+def _print_result(result, file=sys.stdout):
+    phases = '  '.join(f"{phase}={result[phase]['us_per_field']:9.1f} us"
+                       for phase in PHASES if result[phase]['us_per_field'] is not None)
+    print(f"{result['profile']:>11} {result['command']:>10} n={result['fields']:<6} {phases}", file=file)
+
+
+def compare(old_path, new_path):
+    """按 (profile, command) 对齐两份结果，输出各阶段每域耗时的变化比例"""
+    with open(old_path, encoding='utf-8') as f:
+        old = {(r['profile'], r['command']): r for r in json.load(f)['results']}
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)['results']
+    for result in new:
+        before = old.get((result['profile'], result['command']))
+        if before is None:
+            continue
+        changes = []
+        for phase in PHASES:
+            a, b = before[phase]['us_per_field'], result[phase]['us_per_field']
+            if a and b:
+                changes.append(f"{phase}={(b - a) / a * 100:+7.1f}%")
+        print(f"{result['profile']:>11} {result['command']:>10} {'  '.join(changes)}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                            help='语料预设，可重复指定（默认 realistic）')
+    arg_parser.add_argument('--command', choices=COMMANDS + ('all',), action='append',
+                            help="只生成指定命令，可重复指定；'all' 为全部命令混合（默认）")
+    arg_parser.add_argument('-n', '--count', type=int, default=2000, help='每组语料的域数')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--repeat', type=int, default=3, help='每个阶段重复轮数，取最快一轮')
+    arg_parser.add_argument('--lexer', choices=LEXER_MODES, default='ply', help='词法分析模式')
+    arg_parser.add_argument('-o', '--output', help='将结果写入JSON文件')
+    arg_parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='比较两份结果文件')
+    args = arg_parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commands = [None if command == 'all' else command for command in args.command or ['all']]
+    results = []
+    for result in run(args.profile or ['realistic'], commands, args.count, args.seed, args.repeat,
+                      args.lexer):
+        _print_result(result)
+        results.append(result)
+
+    if args.output:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'count': args.count,
+            'repeat': args.repeat,
+            'lexer': args.lexer,
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
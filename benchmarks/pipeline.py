@@ -0,0 +1,86 @@
+"""目录流水线基准：测量完整运行、中断后续跑与全部跳过时的耗时与吞吐
+
+输入目录由若干生成的语料文件组成，写入临时目录。续跑一轮先删除清单中后一半的记录，模拟中途崩溃；
+最后一轮清单完整，只有发现阶段的开销。
+
+用法（在仓库根目录）：python -m benchmarks.pipeline [--files 40] [--fields 500] [-j 4] [--recycle-after 8] [--json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from src.mseq2latex.converter import MSEQToLatexConverter
+from src.mseq2latex.pipeline import MANIFEST_NAME, run_pipeline
+
+from .index import write_corpus
+
+
+def _run(input_dir, output_dir, workers, recycle_after):
+    converter = MSEQToLatexConverter()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = run_pipeline([input_dir], output_dir, converter, convert_workers=workers,
+                             recycle_after=recycle_after)
+    return time.perf_counter() - start, stats
+
+
+def measure(files, fields, workers, recycle_after=None, seed=0):
+    with tempfile.TemporaryDirectory() as directory:
+        input_dir = os.path.join(directory, 'in')
+        output_dir = os.path.join(directory, 'out')
+        os.makedirs(input_dir)
+        for i in range(files):
+            write_corpus(os.path.join(input_dir, f'part{i:04d}.txt'), fields, seed + i)
+
+        full_seconds, full = _run(input_dir, output_dir, workers, recycle_after)
+
+        manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        with open(manifest_path, encoding='utf-8') as f:
+            lines = f.readlines()
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[:len(lines) // 2])
+        resume_seconds, resumed = _run(input_dir, output_dir, workers, recycle_after)
+
+        skip_seconds, skipped = _run(input_dir, output_dir, workers, recycle_after)
+
+    return {
+        'files': files,
+        'fields': full.fields,
+        'workers': workers,
+        'recycle_after': recycle_after,
+        'full_seconds': full_seconds,
+        'fields_per_second': full.fields / full_seconds,
+        'resume_seconds': resume_seconds,
+        'resume_files': resumed.completed,
+        'resume_skipped': resumed.skipped,
+        'skip_seconds': skip_seconds,
+        'skip_skipped': skipped.skipped,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--files', type=int, default=40, help='输入文件数')
+    arg_parser.add_argument('--fields', type=int, default=500, help='每个文件中的域数')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='转换进程数，0 为当前进程')
+    arg_parser.add_argument('--recycle-after', type=int, default=None, help='每个进程处理多少个分块后更换进程池')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = arg_parser.parse_args()
+
+    result = measure(args.files, args.fields, args.jobs, args.recycle_after, args.seed)
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"{result['files']} 个文件，{result['fields']} 个域，{result['workers']} 个进程")
+    print(f"  完整运行 {result['full_seconds']:8.2f} s   {result['fields_per_second']:8.0f} 域/秒")
+    print(f"  续跑     {result['resume_seconds']:8.2f} s   处理 {result['resume_files']} 个，跳过 {result['resume_skipped']} 个")
+    print(f"  全部跳过 {result['skip_seconds']:8.3f} s   跳过 {result['skip_skipped']} 个")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""转换服务负载测试：多个保持连接的客户端并发发送请求，报告延迟分位数与吞吐
+
+默认在子进程中启动一个服务（-j、--max-batch、--max-delay、--max-queue 透传给 serve），
+也可以用 --url 或 --unix 指向已经在运行的服务。每个请求转换一个生成的域；被拒绝（503）的请求单独计数。
+
+用法（在仓库根目录）：python -m benchmarks.server [-n 5000] [-c 32] [-j 2] [--max-batch 64] [--json]
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from .corpus import PROFILES, CorpusGenerator
+
+
+async def _request(reader, writer, body):
+    writer.write(b'POST /convert HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+                 b'Content-Length: %d\r\n\r\n' % len(body) + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(connect, bodies, cursor, latencies, statuses):
+    reader, writer = await connect()
+    try:
+        while True:
+            i = next(cursor, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            status = await _request(reader, writer, bodies[i % len(bodies)])
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run_load(connect, fields, requests, concurrency):
+    """以 concurrency 个连接共发送 requests 个请求，返回延迟与吞吐统计"""
+    bodies = [json.dumps({'eq': field}).encode('utf-8') for field in fields]
+    cursor = iter(range(requests))
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(connect, bodies, cursor, latencies, statuses) for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'seconds': seconds,
+        'requests_per_second': requests / seconds,
+        'ok': statuses.get(200, 0),
+        'rejected': statuses.get(503, 0),
+        'p50_ms': _percentile(latencies, 0.50) * 1e3,
+        'p99_ms': _percentile(latencies, 0.99) * 1e3,
+        'max_ms': latencies[-1] * 1e3,
+    }
+
+
+def _start_server(args):
+    """在子进程中启动服务，返回 (进程, 地址)"""
+    command = [sys.executable, '-m', 'src.mseq2latex', 'serve', '--port', '0', '-j', str(args.jobs),
+               '--max-batch', str(args.max_batch), '--max-queue', str(args.max_queue)]
+    if args.max_delay is not None:
+        command += ['--max-delay', str(args.max_delay)]
+    process = subprocess.Popen(command, stderr=subprocess.PIPE, text=True)
+    line = process.stderr.readline()
+    if 'http://' not in line:
+        process.kill()
+        raise RuntimeError(f"服务未能启动: {line}{process.stderr.read()}")
+    return process, line[line.index('http://'):].strip()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('-n', '--requests', type=int, default=5000, help='请求总数')
+    arg_parser.add_argument('-c', '--concurrency', type=int, default=32, help='并发连接数')
+    arg_parser.add_argument('--fields', type=int, default=1000, help='循环使用的生成域数')
+    arg_parser.add_argument('--url', help='已运行服务的地址，如 http://127.0.0.1:8765')
+    arg_parser.add_argument('--unix', help='已运行服务的 Unix 套接字路径')
+    arg_parser.add_argument('-j', '--jobs', type=int, default=2, help='自动启动的服务的工作进程数')
+    arg_parser.add_argument('--max-batch', type=int, default=64, help='自动启动的服务的微批次大小')
+    arg_parser.add_argument('--max-delay', type=float, default=None, metavar='MS',
+                            help='自动启动的服务的凑批等待时间')
+    arg_parser.add_argument('--max-queue', type=int, default=4096, help='自动启动的服务的队列上限')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = arg_parser.parse_args()
+
+    generator = CorpusGenerator(seed=args.seed, **PROFILES['realistic'])
+    fields = [generator.field() for _ in range(args.fields)]
+
+    process = None
+    if args.unix:
+        def connect():
+            return asyncio.open_unix_connection(args.unix)
+    else:
+        url = args.url
+        if url is None:
+            process, url = _start_server(args)
+        address = urlsplit(url)
+
+        def connect():
+            return asyncio.open_connection(address.hostname, address.port)
+
+    try:
+        result = asyncio.run(run_load(connect, fields, args.requests, args.concurrency))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"{result['requests']} 个请求，{result['concurrency']} 个连接，"
+          f"成功 {result['ok']}，拒绝 {result['rejected']}")
+    print(f"  吞吐 {result['requests_per_second']:8.0f} 请求/秒")
+    print(f"  延迟 p50 {result['p50_ms']:7.2f} ms   p99 {result['p99_ms']:7.2f} ms   最大 {result['max_ms']:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""多线程压力测试：多个线程同时使用同一个转换器，要求每个结果与单线程转换逐一致
+
+覆盖 PLY/表驱动词法分析器、子树共享与错误恢复的各种组合。
+用法（在仓库根目录）：python -m benchmarks.thread_stress [-n 数量] [-t 线程数] [--rounds 轮数] [--seed 种子]
+"""
+import argparse
+import itertools
+import random
+import sys
+import threading
+import time
+
+from src.mseq2latex.converter import MSEQToLatexConverter
+
+from .corpus import CorpusGenerator
+from .differential import mutate
+
+
+def _configurations():
+    for lexer_mode, intern_subtrees, recover in itertools.product(('ply', 'table'), (False, True), (False, True)):
+        yield {'lexer_mode': lexer_mode, 'intern_subtrees': intern_subtrees, 'recover': recover}
+
+
+def _hammer(converter, fields, expected, threads, rounds, seed):
+    """threads 个线程各自以不同的顺序转换 rounds 遍 fields，返回不一致的 (输入, 期望, 实际) 列表"""
+    mismatches = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def work(number):
+        rng = random.Random(seed * 1000 + number)
+        order = list(range(len(fields)))
+        barrier.wait()
+        for _ in range(rounds):
+            rng.shuffle(order)
+            for i in order:
+                actual = converter.convert_result(fields[i])
+                if actual != expected[i]:
+                    with lock:
+                        mismatches.append((fields[i], expected[i], actual))
+
+    workers = [threading.Thread(target=work, args=(number,)) for number in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return mismatches
+
+
+def run(count, threads, rounds, seed, mutate_ratio):
+    rng = random.Random(seed)
+    fields = []
+    for eq_text in CorpusGenerator(seed=seed).fields(count):
+        if rng.random() < mutate_ratio:
+            eq_text = mutate(rng, eq_text)
+        fields.append(eq_text)
+
+    # 缩短线程切换间隔，让转换尽可能在分析中途被打断
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    failed = 0
+    try:
+        for options in _configurations():
+            # 期望结果由单独的转换器在单线程中得到，被测的转换器只在多线程中使用
+            reference = MSEQToLatexConverter(**options)
+            expected = [reference.convert_result(eq_text) for eq_text in fields]
+            start = time.perf_counter()
+            mismatches = _hammer(MSEQToLatexConverter(**options), fields, expected, threads, rounds, seed)
+            elapsed = time.perf_counter() - start
+            label = ' '.join(f"{name}={value}" for name, value in options.items())
+            print(f"{label}: {threads} 个线程 x {rounds} 轮，{len(mismatches)} 个不一致（{elapsed:.2f} 秒）")
+            for eq_text, expected_result, actual in mismatches[:5]:
+                print(f"  不一致: {eq_text!r}\n    单线程: {expected_result!r}\n    多线程: {actual!r}")
+            failed += bool(mismatches)
+    finally:
+        sys.setswitchinterval(interval)
+    return failed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('-n', '--count', type=int, default=300)
+    arg_parser.add_argument('-t', '--threads', type=int, default=16)
+    arg_parser.add_argument('--rounds', type=int, default=2)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--mutate', type=float, default=0.2, help='变异为非法输入的比例')
+    args = arg_parser.parse_args()
+
+    failed = run(args.count, args.threads, args.rounds, args.seed, args.mutate)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
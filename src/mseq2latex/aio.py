@@ -0,0 +1,45 @@
+import asyncio
+from collections import deque
+
+DEFAULT_STREAM_LIMIT = 16
+
+
+async def _aiter(iterable):
+    """统一同步与异步可迭代对象"""
+    if hasattr(iterable, '__aiter__'):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+async def convert_async(converter, eq_text):
+    """在转换器的有界线程池中执行转换，不阻塞事件循环"""
+    loop = asyncio.get_running_loop()
+    # 等待中的任务被取消时，尚未开始执行的转换会一并从线程池队列中撤销
+    return await loop.run_in_executor(converter._async_executor(), converter.convert, eq_text)
+
+
+async def aconvert_stream(converter, eq_texts, limit=DEFAULT_STREAM_LIMIT):
+    """流式转换，按输入顺序产出结果
+
+    同时在途的转换最多 limit 个，达到上限后暂停读取输入，从而对上游形成背压。
+    """
+    if limit < 1:
+        raise ValueError("limit 必须为正整数")
+
+    loop = asyncio.get_running_loop()
+    executor = converter._async_executor()
+    pending = deque()
+    try:
+        async for eq_text in _aiter(eq_texts):
+            pending.append(loop.run_in_executor(executor, converter.convert, eq_text))
+            if len(pending) >= limit:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # 消费者提前退出或被取消时，撤销尚未执行的转换
+        for future in pending:
+            future.cancel()
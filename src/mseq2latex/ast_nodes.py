@@ -1,500 +1,497 @@
+from collections import namedtuple
+from types import MappingProxyType
+
+# 未设置选项的节点共享同一个只读空字典，设置选项时才分配独立的字典
+_NO_OPTIONS = MappingProxyType({})
+
+class WideText(str):
+    """含CJK等文字的文本叶子：词法分析时分类一次（见 lexer.WIDE_SCRIPT），
+    生成LaTeX时按类型决定是否用 \\text{} 包围，不再逐字符扫描"""
+    __slots__ = ()
+
+class CommandOption(namedtuple('CommandOption', ['kind', 'value', 'text'])):
+    """词法分析时解码好的命令选项（见 lexer.decode_option）
+
+    kind 为选项名（如 'co'、'bc'），value 为选项值：数字选项为 int，字符选项为该字符，其余为 True；
+    text 为选项原文。
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        # 报告语法错误时按原文计算标记长度
+        return self.text
+
+# 括号字符 -> LaTeX括号
+_LATEX_BRACKETS = {
+    '(': '(',
+    ')': ')',
+    '[': '[',
+    ']': ']',
+    '{': '\\{',
+    '}': '\\}',
+    '<': '\\langle',
+    '>': '\\rangle',
+    '|': '|',
+    '\\': '\\backslash'
+}
+# \bc 选项的左括号 -> 对应的右括号，表中没有的字符左右相同
+_CORRESPONDING_BRACKETS = {
+    '(': ')',
+    '[': ']',
+    '{': '}',
+    '<': '>',
+}
+# 积分选项 -> 符号类型，\in 不改变符号
+_INTEGRAL_SYMBOL_TYPES = {
+    'su': 'sum',
+    'pr': 'product',
+    'fc': 'custom',
+    'vc': 'custom',
+}
+# 符号类型 -> LaTeX符号；自定义符号暂时使用默认积分符号
+_INTEGRAL_SYMBOLS = {
+    'sum': '\\sum',
+    'product': '\\prod',
+}
+# 对齐选项；数组的数字选项 -> 对应的属性
+_ALIGNMENTS = frozenset(('al', 'ac', 'ar'))
+_ARRAY_ATTRIBUTES = {
+    'co': 'columns',             # 列数
+    'vs': 'vertical_spacing',    # 垂直间距（存储但不使用）
+    'hs': 'horizontal_spacing',  # 水平间距（存储但不使用）
+}
+
 class ASTNode:
     """AST节点基类"""
+    __slots__ = ('is_block',)
 
     def __init__(self, is_block=False):
         self.is_block = is_block
 
+    def _inherit_block(self, *children):
+        """任一子节点需要块级环境时，当前节点也需要"""
+        for child in children:
+            if isinstance(child, ASTNode):
+                self.is_block = child.is_block or self.is_block
+
+    def _writable_options(self):
+        """返回可写的选项字典"""
+        if self.options is _NO_OPTIONS:
+            self.options = {}
+        return self.options
+
+    def _parts(self):
+        """按输出顺序产出LaTeX片段：字符串原样输出，子节点继续展开，其他叶子转为字符串"""
+        return iter(())
+
+    def to_latex(self, memo=None):
+        """以显式栈遍历子树生成LaTeX，所有片段写入同一缓冲区，嵌套深度只受内存限制
+
+        memo 为共享节点到LaTeX的缓存（见 interning.SubtreeInterner），其中的节点只生成一次。
+        """
+        out = []
+        self.to_latex_into(out, memo)
+        return ''.join(out)
+
+    def to_latex_into(self, writer, memo=None):
+        """与 to_latex 相同的遍历，但把片段依次写入 writer，不拼接中间字符串
+
+        writer 为列表（片段追加到末尾）或带 write 方法的对象（如 io.StringIO、以文本模式打开的文件）。
+        生成过程中出错时（如列数为0的数组），已写入的片段不会撤回。
+        """
+        write = writer.append if isinstance(writer, list) else writer.write
+        if memo is not None:
+            self._write_memo(write, memo)
+            return
+        stack = [self._parts()]
+        while stack:
+            for part in stack[-1]:
+                if isinstance(part, str):
+                    write(part)
+                elif isinstance(part, ASTNode):
+                    # 暂停当前节点，先展开子节点；子节点输出完毕后从断点继续
+                    stack.append(part._parts())
+                    break
+                else:
+                    write(str(part))
+            else:
+                stack.pop()
+
+    def _write_memo(self, write, memo):
+        """与 to_latex_into 相同的遍历；memo 中的节点直接输出缓存的LaTeX，首次生成时写回缓存
+
+        需要写回缓存的节点在生成期间把片段暂存在缓冲区中，最外层的这类节点结束后才整体写出。
+        """
+        cached = memo.get(self)
+        if cached is not None:
+            write(cached)
+            return
+        out = []
+        # 栈中每项为 (片段迭代器, 需要写回缓存的节点, 该节点输出在缓冲区中的起点)
+        stack = [(self._parts(), self if self in memo else None, 0)]
+        # 栈中需要写回缓存的节点数，为 0 时片段直接写出
+        capturing = 1 if self in memo else 0
+        while stack:
+            for part in stack[-1][0]:
+                if not isinstance(part, ASTNode):
+                    if not isinstance(part, str):
+                        part = str(part)
+                    if capturing:
+                        out.append(part)
+                    else:
+                        write(part)
+                    continue
+                if part in memo:
+                    cached = memo[part]
+                    if cached is not None:
+                        if capturing:
+                            out.append(cached)
+                        else:
+                            write(cached)
+                        continue
+                    stack.append((part._parts(), part, len(out)))
+                    capturing += 1
+                else:
+                    stack.append((part._parts(), None, 0))
+                break
+            else:
+                _, node, mark = stack.pop()
+                if node is not None:
+                    latex = ''.join(out[mark:])
+                    del out[mark:]
+                    memo[node] = latex
+                    capturing -= 1
+                    if capturing:
+                        out.append(latex)
+                    else:
+                        write(latex)
+
+def count_nodes(tree):
+    """以显式栈统计子树中的AST节点数"""
+    count = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        count += 1
+        try:
+            stack.extend(part for part in node._parts() if isinstance(part, ASTNode))
+        except ValueError:
+            pass  # 列数为0的数组无法展开
+    return count
+
 class EQField(ASTNode):
     """EQ域节点"""
+    __slots__ = ('expression',)
+
     def __init__(self, expression):
         super().__init__()
         self.expression = expression
-        if isinstance(expression, ASTNode):
-            self.is_block = expression.is_block or self.is_block
+        self._inherit_block(expression)
 
-    def to_latex(self):
-        return self.expression.to_latex()
+    def _parts(self):
+        yield self.expression
+
+    def to_latex_into(self, writer, memo=None):
+        self.expression.to_latex_into(writer, memo)
 
 class Fraction(ASTNode):
     """分式节点"""
+    __slots__ = ('numerator', 'denominator')
+
     def __init__(self, numerator, denominator):
         super().__init__()
         self.numerator = numerator
         self.denominator = denominator
-        if isinstance(numerator, ASTNode):
-            self.is_block = numerator.is_block or self.is_block
-        if isinstance(denominator, ASTNode):
-            self.is_block = denominator.is_block or self.is_block
-
-    def to_latex(self):
-        num = self._format_expression(self.numerator)
-        den = self._format_expression(self.denominator)
-        return f"\\frac{{{num}}}{{{den}}}"
-
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+        self._inherit_block(numerator, denominator)
+
+    def _parts(self):
+        yield "\\frac{"
+        yield self.numerator
+        yield "}{"
+        yield self.denominator
+        yield "}"
 
 class Radical(ASTNode):
     """根式节点"""
+    __slots__ = ('degree', 'radicand')
+
     def __init__(self, degree, radicand):
         super().__init__()
         self.degree = degree  # 根次数，None表示平方根
         self.radicand = radicand  # 被开方数
-        if isinstance(radicand, ASTNode):
-            self.is_block = radicand.is_block or self.is_block
-        if degree and isinstance(degree, ASTNode):
-            self.is_block = degree.is_block or self.is_block
-
-    def to_latex(self):
-        radicand = self._format_expression(self.radicand)
+        self._inherit_block(radicand, degree)
 
+    def _parts(self):
         if self.degree is None:
             # 平方根
-            return f"\\sqrt{{{radicand}}}"
+            yield "\\sqrt{"
         else:
             # n次根
-            degree = self._format_expression(self.degree)
-            return f"\\sqrt[{degree}]{{{radicand}}}"
-
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+            yield "\\sqrt["
+            yield self.degree
+            yield "]{"
+        yield self.radicand
+        yield "}"
 
 class Superscript(ASTNode):
     """上标节点"""
+    __slots__ = ('content',)
+
     def __init__(self, content):
         super().__init__()
         self.content = content
-        if isinstance(content, ASTNode):
-            self.is_block = content.is_block or self.is_block
-
-    def to_latex(self):
-        content = self._format_expression(self.content)
-        return f"^{{{content}}}"
+        self._inherit_block(content)
 
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+    def _parts(self):
+        yield "^{"
+        yield self.content
+        yield "}"
 
 class Subscript(ASTNode):
     """下标节点"""
+    __slots__ = ('content',)
+
     def __init__(self, content):
         super().__init__()
         self.content = content
-        if isinstance(content, ASTNode):
-            self.is_block = content.is_block or self.is_block
+        self._inherit_block(content)
 
-    def to_latex(self):
-        content = self._format_expression(self.content)
-        return f"_{{{content}}}"
-
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+    def _parts(self):
+        yield "_{"
+        yield self.content
+        yield "}"
 
 class SpaceCommand(ASTNode):
     """空间命令节点（ai, di）"""
+    __slots__ = ('command_type', 'content')
+
     def __init__(self, command_type, content):
         super().__init__()
         self.command_type = command_type  # 'ai' 或 'di'
         self.content = content
-        if isinstance(content, ASTNode):
-            self.is_block = content.is_block or self.is_block
+        self._inherit_block(content)
 
-    def to_latex(self):
+    def _parts(self):
         # 原样输出括号里的内容
-        content = self._format_expression(self.content)
-        return content
-
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+        yield self.content
 
 class CombinedScript(ASTNode):
     """组合脚本节点（处理相邻的上下标）"""
+    __slots__ = ('elements',)
+
     def __init__(self, elements):
         super().__init__()
         self.elements = elements
 
-        for element in self.elements:
-            if isinstance(element, ASTNode):
-                self.is_block = element.is_block or self.is_block
+        self._inherit_block(*self.elements)
 
-    def to_latex(self):
-        result = ""
-        for element in self.elements:
-            if isinstance(element, ASTNode):
-                result += element.to_latex()
-            else:
-                result += str(element)
-        return result
+    def _parts(self):
+        return iter(self.elements)
 
 class ExpressionSequence(ASTNode):
     """表达式序列节点"""
+    __slots__ = ('elements',)
+
     def __init__(self, elements):
         super().__init__()
         self.elements = elements if isinstance(elements, list) else [elements]
 
-        for element in self.elements:
-            if isinstance(element, ASTNode):
-                self.is_block = element.is_block or self.is_block
+        self._inherit_block(*self.elements)
 
     def add_element(self, element):
         """添加新元素到序列"""
         self.elements.append(element)
+        self._inherit_block(element)
 
-    def to_latex(self):
-        result = ""
-        for i, element in enumerate(self.elements):
+    def _parts(self):
+        elements = self.elements
+        last = len(elements) - 1
+        for i, element in enumerate(elements):
             # 对于中文字符或特殊文本，在LaTeX中需要特殊处理
-            if isinstance(element, str) and any('\u4e00' <= char <= '\u9fff' for char in element):
-                # 中文字符用 \text{} 包围
-                result += f"\\text{{{element}}}"
-            elif isinstance(element, ASTNode):
-                result += element.to_latex()
+            if element.__class__ is WideText:
+                # CJK等文字用 \text{} 包围
+                yield "\\text{"
+                yield element
+                yield "}"
             else:
-                result += str(element)
+                yield element
 
             # 在某些情况下添加空格
-            if i < len(self.elements) - 1:
-                next_element = self.elements[i + 1]
-                if not (isinstance(next_element, (Superscript, Subscript))):
-                    result += " "
-
-        return result
+            if i < last and not isinstance(elements[i + 1], (Superscript, Subscript)):
+                yield " "
 
 class Bracket(ASTNode):
     """括号节点"""
+    __slots__ = ('content', 'left_bracket', 'right_bracket')
+
     def __init__(self, content, left_bracket='(', right_bracket=')'):
         super().__init__()
         self.content = content
         self.left_bracket = left_bracket
         self.right_bracket = right_bracket
-        if isinstance(content, ASTNode):
-            self.is_block = content.is_block or self.is_block
+        self._inherit_block(content)
 
     def set_bracket_options(self, options):
-        """根据括号选项设置左右括号"""
+        """根据括号选项（CommandOption，值为括号字符）设置左右括号"""
         # 从左到右处理选项，后面的会覆盖前面的
-        for option in options:
-            option_type, char = self._parse_bracket_option(option)
-            if option_type == 'lc':
+        for kind, char, _ in options:
+            if kind == 'lc':
                 self.left_bracket = char
-            elif option_type == 'rc':
+            elif kind == 'rc':
                 self.right_bracket = char
-            elif option_type == 'bc':
+            else:
                 self.left_bracket = char
-                self.right_bracket = self._get_corresponding_bracket(char)
-
-    def _get_corresponding_bracket(self, char):
-        """获取对应的右括号"""
-        bracket_pairs = {
-            '(': ')',
-            '[': ']',
-            '{': '}',
-            '<': '>',
-        }
-        return bracket_pairs.get(char, char)
-
-    def _parse_bracket_option(self, option):
-        """解析括号选项"""
-        # option格式：\lc\字符、\rc\字符、\bc\字符
-        if option.startswith('\\lc\\'):
-            return 'lc', option[4]
-        elif option.startswith('\\rc\\'):
-            return 'rc', option[4]
-        elif option.startswith('\\bc\\'):
-            return 'bc', option[4]
-        return None, None
-
-    def _get_latex_bracket(self, char):
-        """将字符转换为LaTeX括号格式"""
-        bracket_map = {
-            '(': '(',
-            ')': ')',
-            '[': '[',
-            ']': ']',
-            '{': '\\{',
-            '}': '\\}',
-            '<': '\\langle',
-            '>': '\\rangle',
-            '|': '|',
-            '\\': '\\backslash'
-        }
-        return bracket_map.get(char, char)
-
-    def to_latex(self):
-        content = self._format_expression(self.content)
-        left = self._get_latex_bracket(self.left_bracket)
-        right = self._get_latex_bracket(self.right_bracket)
-
-        # 如果左右括号相同且不是常见的配对括号，使用相同的符号
-        if self.left_bracket == self.right_bracket and self.left_bracket not in '()[]{}<>':
-            return f"\\left{left} {content} \\right{right}"
-
-        # 处理配对括号
-        if self.left_bracket in '{[(<':
-            # 自动配对
-            pair_map = {'{': '}', '[': ']', '(': ')', '<': '>'}
-            if self.right_bracket == pair_map.get(self.left_bracket, ')'):
-                return f"\\left{left} {content} \\right{right}"
-
-        return f"\\left{left} {content} \\right{right}"
-
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+                self.right_bracket = _CORRESPONDING_BRACKETS.get(char, char)
+
+    def _parts(self):
+        yield "\\left"
+        yield _LATEX_BRACKETS.get(self.left_bracket, self.left_bracket)
+        yield " "
+        yield self.content
+        yield " \\right"
+        yield _LATEX_BRACKETS.get(self.right_bracket, self.right_bracket)
 
 class Displace(ASTNode):
     """置换指令节点"""
+    __slots__ = ('content', 'options')
+
     def __init__(self, content):
         super().__init__()
         self.content = content
-        self.options = {}  # 存储选项值：{fo: n, ba: n, li: True}
+        self.options = _NO_OPTIONS  # 存储选项值：{fo: n, ba: n, li: True}
 
-        if isinstance(content, ASTNode):
-            self.is_block = content.is_block or self.is_block
+        self._inherit_block(content)
 
     def set_displace_options(self, options):
-        """根据置换选项设置参数"""
+        """根据置换选项（CommandOption）设置参数"""
         # 从左到右处理选项，后面的会覆盖前面的
-        for option in options:
-            option_type, value = self._parse_displace_option(option)
-            if option_type:
-                self.options[option_type] = value
-
-    def _parse_displace_option(self, option):
-        """解析置换选项"""
-        # option格式：\fo数字、\ba数字、\li
-        if option.startswith('\\fo'):
-            # 提取数字
-            try:
-                value = int(option[3:])
-                return 'fo', value
-            except ValueError:
-                return None, None
-        elif option.startswith('\\ba'):
-            # 提取数字
-            try:
-                value = int(option[3:])
-                return 'ba', value
-            except ValueError:
-                return None, None
-        elif option == '\\li':
-            return 'li', True
-        return None, None
-
-    def to_latex(self):
+        writable = self._writable_options()
+        for kind, value, _ in options:
+            if value is not None:
+                writable[kind] = value
+
+    def _parts(self):
         """将内容转换为\text{}格式，忽略选项效果"""
-        content = self._format_expression(self.content)
-        return f"\\text{{{content}}}"
+        yield "\\text{"
+        yield self.content
+        yield "}"
 
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+def _has_limit(limit):
+    """积分上下限是否生成非空内容"""
+    if isinstance(limit, ASTNode):
+        return limit.__class__ is not ErrorNode
+    return str(limit) != ""
 
 class Integral(ASTNode):
     """积分指令节点"""
+    __slots__ = ('lower_limit', 'upper_limit', 'integrand', 'options', 'symbol_type')
+
     def __init__(self, lower_limit=None, upper_limit=None, integrand=None):
         super().__init__()
         self.lower_limit = lower_limit
         self.upper_limit = upper_limit
         self.integrand = integrand
-        self.options = {}  # 存储选项值：{su: True, pr: True, in: True, fc: char, vc: char}
+        self.options = _NO_OPTIONS  # 存储选项值：{su: True, pr: True, in: True, fc: char, vc: char}
         self.symbol_type = 'integral'  # 默认为积分符号
         self.is_block = False  # 是否为内联格式
 
-        if isinstance(lower_limit, ASTNode):
-            self.is_block = lower_limit.is_block or self.is_block
-        if isinstance(upper_limit, ASTNode):
-            self.is_block = upper_limit.is_block or self.is_block
-        if isinstance(integrand, ASTNode):
-            self.is_block = integrand.is_block or self.is_block
+        self._inherit_block(lower_limit, upper_limit, integrand)
 
     def set_integral_options(self, options):
-        """根据积分选项设置参数"""
+        """根据积分选项（CommandOption）设置参数"""
         # 从左到右处理选项，后面的会覆盖前面的
-        for option in options:
-            option_type, value = self._parse_integral_option(option)
-            if option_type:
-                self.options[option_type] = value
-                # 根据选项设置符号类型
-                if option_type == 'su':
-                    self.symbol_type = 'sum'
-                elif option_type == 'pr':
-                    self.symbol_type = 'product'
-                elif option_type == 'in':
-                    pass # 默认为内联格式，若子节点需要块级环境，则会覆盖，故无需处理
-                elif option_type in ['fc', 'vc']:
-                    self.symbol_type = 'custom'
-
-    def _parse_integral_option(self, option):
-        """解析积分选项"""
-        # option格式：\su、\pr、\in、\fc\字符、\vc\字符
-        if option == '\\su':
-            return 'su', True
-        elif option == '\\pr':
-            return 'pr', True
-        elif option == '\\in':
-            return 'in', True
-        elif option.startswith('\\fc\\'):
-            return 'fc', option[4]  # 提取字符
-        elif option.startswith('\\vc\\'):
-            return 'vc', option[4]  # 提取字符
-        return None, None
-
-    def to_latex(self):
+        writable = self._writable_options()
+        for kind, value, _ in options:
+            writable[kind] = value
+            # \in 默认为内联格式，若子节点需要块级环境，则会覆盖，故不改变符号类型
+            self.symbol_type = _INTEGRAL_SYMBOL_TYPES.get(kind, self.symbol_type)
+
+    def _parts(self):
         """将积分转换为LaTeX格式"""
-        lower = self._format_expression(self.lower_limit) if self.lower_limit is not None else ""
-        upper = self._format_expression(self.upper_limit) if self.upper_limit is not None else ""
-        integrand = self._format_expression(self.integrand)
+        # 除错误恢复留下的 ErrorNode 外，子节点总会生成非空内容，字符串叶子按是否为空判断
+        lower = self.lower_limit if self.lower_limit is not None else ""
+        upper = self.upper_limit if self.upper_limit is not None else ""
+        integrand = self.integrand if self.integrand is not None else ""
+        has_lower = _has_limit(lower)
+        has_upper = _has_limit(upper)
 
         # 根据符号类型选择符号
-        if self.symbol_type == 'sum':
-            symbol = '\\sum'
-        elif self.symbol_type == 'product':
-            symbol = '\\prod'
-        elif self.symbol_type == 'custom':
-            # 对于自定义符号，暂时使用默认积分符号
-            symbol = '\\int'
-        else:
-            symbol = '\\int'
-
-        # 根据是否内联格式决定上下限位置
-        if self.is_block and self.symbol_type in ['sum', 'product']:
-            # 内联格式：限制显示在右侧
-            if upper and lower:
-                return f"{symbol}_{{{lower}}}^{{{upper}}} {{{integrand}}}"
-            elif lower:
-                return f"{symbol}_{{{lower}}} {{{integrand}}}"
-            elif upper:
-                return f"{symbol}^{{{upper}}} {{{integrand}}}"
-            else:
-                return f"{symbol} {{{integrand}}}"
-        else:
-            # 标准格式：限制显示在上下方
-            if upper and lower:
-                return f"{symbol}_{{{lower}}}^{{{upper}}} {{{integrand}}}"
-            elif lower:
-                return f"{symbol}_{{{lower}}} {{{integrand}}}"
-            elif upper:
-                return f"{symbol}^{{{upper}}} {{{integrand}}}"
-            else:
-                return f"{symbol} {{{integrand}}}"
-
-    def _format_expression(self, expr):
-        if expr is None:
-            return ""
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+        symbol = _INTEGRAL_SYMBOLS.get(self.symbol_type, '\\int')
+
+        # 内联与标准格式目前生成相同的上下限写法
+        yield symbol
+        if has_lower:
+            yield "_{"
+            yield lower
+            yield "}"
+        if has_upper:
+            yield "^{"
+            yield upper
+            yield "}"
+        yield " {"
+        yield integrand
+        yield "}"
 
 class List(ASTNode):
     """列表节点"""
+    __slots__ = ('elements',)
+
     def __init__(self, elements):
         super().__init__()
         self.elements = elements if isinstance(elements, list) else [elements]
 
-        for element in self.elements:
-            if isinstance(element, ASTNode):
-                self.is_block = element.is_block or self.is_block
+        self._inherit_block(*self.elements)
 
     def add_element(self, element):
         """添加新元素到列表"""
         self.elements.append(element)
 
-    def to_latex(self):
+    def _parts(self):
         """将列表转换为LaTeX格式，简单用逗号连接"""
-        formatted_elements = []
-        for element in self.elements:
-            if isinstance(element, ASTNode):
-                formatted_elements.append(element.to_latex())
-            else:
-                formatted_elements.append(str(element))
-
-        return ",".join(formatted_elements)
-
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+        for i, element in enumerate(self.elements):
+            if i:
+                yield ","
+            yield element
 
 class Overstrike(ASTNode):
     """重叠指令节点"""
+    __slots__ = ('elements', 'options', 'alignment')
+
     def __init__(self, elements):
         super().__init__()
         self.elements = elements if isinstance(elements, list) else [elements]
-        self.options = {}  # 存储选项值：{al: True, ac: True, ar: True}
+        self.options = _NO_OPTIONS  # 存储选项值：{al: True, ac: True, ar: True}
         self.alignment = 'ac'  # 默认为居中对齐
 
-        for element in self.elements:
-            if isinstance(element, ASTNode):
-                self.is_block = element.is_block or self.is_block
+        self._inherit_block(*self.elements)
 
     def add_element(self, element):
         """添加新元素到重叠列表"""
         self.elements.append(element)
 
     def set_overstrike_options(self, options):
-        """根据重叠选项设置参数"""
+        """根据对齐选项（CommandOption）设置参数"""
         # 从左到右处理选项，后面的会覆盖前面的
-        for option in options:
-            option_type = self._parse_overstrike_option(option)
-            if option_type:
-                self.options[option_type] = True
-                self.alignment = option_type  # 设置对齐方式
-
-    def _parse_overstrike_option(self, option):
-        """解析重叠选项"""
-        # option格式：\al、\ac、\ar
-        if option == '\\al':
-            return 'al'  # 左对齐
-        elif option == '\\ac':
-            return 'ac'  # 居中对齐
-        elif option == '\\ar':
-            return 'ar'  # 右对齐
-        return None
-
-    def to_latex(self):
-        """将重叠元素转换为LaTeX格式，简单用逗号连接"""
-        formatted_elements = []
-        for element in self.elements:
-            if isinstance(element, ASTNode):
-                formatted_elements.append(element.to_latex())
-            else:
-                formatted_elements.append(str(element))
-
-        return ",".join(formatted_elements)
+        writable = self._writable_options()
+        for kind, value, _ in options:
+            writable[kind] = value
+            self.alignment = kind  # 设置对齐方式
 
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+    def _parts(self):
+        """将重叠元素转换为LaTeX格式，简单用逗号连接"""
+        for i, element in enumerate(self.elements):
+            if i:
+                yield ","
+            yield element
 
 class Array(ASTNode):
     """数组指令节点"""
+    __slots__ = ('elements', 'options', 'alignment', 'columns', 'vertical_spacing', 'horizontal_spacing')
+
     def __init__(self, elements):
         super().__init__(is_block=True)  # 强制设置为块级元素
         self.elements = elements if isinstance(elements, list) else [elements]
-        self.options = {}  # 存储选项值：{al: True, ac: True, ar: True, co: n, vs: n, hs: n}
+        self.options = _NO_OPTIONS  # 存储选项值：{al: True, ac: True, ar: True, co: n, vs: n, hs: n}
         self.alignment = 'ac'  # 默认居中对齐
         self.columns = 1  # 默认1列
         self.vertical_spacing = 0  # 默认垂直间距
@@ -509,132 +506,64 @@ class Array(ASTNode):
         self.elements.append(element)
 
     def set_array_options(self, options):
-        """根据数组选项设置参数"""
+        """根据对齐与数组选项（CommandOption）设置参数"""
         # 从左到右处理选项，后面的会覆盖前面的
-        for option in options:
-            option_type, value = self._parse_array_option(option)
-            if option_type:
-                self.options[option_type] = value
-                # 根据选项设置参数
-                if option_type == 'al':
-                    self.alignment = 'al'  # 左对齐
-                elif option_type == 'ac':
-                    self.alignment = 'ac'  # 居中对齐
-                elif option_type == 'ar':
-                    self.alignment = 'ar'  # 右对齐
-                elif option_type == 'co':
-                    self.columns = value  # 列数
-                elif option_type == 'vs':
-                    self.vertical_spacing = value  # 垂直间距（存储但不使用）
-                elif option_type == 'hs':
-                    self.horizontal_spacing = value  # 水平间距（存储但不使用）
-
-    def _parse_array_option(self, option):
-        """解析数组选项"""
-        # option格式：\al、\ac、\ar、\con、\vsn、\hsn
-        if option == '\\al':
-            return 'al', True
-        elif option == '\\ac':
-            return 'ac', True
-        elif option == '\\ar':
-            return 'ar', True
-        elif option.startswith('\\co'):
-            # 提取数字
-            try:
-                value = int(option[3:])
-                return 'co', value
-            except ValueError:
-                return None, None
-        elif option.startswith('\\vs'):
-            # 提取数字
-            try:
-                value = int(option[3:])
-                return 'vs', value
-            except ValueError:
-                return None, None
-        elif option.startswith('\\hs'):
-            # 提取数字
-            try:
-                value = int(option[3:])
-                return 'hs', value
-            except ValueError:
-                return None, None
-        return None, None
-
-    def to_latex(self):
-        """将数组转换为LaTeX的matrix环境格式"""
-        if not self.elements:
-            return "\\begin{matrix}\\end{matrix}"
-        
-        # 格式化元素
-        formatted_elements = []
-        for element in self.elements:
-            if isinstance(element, ASTNode):
-                formatted_elements.append(element.to_latex())
+        writable = self._writable_options()
+        for kind, value, _ in options:
+            if value is None:
+                continue
+            writable[kind] = value
+            if kind in _ALIGNMENTS:
+                self.alignment = kind
             else:
-                formatted_elements.append(str(element))
-        
-        # 按列数排列元素
-        rows = []
-        for i in range(0, len(formatted_elements), self.columns):
-            row_elements = formatted_elements[i:i + self.columns]
-            # 如果行不满，用空字符串填充
-            while len(row_elements) < self.columns:
-                row_elements.append("")
-            rows.append(" & ".join(row_elements))
-        
-        # 生成matrix环境
-        matrix_content = " \\\\ ".join(rows)
-        return f"\\begin{{matrix}}{matrix_content}\\end{{matrix}}"
-
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+                setattr(self, _ARRAY_ATTRIBUTES[kind], value)
+
+    def _parts(self):
+        """将数组转换为LaTeX的matrix环境格式"""
+        yield "\\begin{matrix}"
+        if self.elements:
+            # 按列数排列元素，行内用 & 分隔，行间用 \\ 分隔
+            columns = self.columns
+            for start in range(0, len(self.elements), columns):
+                if start:
+                    yield " \\\\ "
+                row_elements = self.elements[start:start + columns]
+                for i, element in enumerate(row_elements):
+                    if i:
+                        yield " & "
+                    yield element
+                # 如果行不满，用空字符串填充
+                for _ in range(columns - len(row_elements)):
+                    yield " & "
+        yield "\\end{matrix}"
 
 class Box(ASTNode):
     """边框指令节点"""
+    __slots__ = ('content', 'options', 'borders')
+
     def __init__(self, content):
         super().__init__()
         self.content = content
-        self.options = {}  # 存储选项值：{to: True, bo: True, le: True, ri: True}
-        self.borders = set()  # 存储边框类型
+        self.options = _NO_OPTIONS  # 存储选项值：{to: True, bo: True, le: True, ri: True}
+        self.borders = frozenset()  # 存储边框类型
 
-        if isinstance(content, ASTNode):
-            self.is_block = content.is_block or self.is_block
+        self._inherit_block(content)
 
     def set_box_options(self, options):
-        """根据边框选项设置参数"""
+        """根据边框选项（CommandOption）设置参数"""
         # 处理所有选项，可以组合使用
-        for option in options:
-            option_type = self._parse_box_option(option)
-            if option_type:
-                self.options[option_type] = True
-                self.borders.add(option_type)
-
-    def _parse_box_option(self, option):
-        """解析边框选项"""
-        # option格式：\to、\bo、\le、\ri
-        if option == '\\to':
-            return 'to'  # 上边框
-        elif option == '\\bo':
-            return 'bo'  # 下边框
-        elif option == '\\le':
-            return 'le'  # 左边框
-        elif option == '\\ri':
-            return 'ri'  # 右边框
-        return None
-
-    def to_latex(self):
+        writable = self._writable_options()
+        for kind, value, _ in options:
+            writable[kind] = value
+        self.borders = self.borders.union(writable)
+
+    def _parts(self):
         """将边框元素转换为LaTeX格式，只输出括号内的表达式"""
-        if isinstance(self.content, ASTNode):
-            return self.content.to_latex()
-        else:
-            return str(self.content)
+        yield self.content
 
-    def _format_expression(self, expr):
-        if isinstance(expr, ASTNode):
-            return expr.to_latex()
-        else:
-            return str(expr)
+class ErrorNode(ASTNode):
+    """错误恢复时代替出错部分的节点，不输出任何内容"""
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
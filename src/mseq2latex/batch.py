@@ -0,0 +1,113 @@
+import os
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+# 批量转换的单条结果：latex/is_block 与 convert2 的返回值一致，失败时 error 为错误信息，
+# errors 为转换过程中收集到的 ConversionError（成功的转换也可能带有非法字符等错误）
+BatchItem = namedtuple('BatchItem', ['index', 'latex', 'is_block', 'error', 'errors'])
+
+DEFAULT_CHUNKSIZE = 256
+
+# 每个工作进程各自持有的转换器，由 _init_worker 构建一次
+_worker_converter = None
+
+
+def _init_worker(options):
+    """工作进程初始化：只在进程启动时构建一次词法/语法分析器"""
+    global _worker_converter
+    # 结果通过进程间通信返回，工作进程的诊断输出一律写到标准错误，避免混入调用方的标准输出
+    sys.stdout = sys.stderr
+    from .converter import MSEQToLatexConverter
+    from .lexer import get_lexer
+    from .parser import get_parser
+    get_lexer(options.get('lexer_mode', 'ply'))
+    get_parser()
+    _worker_converter = MSEQToLatexConverter(**options)
+
+
+def _convert_chunk(converter, start, texts):
+    """转换一个分块，分块内相同的输入只转换一次"""
+    seen = {}
+    items = []
+    for offset, text in enumerate(texts):
+        if isinstance(text, str):
+            result = seen.get(text)
+            if result is None:
+                result = seen[text] = converter._try_convert(text)
+        else:
+            # 非字符串输入（可能不可哈希）不参与去重，失败记录在该条结果中
+            result = converter._try_convert(text)
+        items.append(BatchItem(start + offset, *result))
+    return items
+
+
+def _run_chunk(start, texts):
+    """在工作进程中转换分块，连同本分块产生的指标一起返回"""
+    items = _convert_chunk(_worker_converter, start, texts)
+    metrics = _worker_converter.metrics
+    return items, metrics.drain() if metrics is not None else None
+
+
+def _chunk_result(converter, future):
+    """取出分块结果，并把工作进程的指标汇总到调用方的汇总器"""
+    items, metrics = future.result()
+    if metrics is not None:
+        converter.metrics.merge(metrics)
+    return items
+
+
+def _chunks(iterable, chunksize):
+    """将输入切分为 (起始下标, 分块) 序列"""
+    iterator = iter(iterable)
+    start = 0
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def convert_many(converter, iterable, workers=None, chunksize=None, ordered=True):
+    """使用进程池批量转换，按需从输入中读取分块，逐条产出 BatchItem"""
+    if chunksize is None:
+        chunksize = DEFAULT_CHUNKSIZE
+    if chunksize < 1:
+        raise ValueError("chunksize 必须为正整数")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    chunks = _chunks(iterable, chunksize)
+
+    if workers <= 1:
+        # 单进程时直接在当前进程中转换，省去进程池开销
+        for start, texts in chunks:
+            yield from _convert_chunk(converter, start, texts)
+        return
+
+    # 限制同时在途的分块数，保证内存占用与输入规模无关
+    max_pending = workers * 2
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(converter._worker_options(),)) as pool:
+        if ordered:
+            pending = deque()
+            for start, texts in chunks:
+                pending.append(pool.submit(_run_chunk, start, texts))
+                if len(pending) >= max_pending:
+                    yield from _chunk_result(converter, pending.popleft())
+            while pending:
+                yield from _chunk_result(converter, pending.popleft())
+        else:
+            pending = set()
+            for start, texts in chunks:
+                pending.add(pool.submit(_run_chunk, start, texts))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from _chunk_result(converter, future)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from _chunk_result(converter, future)
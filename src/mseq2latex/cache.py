@@ -0,0 +1,335 @@
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# 持久缓存的默认容量与每次批量写入的条目数
+DEFAULT_DB_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_WRITE_BATCH = 256
+# 超出容量时删除最久未使用的条目，直到总大小降到容量的该比例以下
+_PRUNE_TARGET = 0.9
+
+# 连续空白折叠为一个空格；紧跟在反斜杠后的字符可能是括号/积分选项的参数，保持原样
+_WHITESPACE_RUN = re.compile(r'(?<!\\)[ \t\n]+')
+# 单字符标记（括号、逗号、分号、操作符）两侧的空格不影响词法分析结果
+_PUNCT_SPACE = re.compile(r'(?<!\\) (?=[{}(),;+\-*/=<>])|(?<=[{}(),;+\-*/=<>]) ')
+_EQ_KEYWORD = re.compile(r'^\{eq')
+
+# 每个缓存条目的固定开销估计（链表节点、元组等）
+_ENTRY_OVERHEAD = 120
+
+
+def normalize_eq_text(eq_text):
+    """归一化EQ域文本，词法分析结果相同的输入得到相同的键"""
+    text = _WHITESPACE_RUN.sub(' ', eq_text.strip(' \t\n'))
+    text = _PUNCT_SPACE.sub('', text)
+    return _EQ_KEYWORD.sub('{EQ', text)
+
+
+def _entry_size(key, value):
+    latex, is_block = value
+    return sys.getsizeof(key) + sys.getsizeof(latex) + _ENTRY_OVERHEAD
+
+
+class ConversionCache:
+    """按总字节数淘汰的LRU转换缓存，键为归一化后的EQ域文本，值为 (LaTeX, is_block)"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __reduce__(self):
+        # 传给工作进程时只复制配置，各进程维护自己的缓存内容
+        return (type(self), (self.max_bytes,))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """查询缓存，未命中返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        size = _entry_size(key, value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """清空缓存内容（保留统计）"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """返回命中、未命中、淘汰次数及容量信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+# 参与生成LaTeX的模块：文法（parsetab 的 _lr_signature）或这些模块变化时，持久缓存中的旧结果全部失效
+_EMITTER_MODULES = ('lexer', 'parser', 'ast_nodes', 'descent')
+
+
+@lru_cache(maxsize=None)
+def converter_version():
+    """当前文法与生成器的版本摘要"""
+    import importlib
+    from . import parsetab
+    digest = hashlib.blake2b(parsetab._lr_signature.encode('utf-8'), digest_size=16)
+    for name in _EMITTER_MODULES:
+        with open(importlib.import_module(f'{__package__}.{name}').__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value) WITHOUT ROWID',
+    """CREATE TABLE IF NOT EXISTS entries (
+        key BLOB PRIMARY KEY,
+        latex TEXT NOT NULL,
+        is_block INTEGER NOT NULL,
+        size INTEGER NOT NULL,
+        used INTEGER NOT NULL
+    ) WITHOUT ROWID""",
+    'CREATE INDEX IF NOT EXISTS entries_used ON entries (used)',
+    "INSERT OR IGNORE INTO meta VALUES ('bytes', 0)",
+    # 由触发器维护条目的总大小，多个进程并发写入时也保持一致
+    """CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+        UPDATE meta SET value = value + NEW.size WHERE name = 'bytes';
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+        UPDATE meta SET value = value - OLD.size WHERE name = 'bytes';
+    END""",
+)
+
+
+class PersistentCache:
+    """保存在本地SQLite数据库（WAL模式）中的转换缓存，跨进程、跨运行共享
+
+    接口与 ConversionCache 相同。键为归一化EQ域文本与 converter_version() 的摘要，
+    文法或生成器变化后旧条目不再命中，打开数据库时发现版本变化会清空旧条目。
+    写入与最近使用时间的更新先在内存中累积，每 write_batch 条（及 flush、进程退出时）在一个事务中写入；
+    总大小超过 max_bytes 时按最近使用时间删除最旧的条目。
+    传给工作进程时只复制路径与配置，每个进程使用各自的数据库连接。
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_DB_MAX_BYTES, write_batch=DEFAULT_WRITE_BATCH):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.write_batch = write_batch
+        self.version = converter_version()
+        self._prefix = self.version.encode('ascii') + b'\0'
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._finalizer = None
+        # 尚未写入的条目（摘要 -> (LaTeX, is_block)）与命中后待更新使用时间的条目
+        self._pending = {}
+        self._touched = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __reduce__(self):
+        return (type(self), (self.path, self.max_bytes, self.write_batch))
+
+    def _connect(self):
+        """当前进程的数据库连接；fork 出的子进程不能沿用父进程的连接，重新打开"""
+        if self._pid != os.getpid():
+            # 转换器导入本模块时不加载 sqlite3，只在使用持久缓存时导入
+            import sqlite3
+            self._pending.clear()
+            self._touched.clear()
+            connection = sqlite3.connect(self.path, timeout=60, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with _transaction(connection):
+                for statement in _SCHEMA:
+                    connection.execute(statement)
+                row = connection.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+                if row is None or row[0] != self.version:
+                    connection.execute('DELETE FROM entries')
+                    connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (self.version,))
+            self._connection = connection
+            self._pid = os.getpid()
+            # 实例被回收或进程退出时（包括进程池的工作进程）写入累积的条目并关闭连接；
+            # Finalize 只在注册它的进程中执行。回调只引用连接与缓冲区，不引用实例，实例可以正常回收
+            from multiprocessing.util import Finalize
+            self._finalizer = Finalize(self, _finalize, (self._lock, connection, self._pending, self._touched,
+                                                         self.max_bytes), exitpriority=10)
+        return self._connection
+
+    def _digest(self, key):
+        return hashlib.blake2b(self._prefix + key.encode('utf-8'), digest_size=16).digest()
+
+    def __len__(self):
+        with self._lock:
+            self._flush()
+            return self._connect().execute('SELECT count(*) FROM entries').fetchone()[0]
+
+    def get(self, key):
+        """查询缓存，未命中返回 None"""
+        digest = self._digest(key)
+        with self._lock:
+            connection = self._connect()
+            value = self._pending.get(digest)
+            if value is None:
+                row = connection.execute('SELECT latex, is_block FROM entries WHERE key = ?', (digest,)).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                value = (row[0], bool(row[1]))
+                self._touched.add(digest)
+            self.hits += 1
+            if len(self._touched) >= self.write_batch:
+                self._flush()
+            return value
+
+    def put(self, key, value):
+        """写入缓存；在内存中累积，满 write_batch 条时批量写入数据库"""
+        digest = self._digest(key)
+        with self._lock:
+            self._connect()
+            self._pending[digest] = value
+            if len(self._pending) >= self.write_batch:
+                self._flush()
+
+    def flush(self):
+        """把累积的写入与使用时间更新写入数据库"""
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._pid != os.getpid():
+            return
+        self.evictions += _flush_entries(self._connection, self._pending, self._touched, self.max_bytes)
+
+    def clear(self):
+        """清空缓存内容（保留统计）"""
+        with self._lock:
+            connection = self._connect()
+            self._pending.clear()
+            self._touched.clear()
+            with _transaction(connection):
+                connection.execute('DELETE FROM entries')
+
+    def close(self):
+        """写入累积的条目并关闭当前进程的连接"""
+        with self._lock:
+            self._flush()
+            if self._pid == os.getpid():
+                self._finalizer.cancel()
+                self._connection.close()
+            self._connection = None
+            self._finalizer = None
+            self._pid = None
+
+    def stats(self):
+        """返回命中、未命中、淘汰次数及容量信息"""
+        with self._lock:
+            self._flush()
+            connection = self._connect()
+            entries = connection.execute('SELECT count(*) FROM entries').fetchone()[0]
+            total = connection.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': total,
+                'max_bytes': self.max_bytes,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _flush_entries(connection, pending, touched, max_bytes):
+    """在一个事务中写入累积的条目与使用时间更新，总大小超过 max_bytes 时淘汰旧条目；返回淘汰的条目数"""
+    if not (pending or touched):
+        return 0
+    now = time.time_ns()
+    evicted = 0
+    with _transaction(connection):
+        connection.executemany(
+            'INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?)',
+            [(digest, latex, is_block, len(digest) + len(latex.encode('utf-8')) + _ENTRY_OVERHEAD, now)
+             for digest, (latex, is_block) in pending.items()])
+        connection.executemany('UPDATE entries SET used = ? WHERE key = ?',
+                               [(now, digest) for digest in touched])
+        total = connection.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+        if total > max_bytes:
+            evicted = _prune(connection, total, max_bytes)
+    pending.clear()
+    touched.clear()
+    return evicted
+
+
+def _prune(connection, total, max_bytes):
+    """按最近使用时间从旧到新删除条目，直到总大小不超过容量的 _PRUNE_TARGET；返回删除的条目数"""
+    excess = total - max_bytes * _PRUNE_TARGET
+    removed = 0
+    keys = []
+    for key, size in connection.execute('SELECT key, size FROM entries ORDER BY used'):
+        if removed >= excess:
+            break
+        removed += size
+        keys.append((key,))
+    connection.executemany('DELETE FROM entries WHERE key = ?', keys)
+    return len(keys)
+
+
+def _finalize(lock, connection, pending, touched, max_bytes):
+    """PersistentCache 被回收或进程退出时调用：写入累积的条目并关闭连接"""
+    with lock:
+        _flush_entries(connection, pending, touched, max_bytes)
+        connection.close()
+
+
+@contextmanager
+def _transaction(connection):
+    """BEGIN IMMEDIATE 事务：开始时即取得写锁，并发写入的进程在 busy timeout 内排队等待"""
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        yield
+    except BaseException:
+        connection.execute('ROLLBACK')
+        raise
+    connection.execute('COMMIT')
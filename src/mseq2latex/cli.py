@@ -0,0 +1,376 @@
+"""mseq2latex 命令行入口"""
+import argparse
+import contextlib
+import json
+import sys
+
+from .cache import DEFAULT_DB_MAX_BYTES
+from .converter import ENGINES, MSEQToLatexConverter
+from .errors import INVALID_INPUT, ConversionError
+from .lexer import LEXER_MODES
+from .stream import DEFAULT_CHUNK_SIZE, DEFAULT_MAX_FIELD_SIZE, replace_stream
+
+
+def _open_inputs(paths):
+    """按顺序打开输入文件，'-' 表示标准输入，产出 (名称, 文件)"""
+    for path in paths or ['-']:
+        if path == '-':
+            yield '<stdin>', sys.stdin
+        else:
+            with open(path, encoding='utf-8') as f:
+                yield path, f
+
+
+def _lines(paths):
+    """产出非空行 (文件名, 行号, 内容)"""
+    for name, f in _open_inputs(paths):
+        for lineno, line in enumerate(f, 1):
+            line = line.rstrip('\r\n')
+            if line.strip():
+                yield name, lineno, line
+
+
+def _field_from_json(line, key):
+    """JSONL的每行可以是字符串，也可以是包含 key 字段的对象；记录无效时抛出 ValueError"""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"无效的JSON: {e.msg}（第 {e.colno} 列）") from None
+    if isinstance(record, dict):
+        if key not in record:
+            raise ValueError(f"缺少字段 {key!r}")
+        record = record[key]
+    if not isinstance(record, str):
+        raise ValueError(f"EQ域必须是字符串，而不是 {type(record).__name__}")
+    return record
+
+
+def _jsonl_fields(lines, key, invalid):
+    for index, (name, lineno, line) in enumerate(lines):
+        try:
+            yield _field_from_json(line, key)
+        except ValueError as e:
+            if invalid is None:
+                raise ValueError(f"{name}:{lineno}: {e}") from None
+            invalid[index] = f"{name}:{lineno}: {e}"
+            yield None
+
+
+def read_fields(paths, input_format='text', key='eq', invalid=None):
+    """惰性读取EQ域：text 为每行一个域，jsonl 为每行一个JSON值
+
+    jsonl 中无效的行（无法解析、缺少 key 字段或值不是字符串）默认抛出 ValueError；
+    传入字典 invalid 时改为产出 None，并以该域的序号为键记录带文件名与行号的错误信息，不中断读取。
+    """
+    lines = _lines(paths)
+    if input_format == 'jsonl':
+        return _jsonl_fields(lines, key, invalid)
+    return (line for _, _, line in lines)
+
+
+def _default(value, default):
+    """未指定的选项（None）取被调模块自己的默认值；这些模块在子命令中才导入，不拖慢命令行启动"""
+    return default if value is None else value
+
+
+def _errors_json(errors):
+    return [error._asdict() for error in errors]
+
+
+def _build_converter(args):
+    cache = None
+    if args.cache_db:
+        if args.cache:
+            raise SystemExit("--cache 与 --cache-db 不能同时使用")
+        from .cache import PersistentCache
+        cache = PersistentCache(args.cache_db, max_bytes=args.cache_db_size * 1024 * 1024)
+    elif args.cache:
+        from .cache import ConversionCache
+        cache = ConversionCache(max_bytes=args.cache * 1024 * 1024)
+    metrics = None
+    if args.metrics:
+        from .metrics import MetricsCollector
+        metrics = MetricsCollector()
+    return MSEQToLatexConverter(cache=cache, engine=args.engine, metrics=metrics, recover=args.recover,
+                                intern_subtrees=args.intern, lexer_mode=args.lexer)
+
+
+@contextlib.contextmanager
+def _metrics_export(converter, path):
+    """转换结束（包括中途失败）时将汇总的指标写出为Prometheus文本文件"""
+    try:
+        yield
+    finally:
+        if path:
+            converter.metrics.write_prometheus(path)
+
+
+def _add_converter_options(parser):
+    parser.add_argument('--cache', type=int, default=0, metavar='MB',
+                        help='每个进程的LRU转换缓存大小（MB），0 表示不使用缓存')
+    parser.add_argument('--cache-db', metavar='FILE',
+                        help='持久转换缓存的SQLite数据库，多个进程与多次运行共享；文法或生成器变化时自动失效')
+    parser.add_argument('--cache-db-size', type=int, default=DEFAULT_DB_MAX_BYTES // (1024 * 1024), metavar='MB',
+                        help='持久缓存的容量（MB），超出时删除最久未使用的条目')
+    parser.add_argument('--engine', choices=ENGINES, default='ply', help='转换引擎')
+    parser.add_argument('--lexer', choices=LEXER_MODES, default='ply',
+                        help="PLY引擎的词法分析器，'table' 为表驱动的快速实现")
+    parser.add_argument('--recover', action='store_true',
+                        help='遇到语法错误时跳过出错的部分继续转换，输出部分结果')
+    parser.add_argument('--intern', action='store_true',
+                        help='在域之间共享结构相同的子树，重复的子表达式只生成一次LaTeX')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='记录各阶段耗时等指标，结束时以Prometheus文本格式写入该文件')
+
+
+def _add_conversion_options(parser):
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='工作进程数，0 表示CPU核数（默认 1）')
+    parser.add_argument('--ordered', action='store_true',
+                        help='按输入顺序输出（默认按完成顺序，以 index 字段对应输入）')
+    parser.add_argument('--chunksize', type=int, default=None, help='每个任务分块包含的域数')
+    _add_converter_options(parser)
+
+
+def run_convert(args):
+    """convert 子命令：流式读取EQ域，逐行输出JSONL结果"""
+    converter = _build_converter(args)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    # 无效的输入行与转换失败一样作为单条错误输出，不中断整批
+    invalid = {}
+    fields = read_fields(args.files, args.input_format, args.key, invalid)
+    workers = args.jobs if args.jobs > 0 else None
+    try:
+        # 转换过程中的诊断信息改写到标准错误，保证标准输出只有JSONL
+        with contextlib.redirect_stdout(sys.stderr), _metrics_export(converter, args.metrics):
+            items = converter.convert_many(fields, workers=workers, chunksize=args.chunksize,
+                                           ordered=args.ordered)
+            for item in items:
+                message = invalid.pop(item.index, None)
+                if message is not None:
+                    error = ConversionError(INVALID_INPUT, message, None, None, None)
+                    item = item._replace(error=message, errors=(error,))
+                record = {
+                    'index': item.index,
+                    'latex': item.latex,
+                    'is_block': item.is_block,
+                    'error': item.error,
+                    'errors': _errors_json(item.errors),
+                }
+                out.write(json.dumps(record, ensure_ascii=False))
+                out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        else:
+            out.flush()
+    return 0
+
+
+def run_docx(args):
+    """docx 子命令：流式提取并转换 .docx 中的EQ域，逐行输出JSONL结果"""
+    from .docx import convert_docx
+
+    converter = _build_converter(args)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    workers = args.jobs if args.jobs > 0 else None
+    try:
+        with contextlib.redirect_stdout(sys.stderr), _metrics_export(converter, args.metrics):
+            for path in args.files:
+                for result in convert_docx(path, converter, workers=workers, chunksize=args.chunksize):
+                    record = {'file': path, **result._asdict(), 'errors': _errors_json(result.errors)}
+                    out.write(json.dumps(record, ensure_ascii=False))
+                    out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        else:
+            out.flush()
+    return 0
+
+
+def run_replace(args):
+    """replace 子命令：流式读取文本，把其中的EQ域替换为LaTeX，其余内容原样输出"""
+    converter = _build_converter(args)
+    out = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        with contextlib.redirect_stdout(sys.stderr), _metrics_export(converter, args.metrics):
+            for path in args.files or ['-']:
+                if path == '-':
+                    stats = replace_stream(sys.stdin.buffer, out, converter, args.read_size, args.max_field)
+                else:
+                    with open(path, 'rb') as f:
+                        stats = replace_stream(f, out, converter, args.read_size, args.max_field)
+                print(f"{path}: 找到 {stats.fields} 个EQ域，替换 {stats.replaced} 个", file=sys.stderr)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+    return 0
+
+
+def run_index(args):
+    """index 子命令：按保存的EQ域索引分片并行转换语料文件，按语料顺序逐行输出JSONL结果"""
+    from .index import DEFAULT_SHARD_SIZE, MAX_FIELD_SIZE_LIMIT, convert_index, open_index
+
+    if args.index and len(args.files) > 1:
+        raise SystemExit("--index 只能与单个语料文件一起使用")
+    if args.max_field > MAX_FIELD_SIZE_LIMIT:
+        raise SystemExit(f"--max-field 不能超过 {MAX_FIELD_SIZE_LIMIT}")
+    converter = _build_converter(args)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    workers = args.jobs if args.jobs > 0 else None
+    try:
+        with contextlib.redirect_stdout(sys.stderr), _metrics_export(converter, args.metrics):
+            for path in args.files:
+                # 先打开索引，报告是否复用；转换时索引已保存，不会重复扫描
+                index, reused = open_index(path, args.index, args.max_field, args.rebuild)
+                print(f"{path}: {len(index)} 个EQ域，{'复用已保存的索引' if reused else '已重新扫描并保存索引'}",
+                      file=sys.stderr)
+                index.close()
+                for item in convert_index(path, converter, workers=workers, shard_size=_default(args.shard_size, DEFAULT_SHARD_SIZE),
+                                          index_path=args.index, max_field_size=args.max_field):
+                    record = {'file': path, **item._asdict(), 'errors': _errors_json(item.errors)}
+                    out.write(json.dumps(record, ensure_ascii=False))
+                    out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        else:
+            out.flush()
+    return 0
+
+
+def run_pipeline_command(args):
+    """pipeline 子命令：把目录中全部文档的转换结果写到输出目录，可中断后重新运行继续"""
+    from .pipeline import DEFAULT_EXTENSIONS, DEFAULT_PROGRESS_INTERVAL, DEFAULT_QUEUE_SIZE, Progress, run_pipeline
+
+    converter = _build_converter(args)
+    interval = _default(args.progress_interval, DEFAULT_PROGRESS_INTERVAL)
+    progress = Progress(sys.stderr, interval) if interval > 0 else None
+    with contextlib.redirect_stdout(sys.stderr), _metrics_export(converter, args.metrics):
+        stats = run_pipeline(args.inputs, args.output, converter, manifest_path=args.manifest,
+                             extensions=tuple(args.ext or DEFAULT_EXTENSIONS),
+                             extract_workers=args.extract_workers,
+                             convert_workers=args.jobs if args.jobs >= 0 else None,
+                             write_workers=args.write_workers, queue_size=_default(args.queue_size, DEFAULT_QUEUE_SIZE),
+                             recycle_after=args.recycle_after or None, chunksize=args.chunksize,
+                             progress=progress)
+    return 1 if stats.failed else 0
+
+
+def run_serve(args):
+    """serve 子命令：常驻转换服务，预热工作进程并把并发请求合并为微批次"""
+    import asyncio
+    from .server import DEFAULT_HOST, DEFAULT_MAX_BATCH, DEFAULT_MAX_DELAY, DEFAULT_MAX_QUEUE, DEFAULT_PORT, serve
+
+    converter = _build_converter(args)
+    workers = args.jobs if args.jobs >= 0 else None
+
+    def ready(address):
+        where = address if isinstance(address, str) else f"http://{address[0]}:{address[1]}"
+        print(f"mseq2latex 转换服务已启动: {where}", file=sys.stderr, flush=True)
+
+    with contextlib.redirect_stdout(sys.stderr), _metrics_export(converter, args.metrics):
+        max_delay = DEFAULT_MAX_DELAY if args.max_delay is None else args.max_delay / 1000
+        asyncio.run(serve(converter, _default(args.host, DEFAULT_HOST), _default(args.port, DEFAULT_PORT),
+                          args.unix, workers, _default(args.max_batch, DEFAULT_MAX_BATCH), max_delay,
+                          _default(args.max_queue, DEFAULT_MAX_QUEUE), on_ready=ready))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='mseq2latex',
+                                     description='将 Microsoft EQ 域转换为 LaTeX')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert = subparsers.add_parser('convert', help='流式转换文本或JSONL中的EQ域，输出JSONL')
+    convert.add_argument('files', nargs='*', help="输入文件，默认或 '-' 为标准输入")
+    convert.add_argument('-f', '--input-format', choices=('text', 'jsonl'), default='text',
+                         help='text：每行一个EQ域；jsonl：每行一个JSON字符串或对象')
+    convert.add_argument('--key', default='eq', help='jsonl 对象中EQ域所在的字段（默认 eq）')
+    convert.add_argument('-o', '--output', help='输出文件，默认为标准输出')
+    _add_conversion_options(convert)
+    convert.set_defaults(handler=run_convert)
+
+    docx = subparsers.add_parser('docx', help='流式提取并转换 .docx 文档中的EQ域，输出JSONL')
+    docx.add_argument('files', nargs='+', help='.docx 文件')
+    docx.add_argument('-o', '--output', help='输出文件，默认为标准输出')
+    _add_conversion_options(docx)
+    docx.set_defaults(handler=run_docx)
+
+    replace = subparsers.add_parser('replace', help='流式替换文本中嵌入的EQ域，其余内容原样输出')
+    replace.add_argument('files', nargs='*', help="输入文件，默认或 '-' 为标准输入；多个文件依次输出")
+    replace.add_argument('-o', '--output', help='输出文件，默认为标准输出')
+    replace.add_argument('--read-size', type=int, default=DEFAULT_CHUNK_SIZE, metavar='BYTES',
+                         help='每次读取的字节数')
+    replace.add_argument('--max-field', type=int, default=DEFAULT_MAX_FIELD_SIZE, metavar='BYTES',
+                         help='单个域的最大字节数，超过时按普通文本输出')
+    _add_converter_options(replace)
+    replace.set_defaults(handler=run_replace)
+
+    index = subparsers.add_parser('index', help='为大语料建立EQ域索引（可复用），分片并行转换，输出JSONL')
+    index.add_argument('files', nargs='+', help='语料文件')
+    index.add_argument('-o', '--output', help='输出文件，默认为标准输出')
+    index.add_argument('--index', help='索引文件路径，默认为语料路径加 .eqidx（只能用于单个语料文件）')
+    index.add_argument('--rebuild', action='store_true', help='忽略已保存的索引，重新扫描')
+    index.add_argument('-j', '--jobs', type=int, default=1,
+                       help='工作进程数，0 表示CPU核数（默认 1）')
+    index.add_argument('--shard-size', type=int, help='每个分片包含的域数（默认 4096）')
+    index.add_argument('--max-field', type=int, default=DEFAULT_MAX_FIELD_SIZE, metavar='BYTES',
+                       help='单个域的最大字节数，超过时不计为EQ域')
+    _add_converter_options(index)
+    index.set_defaults(handler=run_index)
+
+    pipeline = subparsers.add_parser('pipeline', help='批量转换目录中的 .docx/文本文件，每个文件输出一个JSONL，可断点续跑')
+    pipeline.add_argument('inputs', nargs='+', help='输入目录或文件')
+    pipeline.add_argument('-o', '--output', required=True, help='输出目录，结果按输入的相对路径加 .jsonl 保存')
+    pipeline.add_argument('--manifest', help='完成清单路径，默认为输出目录下的 manifest.jsonl')
+    pipeline.add_argument('--ext', action='append', metavar='SUFFIX',
+                          help="要处理的文件扩展名，可重复指定（默认 .docx .txt .md）")
+    pipeline.add_argument('--extract-workers', type=int, default=2, help='提取阶段的线程数')
+    pipeline.add_argument('-j', '--jobs', type=int, default=-1,
+                          help='转换进程数，0 表示在当前进程中转换（默认CPU核数）')
+    pipeline.add_argument('--write-workers', type=int, default=1, help='写出阶段的线程数')
+    pipeline.add_argument('--queue-size', type=int,
+                          help='阶段之间每个队列最多容纳的文件数（默认 64）')
+    pipeline.add_argument('--recycle-after', type=int, default=0, metavar='N',
+                          help='每个转换进程处理 N 个分块后更换进程，0 表示不更换')
+    pipeline.add_argument('--chunksize', type=int, default=None, help='每个任务分块包含的域数')
+    pipeline.add_argument('--progress-interval', type=float, metavar='SECONDS',
+                          help='进度行的输出间隔（默认 5 秒），0 表示不输出')
+    _add_converter_options(pipeline)
+    pipeline.set_defaults(handler=run_pipeline_command)
+
+    serve = subparsers.add_parser('serve', help='常驻转换服务（HTTP），预热工作进程并合并并发请求为微批次')
+    serve.add_argument('--host', help='监听地址（默认 127.0.0.1）')
+    serve.add_argument('--port', type=int, help='监听端口（默认 8765，0 为任意空闲端口）')
+    serve.add_argument('--unix', metavar='PATH', help='改为监听该 Unix 套接字')
+    serve.add_argument('-j', '--jobs', type=int, default=-1,
+                       help='工作进程数，0 表示在当前进程中转换（默认CPU核数）')
+    serve.add_argument('--max-batch', type=int, help='每个微批次最多包含的域数（默认 64）')
+    serve.add_argument('--max-delay', type=float, metavar='MS',
+                       help='凑不满一批时最早的域最多等待的毫秒数（默认 2）')
+    serve.add_argument('--max-queue', type=int,
+                       help='已接受但尚未返回的域数上限，超出时立即以 503 拒绝（默认 4096）')
+    _add_converter_options(serve)
+    serve.set_defaults(handler=run_serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # 下游提前关闭管道（如 head）时安静退出
+        sys.stderr.close()
+        return 1
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,50 +1,334 @@
-from .lexer import lexer
-from .parser import parser
+import copy
+import threading
+import time
+
+from .lexer import LEXER_MODES, get_lexer
+from .parser import get_parser
+from .cache import normalize_eq_text
+from .ast_nodes import count_nodes
+from .errors import EXCEPTION, ConversionError, ConversionResult, ParseAborted, collect
+from .metrics import ConversionMetrics, MetricsCollector, TimedLexer
+from . import descent
+
+ENGINES = ('ply', 'descent')
+
+def _check_text(eq_text):
+    """输入必须是字符串：PLY 收到 None 时会继续读取词法分析器上一次的输入"""
+    if not isinstance(eq_text, str):
+        raise TypeError(f"EQ域文本必须是字符串，而不是 {type(eq_text).__name__}")
+
+def _exception_error(e):
+    """把转换过程中抛出的异常记录为 EXCEPTION 错误"""
+    return ConversionError(EXCEPTION, str(e) or type(e).__name__, None, None, None)
+
+def _print_errors(errors):
+    """按 convert 的格式逐条打印错误信息"""
+    for error in errors:
+        if error.kind == EXCEPTION:
+            print(f"转换错误: {error.message}")
+        else:
+            print(error.message)
 
 class MSEQToLatexConverter:
     """Microsoft EQ到LaTeX转换器"""
 
-    def __init__(self):
-        self.lexer = lexer
-        self.parser = parser
+    def __init__(self, async_workers=4, cache=None, engine='ply', metrics=None, recover=False,
+                 intern_subtrees=False, lexer_mode='ply'):
+        if engine not in ENGINES:
+            raise ValueError(f"未知的转换引擎: {engine}")
+        if lexer_mode not in LEXER_MODES:
+            raise ValueError(f"未知的词法分析模式: {lexer_mode}")
+        # 转换引擎：'ply' 为LALR分析+AST，'descent' 为单遍递归下降（无法处理的输入自动回退到PLY）
+        self.engine = engine
+        # 每个线程持有各自的词法/语法分析器副本，转换器实例可被多个线程同时使用
+        self._local = threading.local()
+        # 可选的转换缓存（如 ConversionCache，或跨进程与运行共享的 PersistentCache），键为归一化后的EQ域文本
+        self.cache = cache
+        # 可选的指标钩子：每次转换以一个 ConversionMetrics 调用（如 MetricsCollector），为 None 时不计时
+        self.metrics = metrics
+        # 遇到语法错误时是否跳过出错的部分继续转换（部分结果与错误一起返回）
+        self.recover = recover
+        # 是否在各线程的语法分析器上驻留结构相同的子树（见 interning），跨域共享节点并缓存其输出
+        self.intern_subtrees = intern_subtrees
+        # PLY引擎使用的词法分析器：'ply' 为PLY的词法分析器，'table' 为表驱动的 TableLexer（标记序列相同）
+        self.lexer_mode = lexer_mode
+        self.async_workers = async_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
 
-    def convert(self, eq_text):
-        """将EQ域文本转换为LaTeX"""
+    @property
+    def lexer(self):
+        """当前线程专用的词法分析器（共享规则表，独立的输入与行号状态）"""
+        try:
+            return self._local.lexer
+        except AttributeError:
+            self._local.lexer = get_lexer(self.lexer_mode).clone()
+            return self._local.lexer
+
+    @property
+    def parser(self):
+        """当前线程专用的语法分析器（共享分析表，独立的分析栈）"""
+        try:
+            return self._local.parser
+        except AttributeError:
+            parser = copy.copy(get_parser())
+            if self.intern_subtrees:
+                from .interning import SubtreeInterner
+                parser.interner = SubtreeInterner()
+            self._local.parser = parser
+            return parser
+
+    @property
+    def interner(self):
+        """当前线程语法分析器的 SubtreeInterner，未开启子树驻留时为 None"""
+        return self.parser.interner
+
+    def _emit(self, tree):
+        """生成LaTeX；开启子树驻留时被复用的子树只展开一次"""
+        interner = self.parser.interner
+        if interner is None:
+            return tree.to_latex()
+        return interner.to_latex(tree)
+
+    def _emit_into(self, tree, writer):
+        """与 _emit 相同，但把片段写入 writer"""
+        interner = self.parser.interner
+        if interner is None:
+            tree.to_latex_into(writer)
+        else:
+            interner.to_latex_into(tree, writer)
+
+    def _async_executor(self):
+        """异步接口使用的有界线程池，首次使用时创建"""
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.async_workers,
+                                                        thread_name_prefix="mseq2latex")
+        return self._executor
+
+    def close(self):
+        """关闭异步接口使用的线程池"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def _worker_options(self):
+        """在工作进程中重建等价转换器所需的构造参数"""
+        options = {'cache': self.cache, 'engine': self.engine, 'recover': self.recover,
+                   'intern_subtrees': self.intern_subtrees, 'lexer_mode': self.lexer_mode}
+        # 只有汇总器能在工作进程中重建并汇总回来，其他钩子只作用于当前进程
+        if isinstance(self.metrics, MetricsCollector):
+            options['metrics'] = self.metrics
+        return options
+
+    def _convert_result(self, eq_text, recover=None):
+        """转换EQ域文本，返回 ConversionResult；错误被收集到结果中，不打印也不抛出异常"""
+        if recover is None:
+            recover = self.recover
+        if self.cache is None:
+            return self._convert_collected(eq_text, recover)
+
+        # 缓存只保存没有错误的结果：它们与错误恢复选项无关，也不含依赖原文空白的错误位置
         try:
-            # 词法分析
-            self.lexer.input(eq_text)
+            _check_text(eq_text)
+            key = normalize_eq_text(eq_text)
+        except Exception as e:
+            # 非字符串等无法规范化的输入与其他转换失败一样记录为错误，不中断批量转换
+            return ConversionResult(None, None, (_exception_error(e),))
+        cached = self.cache.get(key)
+        if cached is not None:
+            latex, is_block = cached
+            if self.metrics is not None:
+                self.metrics(ConversionMetrics('cache', None, None, None, None, None, len(latex), False))
+            return ConversionResult(latex, is_block, ())
 
-            # 语法分析
-            result = self.parser.parse(eq_text, lexer=self.lexer)
+        result = self._convert_collected(eq_text, recover)
+        if not result.errors and result.latex is not None:
+            self.cache.put(key, (result.latex, result.is_block))
+        return result
 
-            if result:
-                res = result.to_latex()
-                if result.is_block:
-                    return f"\\[ {res} \\]"
+    def _convert_collected(self, eq_text, recover):
+        with collect(eq_text, recover) as found:
+            try:
+                _check_text(eq_text)
+                if self.metrics is None:
+                    latex, is_block = self._convert_uncached(eq_text)
                 else:
-                    return f"$ {res} $"
+                    latex, is_block = self._convert_measured(eq_text)
+            except Exception as e:
+                latex = is_block = None
+                found.append(_exception_error(e))
+        return ConversionResult(latex, is_block, tuple(found))
+
+    def _convert_uncached(self, eq_text):
+        if self.engine == 'descent':
+            try:
+                return descent.convert(eq_text)
+            except descent.DescentFallback:
+                pass
+        return self._convert_ply(eq_text)
+
+    def _parse(self, eq_text):
+        """语法分析，返回AST，无法解析时返回 None"""
+        lexer = self.lexer
+        lexer.lineno = 1
+
+        # 词法分析按需进行：输入只经 parse 交给词法分析器一次
+        try:
+            return self.parser.parse(eq_text, lexer=lexer) or None
+        except ParseAborted:
+            return None
+
+    def _convert_ply(self, eq_text):
+        result = self._parse(eq_text)
+        if result is None:
+            return None, None
+        return self._emit(result), result.is_block
+
+    def _convert_measured(self, eq_text):
+        """与 _convert_uncached 相同，同时把各阶段耗时与规模报告给指标钩子"""
+        if self.engine == 'descent':
+            start = time.perf_counter()
+            try:
+                latex, is_block = descent.convert(eq_text)
+            except descent.DescentFallback:
+                pass
             else:
-                return None
+                self.metrics(ConversionMetrics('descent', None, time.perf_counter() - start, None,
+                                               None, None, len(latex), False))
+                return latex, is_block
+        return self._convert_ply_measured(eq_text)
 
-        except Exception as e:
-            print(f"转换错误: {e}")
+    def _convert_ply_measured(self, eq_text):
+        self.lexer.lineno = 1
+        lexer = TimedLexer(self.lexer)
+        parse_seconds = emit_seconds = nodes = output_length = None
+        error = True
+        try:
+            # 词法分析按需进行，其耗时由 TimedLexer 单独累计，从语法分析耗时中扣除
+            start = time.perf_counter()
+            try:
+                result = self.parser.parse(eq_text, lexer=lexer)
+            except ParseAborted:
+                result = None
+            parse_seconds = time.perf_counter() - start - lexer.seconds
+            if not result:
+                return None, None
+
+            start = time.perf_counter()
+            latex = self._emit(result)
+            emit_seconds = time.perf_counter() - start
+            nodes = count_nodes(result)
+            output_length = len(latex)
+            error = False
+            return latex, result.is_block
+        finally:
+            self.metrics(ConversionMetrics('ply', lexer.seconds, parse_seconds, emit_seconds,
+                                           lexer.tokens, nodes, output_length, error))
+
+    def _convert(self, eq_text):
+        """转换EQ域文本，返回 (LaTeX, is_block)，无法解析时返回 (None, None)，错误信息逐条打印"""
+        result = self._convert_result(eq_text)
+        _print_errors(result.errors)
+        return result.latex, result.is_block
+
+    def _try_convert(self, eq_text):
+        """转换EQ域文本，返回 (LaTeX, is_block, 错误信息, 错误列表)，不打印也不抛出异常"""
+        latex, is_block, found = self._convert_result(eq_text)
+        if latex is not None:
+            return latex, is_block, None, found
+        if found:
+            return None, None, "; ".join(error.message for error in found), found
+        return None, None, "无法解析EQ域", found
+
+    def convert_result(self, eq_text, recover=None):
+        """将EQ域文本转换为LaTeX，返回 ConversionResult(latex, is_block, errors)
+
+        错误以 ConversionError 记录在 errors 中（含种类与在输入中的位置），不会打印。
+        recover 为 True 时在语法错误处跳过出错的部分，继续转换域的其余内容；默认取构造时的设置。
+        """
+        return self._convert_result(eq_text, recover)
+
+    def convert(self, eq_text):
+        """将EQ域文本转换为LaTeX"""
+        res, is_block = self._convert(eq_text)
+        if res is None:
             return None
+        elif is_block:
+            return f"\\[ {res} \\]"
+        else:
+            return f"$ {res} $"
+
+    def convert_into(self, eq_text, writer):
+        """与 convert 相同，但把结果（连同 $ $ 或 \\[ \\] 定界符）直接写入 writer，不拼接完整的结果字符串
+
+        writer 为列表（片段追加到末尾）或带 write 方法的对象（如以文本模式打开的输出文件），
+        批量转换时可直接写入输出文件。返回 is_block；无法转换时不写入任何内容，返回 None。
+        AST生成的片段先暂存在列表中（只保存引用，不复制字符），生成成功后才写出，出错时不会留下半个结果。
+        使用缓存、指标钩子或 descent 引擎时结果本身就是一个字符串，直接写出。
+        """
+        if self.cache is not None or self.metrics is not None or self.engine != 'ply':
+            latex, is_block = self._convert(eq_text)
+            if latex is None:
+                return None
+            parts = (latex,)
+        else:
+            parts = []
+            with collect(eq_text, self.recover) as found:
+                try:
+                    tree = None
+                    _check_text(eq_text)
+                    tree = self._parse(eq_text)
+                    if tree is not None:
+                        self._emit_into(tree, parts)
+                except Exception as e:
+                    tree = None
+                    found.append(_exception_error(e))
+            _print_errors(found)
+            if tree is None:
+                return None
+            is_block = tree.is_block
+
+        write = writer.append if isinstance(writer, list) else writer.write
+        write("\\[ " if is_block else "$ ")
+        for part in parts:
+            write(part)
+        write(" \\]" if is_block else " $")
+        return is_block
 
     def convert2(self, eq_text):
         """将EQ域文本转换为LaTeX"""
-        try:
-            # 词法分析
-            self.lexer.input(eq_text)
+        return self._convert(eq_text)
 
-            # 语法分析
-            result = self.parser.parse(eq_text, lexer=self.lexer)
+    def convert_many(self, eq_texts, workers=None, chunksize=None, ordered=True):
+        """使用进程池批量转换EQ域文本
 
-            if result:
-                res = result.to_latex()
-                return res, result.is_block
-            else:
-                return None, None
+        按分块分发到 workers 个工作进程（默认为CPU核数），分块内相同的输入只转换一次。
+        chunksize 默认为 batch.DEFAULT_CHUNKSIZE。
+        返回 BatchItem 迭代器，ordered=False 时按完成顺序产出；单条失败记录在 error 中，不会中断整批。
+        """
+        from . import batch
+        return batch.convert_many(self, eq_texts, workers=workers, chunksize=chunksize, ordered=ordered)
 
-        except Exception as e:
-            print(f"转换错误: {e}")
-            return None, None
+    def session(self, eq_text):
+        """创建增量转换会话，用于实时预览：每次编辑只重新分析包含编辑范围的最内层命令"""
+        from .incremental import EditSession
+        return EditSession(self, eq_text)
+
+    async def convert_async(self, eq_text):
+        """异步转换EQ域文本，转换在后台线程池中执行，结果与 convert 相同"""
+        from . import aio
+        return await aio.convert_async(self, eq_text)
+
+    def aconvert_stream(self, eq_texts, limit=None):
+        """异步流式转换，eq_texts 可为同步或异步可迭代对象
+
+        按输入顺序逐条产出 convert 的结果，同时在途的转换不超过 limit 个（默认为 aio.DEFAULT_STREAM_LIMIT）。
+        """
+        from . import aio
+        if limit is None:
+            limit = aio.DEFAULT_STREAM_LIMIT
+        return aio.aconvert_stream(self, eq_texts, limit=limit)
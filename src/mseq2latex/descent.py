@@ -0,0 +1,299 @@
+"""单遍递归下降转换引擎
+
+边扫描边分析，直接生成LaTeX，不经过PLY的LR驱动、LexToken对象和AST节点。
+输出与PLY引擎逐字节一致；遇到无法处理的输入（语法错误、非法字符、异常）时
+抛出 DescentFallback，由调用方交回PLY引擎处理，以保证错误行为一致。
+"""
+import re
+
+from . import lexer as _rules
+from .ast_nodes import WideText
+
+
+class DescentFallback(Exception):
+    """递归下降引擎无法处理当前输入"""
+
+
+# 忽略字符最先匹配，其余规则与PLY主正则顺序一致，最后用单字符兜底捕获非法字符
+_SCANNER = re.compile(
+    '|'.join([f'(?P<ignore>[{re.escape(_rules.t_ignore)}]+)']
+             + [f'(?P<{name}>{regex})' for name, regex in _rules.token_specification()]
+             + [r'(?P<illegal>[\s\S])']),
+    re.VERBOSE)
+
+# 可以开始一个表达式的标记
+_EXPRESSION_START = frozenset([
+    'CMD_FRACTION', 'CMD_RADICAL', 'CMD_SUP', 'CMD_SUB', 'CMD_ALIGN_INC', 'CMD_ALIGN_DEC',
+    'CMD_BRACKET', 'CMD_DISPLACE', 'CMD_INTEGRAL', 'CMD_LIST', 'CMD_OVERSTRIKE',
+    'CMD_ARRAY', 'CMD_BOX', 'IDENTIFIER', 'NUMBER', 'TEXT', 'OPERATOR',
+])
+
+# 表达式种类：决定序列中的空格与 \text{} 包装，以及能否作为整个EQ域
+_TEXT = 0      # 字符串叶子（标识符、文本、操作符）
+_NUMBER = 1    # 数字叶子
+_NODE = 2      # 命令或序列
+_SCRIPT = 3    # 上标/下标命令
+
+_LATEX_BRACKETS = {
+    '{': '\\{',
+    '}': '\\}',
+    '<': '\\langle',
+    '>': '\\rangle',
+    '\\': '\\backslash',
+}
+_CORRESPONDING_BRACKETS = {
+    '(': ')',
+    '[': ']',
+    '{': '}',
+    '<': '>',
+}
+_INTEGRAL_SYMBOLS = {
+    'su': '\\sum',
+    'pr': '\\prod',
+}
+
+
+def _scan(eq_text):
+    """生成 (标记类型, 值) 序列，以 ('$end', None) 结束"""
+    for match in _SCANNER.finditer(eq_text):
+        kind = match.lastgroup
+        if kind == 'ignore' or kind == 'newline':
+            continue
+        if kind == 'illegal':
+            raise DescentFallback
+        value = match.group()
+        if kind == 'TEXT' and _rules.WIDE_SCRIPT.search(value):
+            # 与词法分析器相同，扫描时分类一次
+            value = WideText(value)
+        elif kind in _rules.OPTION_TOKENS:
+            value = _rules.decode_option(value)
+        yield kind, value
+    yield '$end', None
+
+
+class _Parser:
+    """从扫描器按需取标记，每个产生式直接返回 (LaTeX, is_block, 种类)"""
+
+    def __init__(self, eq_text):
+        self._next = _scan(eq_text).__next__
+        self.type, self.value = self._next()
+
+    def advance(self):
+        value = self.value
+        self.type, self.value = self._next()
+        return value
+
+    def expect(self, kind):
+        if self.type != kind:
+            raise DescentFallback
+        return self.advance()
+
+    def options(self, *kinds):
+        options = []
+        while self.type in kinds:
+            options.append(self.advance())
+        return options
+
+    def eq_field(self):
+        self.expect('LBRACE')
+        self.expect('EQ')
+        latex, is_block, kind = self.expression()
+        self.expect('RBRACE')
+        if self.type != '$end' or kind < _NODE:
+            # 域后还有多余内容，或单个叶子不构成AST节点，交回PLY引擎以保持原有行为
+            raise DescentFallback
+        return latex, is_block
+
+    def expression(self):
+        first = self.term()
+        if self.type not in _EXPRESSION_START:
+            return first
+
+        # 与PLY文法的扁平序列一致：元素之间加空格，上标/下标前不加
+        terms = [first]
+        while self.type in _EXPRESSION_START:
+            terms.append(self.term())
+        last = len(terms) - 1
+        parts = []
+        is_block = False
+        for i, (latex, block, kind) in enumerate(terms):
+            if kind == _TEXT and latex.__class__ is WideText:
+                latex = f"\\text{{{latex}}}"
+            parts.append(latex)
+            if i < last and terms[i + 1][2] != _SCRIPT:
+                parts.append(" ")
+            is_block = is_block or block
+        return ''.join(parts), is_block, _NODE
+
+    def term(self):
+        kind = self.type
+        if kind == 'IDENTIFIER' or kind == 'TEXT' or kind == 'OPERATOR':
+            return self.advance(), False, _TEXT
+        if kind == 'NUMBER':
+            return str(int(self.advance())), False, _NUMBER
+        method = _COMMANDS.get(kind)
+        if method is None:
+            raise DescentFallback
+        self.advance()
+        return method(self)
+
+    def argument(self):
+        latex, is_block, _ = self.expression()
+        return latex, is_block
+
+    def arguments(self, *separators):
+        latex, is_block = self.argument()
+        elements = [latex]
+        while self.type in separators:
+            self.advance()
+            latex, block = self.argument()
+            elements.append(latex)
+            is_block = is_block or block
+        return elements, is_block
+
+    def fraction(self):
+        self.expect('LPAREN')
+        numerator, num_block = self.argument()
+        if self.type != 'COMMA' and self.type != 'SEMICOLON':
+            raise DescentFallback
+        self.advance()
+        denominator, den_block = self.argument()
+        self.expect('RPAREN')
+        return f"\\frac{{{numerator}}}{{{denominator}}}", num_block or den_block, _NODE
+
+    def radical(self):
+        self.expect('LPAREN')
+        first, first_block = self.argument()
+        if self.type == 'COMMA':
+            self.advance()
+            radicand, is_block = self.argument()
+            self.expect('RPAREN')
+            return f"\\sqrt[{first}]{{{radicand}}}", is_block or first_block, _NODE
+        self.expect('RPAREN')
+        return f"\\sqrt{{{first}}}", first_block, _NODE
+
+    def _single_argument(self):
+        self.expect('LPAREN')
+        content = self.argument()
+        self.expect('RPAREN')
+        return content
+
+    def superscript(self):
+        content, is_block = self._single_argument()
+        return f"^{{{content}}}", is_block, _SCRIPT
+
+    def subscript(self):
+        content, is_block = self._single_argument()
+        return f"_{{{content}}}", is_block, _SCRIPT
+
+    def space(self):
+        content, is_block = self._single_argument()
+        return content, is_block, _NODE
+
+    def bracket(self):
+        left, right = '(', ')'
+        for option_type, char, _ in self.options('BRACKET_OPTION'):
+            if option_type == 'lc':
+                left = char
+            elif option_type == 'rc':
+                right = char
+            else:
+                left = char
+                right = _CORRESPONDING_BRACKETS.get(char, char)
+        content, is_block = self._single_argument()
+        left = _LATEX_BRACKETS.get(left, left)
+        right = _LATEX_BRACKETS.get(right, right)
+        return f"\\left{left} {content} \\right{right}", is_block, _NODE
+
+    def displace(self):
+        self.options('DISPLACE_OPTION')
+        self.expect('LPAREN')
+        if self.type == 'RPAREN':
+            self.advance()
+            return "\\text{}", False, _NODE
+        content, is_block = self.argument()
+        self.expect('RPAREN')
+        return f"\\text{{{content}}}", is_block, _NODE
+
+    def integral(self):
+        symbol = '\\int'
+        for option in self.options('INTEGRAL_OPTION'):
+            if option.kind != 'in':
+                symbol = _INTEGRAL_SYMBOLS.get(option.kind, '\\int')
+        self.expect('LPAREN')
+        lower, lower_block = self.argument()
+        self.expect('COMMA')
+        upper, upper_block = self.argument()
+        self.expect('COMMA')
+        integrand, integrand_block = self.argument()
+        self.expect('RPAREN')
+        is_block = lower_block or upper_block or integrand_block
+        if upper and lower:
+            return f"{symbol}_{{{lower}}}^{{{upper}}} {{{integrand}}}", is_block, _NODE
+        elif lower:
+            return f"{symbol}_{{{lower}}} {{{integrand}}}", is_block, _NODE
+        elif upper:
+            return f"{symbol}^{{{upper}}} {{{integrand}}}", is_block, _NODE
+        return f"{symbol} {{{integrand}}}", is_block, _NODE
+
+    def list(self):
+        self.expect('LPAREN')
+        elements, is_block = self.arguments('COMMA', 'SEMICOLON')
+        self.expect('RPAREN')
+        return ",".join(elements), is_block, _NODE
+
+    def overstrike(self):
+        self.options('ALIGNMENT_OPTION')
+        self.expect('LPAREN')
+        elements, is_block = self.arguments('COMMA')
+        self.expect('RPAREN')
+        return ",".join(elements), is_block, _NODE
+
+    def array(self):
+        columns = 1
+        for option in self.options('ALIGNMENT_OPTION', 'ARRAY_OPTION'):
+            if option.kind == 'co' and option.value is not None:
+                columns = option.value
+        self.expect('LPAREN')
+        elements, _ = self.arguments('COMMA')
+        self.expect('RPAREN')
+        rows = []
+        for i in range(0, len(elements), columns):
+            row = elements[i:i + columns]
+            row.extend([""] * (columns - len(row)))
+            rows.append(" & ".join(row))
+        matrix_content = " \\\\ ".join(rows)
+        return f"\\begin{{matrix}}{matrix_content}\\end{{matrix}}", True, _NODE
+
+    def box(self):
+        self.options('BOX_OPTION')
+        content, is_block = self._single_argument()
+        return content, is_block, _NODE
+
+
+_COMMANDS = {
+    'CMD_FRACTION': _Parser.fraction,
+    'CMD_RADICAL': _Parser.radical,
+    'CMD_SUP': _Parser.superscript,
+    'CMD_SUB': _Parser.subscript,
+    'CMD_ALIGN_INC': _Parser.space,
+    'CMD_ALIGN_DEC': _Parser.space,
+    'CMD_BRACKET': _Parser.bracket,
+    'CMD_DISPLACE': _Parser.displace,
+    'CMD_INTEGRAL': _Parser.integral,
+    'CMD_LIST': _Parser.list,
+    'CMD_OVERSTRIKE': _Parser.overstrike,
+    'CMD_ARRAY': _Parser.array,
+    'CMD_BOX': _Parser.box,
+}
+
+
+def convert(eq_text):
+    """转换EQ域文本，返回 (LaTeX, is_block)；无法处理时抛出 DescentFallback"""
+    try:
+        return _Parser(eq_text).eq_field()
+    except DescentFallback:
+        raise
+    except Exception as e:
+        # 递归过深、列数为0等异常同样交回PLY引擎，由其给出一致的错误
+        raise DescentFallback from e
@@ -0,0 +1,120 @@
+"""流式提取并转换 .docx 中的 EQ 域
+
+用 iterparse 逐元素解析 word/document.xml，处理完的段落立即释放，内存占用与文档大小无关。
+支持 w:fldSimple 简单域，以及由 w:fldChar begin/separate/end 分隔、域代码分散在多个
+w:instrText 运行中的复杂域。
+"""
+import zipfile
+from collections import deque, namedtuple
+from xml.etree.ElementTree import iterparse
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_BODY = _W + 'body'
+_PARAGRAPH = _W + 'p'
+_RUN = _W + 'r'
+_FLD_SIMPLE = _W + 'fldSimple'
+_FLD_CHAR = _W + 'fldChar'
+_INSTR_TEXT = _W + 'instrText'
+_INSTR = _W + 'instr'
+_FLD_CHAR_TYPE = _W + 'fldCharType'
+
+DOCUMENT_PART = 'word/document.xml'
+
+# 文档中的一个EQ域：paragraph 为段落序号（按文档顺序，含表格内段落），run 为域开始处在段落内的运行序号
+DocxField = namedtuple('DocxField', ['paragraph', 'run', 'code'])
+# 转换结果：latex/is_block 与 convert2 一致，失败时 error 为错误信息，errors 为收集到的 ConversionError
+DocxResult = namedtuple('DocxResult', ['paragraph', 'run', 'code', 'latex', 'is_block', 'error', 'errors'])
+
+
+def _is_eq(instruction):
+    return instruction.lstrip()[:2].upper() == 'EQ'
+
+
+def _eq_field_text(instruction):
+    """将域代码包装为转换器接受的 { EQ ... } 形式"""
+    return f"{{{instruction}}}"
+
+
+class _ComplexField:
+    """正在组装的复杂域"""
+    __slots__ = ('paragraph', 'run', 'parts', 'separated')
+
+    def __init__(self, paragraph, run):
+        self.paragraph = paragraph
+        self.run = run
+        self.parts = []
+        self.separated = False
+
+
+def iter_eq_fields(path):
+    """按文档顺序逐个产出 .docx 中的EQ域（DocxField）"""
+    with zipfile.ZipFile(path) as archive, archive.open(DOCUMENT_PART) as document:
+        yield from _iter_fields(document)
+
+
+def _iter_fields(document):
+    paragraph = -1
+    run = -1
+    fields = []          # 复杂域栈，支持嵌套
+    ancestors = []       # 当前元素的祖先，用于释放已处理的子树
+    body = None
+
+    for event, elem in iterparse(document, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            ancestors.append(elem)
+            if tag == _PARAGRAPH:
+                paragraph += 1
+                run = -1
+            elif tag == _RUN:
+                run += 1
+            elif tag == _BODY:
+                body = elem
+            elif tag == _FLD_SIMPLE:
+                instruction = elem.get(_INSTR, '')
+                if _is_eq(instruction):
+                    yield DocxField(paragraph, run + 1, _eq_field_text(instruction))
+            elif tag == _FLD_CHAR:
+                char_type = elem.get(_FLD_CHAR_TYPE)
+                if char_type == 'begin':
+                    fields.append(_ComplexField(paragraph, run))
+                elif char_type == 'separate' and fields:
+                    fields[-1].separated = True
+                elif char_type == 'end' and fields:
+                    field = fields.pop()
+                    instruction = ''.join(field.parts)
+                    if _is_eq(instruction):
+                        yield DocxField(field.paragraph, field.run, _eq_field_text(instruction))
+            continue
+
+        ancestors.pop()
+        if tag == _INSTR_TEXT:
+            if fields and not fields[-1].separated and elem.text:
+                fields[-1].parts.append(elem.text)
+        elif body is not None and ancestors and ancestors[-1] is body:
+            # body 的直接子元素（段落、表格等）处理完毕，整体释放
+            body.clear()
+
+
+def convert_docx(path, converter, workers=1, chunksize=None):
+    """流式提取并转换 .docx 中的EQ域，按文档顺序产出 DocxResult
+
+    workers 大于1时通过 convert_many 在进程池中转换，同时在途的域数有上限。
+    """
+    fields = iter_eq_fields(path)
+    if workers == 1:
+        for field in fields:
+            yield DocxResult(*field, *converter._try_convert(field.code))
+        return
+
+    # 记录已送入进程池的域，按顺序与结果配对
+    pending = deque()
+
+    def codes():
+        for field in fields:
+            pending.append(field)
+            yield field.code
+
+    for item in converter.convert_many(codes(), workers=workers, chunksize=chunksize, ordered=True):
+        field = pending.popleft()
+        yield DocxResult(*field, item.latex, item.is_block, item.error, item.errors)
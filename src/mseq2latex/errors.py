@@ -0,0 +1,100 @@
+"""转换过程中的结构化错误
+
+词法/语法分析中发现的错误报告给当前线程的收集器（见 collect），不再逐条打印；
+没有活动的收集器时保持原有行为，打印错误信息。
+"""
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+# 错误种类
+ILLEGAL_CHARACTER = 'illegal_character'  # 无法识别的字符，连续的一段只报告一次
+SYNTAX = 'syntax'                        # 语法错误，token 为出错的标记类型
+UNEXPECTED_END = 'unexpected_end'        # 输入提前结束
+EXCEPTION = 'exception'                  # 生成LaTeX等阶段抛出的异常
+INVALID_INPUT = 'invalid_input'          # 输入记录本身无效（如无法解析的JSONL行），未进行转换
+
+# 单个错误：position/length 为在输入文本中的字符偏移与长度，未知时为 None
+ConversionError = namedtuple('ConversionError', ['kind', 'message', 'position', 'length', 'token'])
+
+
+class ConversionResult(namedtuple('ConversionResult', ['latex', 'is_block', 'errors'])):
+    """一次转换的结果：latex/is_block 与 convert2 一致，errors 为 ConversionError 元组
+
+    开启错误恢复时，latex 可能与 errors 同时存在，表示跳过出错部分后得到的部分结果。
+    """
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.latex is not None and not self.errors
+
+
+class ParseAborted(Exception):
+    """未开启错误恢复时，在第一个语法错误处终止分析"""
+
+
+class _Collector:
+    __slots__ = ('errors', 'recover', 'end')
+
+    def __init__(self, end, recover):
+        self.errors = []
+        self.recover = recover
+        self.end = end
+
+
+_local = threading.local()
+
+
+@contextmanager
+def collect(eq_text, recover=False):
+    """在当前线程收集转换 eq_text 过程中的错误，产出错误列表
+
+    eq_text 不是字符串时同样建立收集器（输入末尾位置未知），由调用方把随后的异常记录为错误。
+    """
+    previous = getattr(_local, 'collector', None)
+    end = len(eq_text) if isinstance(eq_text, str) else None
+    collector = _local.collector = _Collector(end, recover)
+    try:
+        yield collector.errors
+    finally:
+        _local.collector = previous
+
+
+def report_illegal(text, position):
+    """报告一段连续的非法字符"""
+    collector = getattr(_local, 'collector', None)
+    if collector is None:
+        print(f"非法字符 '{text}'")
+        return
+    collector.errors.append(ConversionError(ILLEGAL_CHARACTER, f"非法字符 '{text}'",
+                                            position, len(text), None))
+
+
+def report_syntax(token):
+    """报告语法错误；在 collect 中且未开启错误恢复时抛出 ParseAborted 终止分析
+
+    token 为出错的标记，输入提前结束时为 None。
+    没有活动的收集器时（如直接调用模块级 parser.parse）保持原有行为：打印错误信息，parse 返回 None。
+    """
+    collector = getattr(_local, 'collector', None)
+    if token is None:
+        message = "语法错误在文件末尾"
+    else:
+        message = f"语法错误在标记 {token.type}"
+
+    if collector is None:
+        print(message)
+        if token is not None:
+            # 文法中的错误恢复规则只用于 collect(recover=True)；这里把出错的标记当作输入结束，
+            # PLY 随即放弃分析，parse 与引入错误恢复前一样返回 None
+            token.type = '$end'
+        return
+
+    if token is None:
+        collector.errors.append(ConversionError(UNEXPECTED_END, message, collector.end, 0, None))
+    else:
+        length = len(str(token.value)) if token.type != 'NUMBER' else None
+        collector.errors.append(ConversionError(SYNTAX, message, token.lexpos, length, token.type))
+    if not collector.recover:
+        raise ParseAborted(message)
@@ -0,0 +1,242 @@
+"""实时预览用的增量转换会话
+
+会话保存上一次转换得到的命令区域树：每个命令（\\f(...)、\\a(...) 等）在源文本与LaTeX输出中的位置，
+位置均相对于外层命令保存。编辑时只重新分析包含编辑范围的最内层命令，把它的新输出拼接进缓存的
+LaTeX中，其余部分原样复用；编辑跨越命令边界、区域无法单独分析或出现错误时退回完整转换。
+"""
+from bisect import bisect_right
+
+from .ast_nodes import (ASTNode, Array, Box, Bracket, Displace, Fraction, Integral, List,
+                        Overstrike, Radical, SpaceCommand, Subscript, Superscript)
+from .errors import EXCEPTION, ConversionError, ConversionResult, ParseAborted, collect
+
+# 由命令产生式生成的节点，与源文本中的命令区域一一对应
+_COMMAND_NODES = (Fraction, Radical, Superscript, Subscript, SpaceCommand, Bracket,
+                  Displace, Integral, List, Overstrike, Array, Box)
+
+# 单独分析一个命令时包在外面的域头与域尾
+_FIELD_HEAD = "{ EQ "
+_FIELD_TAIL = " }"
+
+
+class _Region:
+    """一个命令区域；子区域的起点保存在 starts/out_starts 中，相对于本区域的起点"""
+    __slots__ = ('length', 'out_length', 'head', 'kind', 'is_block', 'children', 'starts', 'out_starts')
+
+    def __init__(self, length, out_length, head, kind, is_block):
+        self.length = length
+        self.out_length = out_length
+        self.head = head          # 命令标记（如 \s\up12）的长度，编辑不能触及
+        self.kind = kind          # 命令节点的类型，根区域为 None
+        self.is_block = is_block
+        self.children = []
+        self.starts = []
+        self.out_starts = []
+
+
+class _RecordingLexer:
+    """包装词法分析器，记录语法分析器取走的全部标记"""
+    __slots__ = ('lexer', 'tokens')
+
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.tokens = []
+
+    def input(self, data):
+        self.lexer.input(data)
+
+    def token(self):
+        token = self.lexer.token()
+        if token is not None:
+            self.tokens.append(token)
+        return token
+
+
+def _source_spans(tokens):
+    """按先序列出命令区域的 [起点, 终点, 命令标记长度]"""
+    spans = []
+    stack = []      # 尚未闭合的区域：[span, 左括号所在深度]
+    depth = 0
+    for token in tokens:
+        kind = token.type
+        if kind.startswith('CMD_'):
+            span = [token.lexpos, None, len(token.value)]
+            spans.append(span)
+            stack.append([span, None])
+        elif kind == 'LPAREN':
+            depth += 1
+            if stack and stack[-1][1] is None:
+                stack[-1][1] = depth
+        elif kind == 'RPAREN':
+            if stack and stack[-1][1] == depth:
+                stack.pop()[0][1] = token.lexpos + 1
+            depth -= 1
+    return spans
+
+
+def _output_spans(tree):
+    """与 ASTNode.to_latex 相同的遍历，按先序列出命令节点在输出中的 [起点, 终点, 节点]"""
+    spans = []
+    position = 0
+    stack = [(tree._parts(), None)]
+    while stack:
+        parts, span = stack[-1]
+        for part in parts:
+            if isinstance(part, ASTNode):
+                child_span = None
+                if isinstance(part, _COMMAND_NODES):
+                    child_span = [position, None, part]
+                    spans.append(child_span)
+                stack.append((part._parts(), child_span))
+                break
+            position += len(part if isinstance(part, str) else str(part))
+        else:
+            stack.pop()
+            if span is not None:
+                span[1] = position
+    return spans
+
+
+def _build(tree, tokens, length, out_length):
+    """由一次完整分析的结果构建区域树，返回根区域"""
+    sources = _source_spans(tokens)
+    outputs = _output_spans(tree)
+    if len(sources) != len(outputs):
+        raise ValueError("命令区域与输出不对应")
+
+    root = _Region(length, out_length, 0, None, tree.is_block)
+    # 祖先栈：(区域, 源文本起点, 输出起点, 源文本终点)
+    stack = [(root, 0, 0, length)]
+    for (start, end, head), (out_start, out_end, node) in zip(sources, outputs):
+        while start >= stack[-1][3]:
+            stack.pop()
+        parent, parent_start, parent_out, _ = stack[-1]
+        region = _Region(end - start, out_end - out_start, head, type(node), node.is_block)
+        parent.children.append(region)
+        parent.starts.append(start - parent_start)
+        parent.out_starts.append(out_start - parent_out)
+        stack.append((region, start, out_start, end))
+    return root
+
+
+class EditSession:
+    """对一个EQ域的增量转换会话
+
+    用 edit(start, end, replacement) 把 text[start:end] 替换为 replacement，返回新的 ConversionResult。
+    """
+
+    def __init__(self, converter, eq_text):
+        self.converter = converter
+        self.text = ''
+        self.result = None
+        self._root = None
+        self.reset(eq_text)
+
+    def _parse(self, eq_text):
+        """完整分析 eq_text，返回 (AST, 标记列表)；失败时返回 (None, 标记列表)"""
+        converter = self.converter
+        lexer = converter.lexer
+        lexer.lineno = 1
+        recording = _RecordingLexer(lexer)
+        try:
+            tree = converter.parser.parse(eq_text, lexer=recording)
+        except ParseAborted:
+            tree = None
+        return tree, recording.tokens
+
+    def reset(self, eq_text):
+        """完整转换 eq_text 并重建区域树"""
+        self.text = eq_text
+        self._root = None
+        with collect(eq_text) as found:
+            try:
+                tree, tokens = self._parse(eq_text)
+                if tree:
+                    latex = tree.to_latex()
+                    if not found:
+                        self._root = _build(tree, tokens, len(eq_text), len(latex))
+                    self.result = ConversionResult(latex, tree.is_block, tuple(found))
+                    return self.result
+            except Exception as e:
+                found.append(ConversionError(EXCEPTION, str(e) or type(e).__name__, None, None, None))
+        self.result = ConversionResult(None, None, tuple(found))
+        return self.result
+
+    def edit(self, start, end, replacement):
+        """将 text[start:end] 替换为 replacement，增量更新转换结果"""
+        if not 0 <= start <= end <= len(self.text):
+            raise IndexError("编辑范围超出文本")
+        text = self.text[:start] + replacement + self.text[end:]
+        if self._root is not None:
+            path = self._enclosing(start, end)
+            # 从最内层命令开始尝试，区域无法单独分析时交给外层命令
+            for depth in range(len(path) - 1, -1, -1):
+                if self._reconvert(path, depth, text, len(replacement) - (end - start)):
+                    self.text = text
+                    return self.result
+        return self.reset(text)
+
+    def _enclosing(self, start, end):
+        """从根向下查找严格包含编辑范围的命令区域
+
+        返回路径 [(父区域, 子序号, 区域源文本起点, 区域输出起点), ...]，最后一项为最内层命令。
+        """
+        path = []
+        region = self._root
+        base = out_base = 0
+        while region.children:
+            i = bisect_right(region.starts, start - base) - 1
+            if i < 0:
+                break
+            child = region.children[i]
+            child_start = base + region.starts[i]
+            # 编辑必须位于命令标记之后、最后的右括号之前
+            if not (child_start + child.head <= start and end < child_start + child.length):
+                break
+            out_base += region.out_starts[i]
+            path.append((region, i, child_start, out_base))
+            region = child
+            base = child_start
+        return path
+
+    def _reconvert(self, path, depth, text, delta):
+        """单独重新分析路径上第 depth 层的命令，成功时拼接结果并更新区域树"""
+        parent, index, start, out_start = path[depth]
+        old = parent.children[index]
+        source = text[start:start + old.length + delta]
+
+        # 包装成完整的域单独分析：必须恰好是一个同类命令且没有任何错误，
+        # 命令类型不变才能保证外层序列中的空格等输出不受影响
+        field = _FIELD_HEAD + source + _FIELD_TAIL
+        with collect(field) as found:
+            try:
+                tree, tokens = self._parse(field)
+                if found or not tree or type(tree.expression) is not old.kind:
+                    return False
+                latex = tree.expression.to_latex()
+                region = _build(tree, tokens, len(field), len(latex)).children[0]
+            except Exception:
+                return False
+        if found or region.length != len(source):
+            return False
+
+        # 拼接输出，并更新各层祖先的长度与其后兄弟区域的相对位置
+        out_delta = region.out_length - old.out_length
+        latex_text = self.result.latex
+        latex_text = latex_text[:out_start] + latex + latex_text[out_start + old.out_length:]
+        parent.children[index] = region
+        for ancestor, i, _, _ in path[:depth + 1]:
+            ancestor.length += delta
+            ancestor.out_length += out_delta
+            if delta:
+                ancestor.starts[i + 1:] = [s + delta for s in ancestor.starts[i + 1:]]
+            if out_delta:
+                ancestor.out_starts[i + 1:] = [s + out_delta for s in ancestor.out_starts[i + 1:]]
+
+        if region.is_block != old.is_block:
+            # 块级属性变化时沿路径向上重新计算
+            for ancestor, _, _, _ in reversed(path[:depth + 1]):
+                ancestor.is_block = ancestor.kind is Array or any(
+                    child.is_block for child in ancestor.children)
+        self.result = ConversionResult(latex_text, self._root.is_block, ())
+        return True
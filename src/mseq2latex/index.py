@@ -0,0 +1,244 @@
+"""语料文件的EQ域索引与分片并行转换
+
+对同一个大语料反复离线转换时，先把语料文件内存映射一次，扫描出每个EQ域的 (偏移, 长度)，
+保存为紧凑的数组索引文件（默认为语料路径加 .eqidx）。再次运行时只要语料的大小与修改时间不变，
+就直接映射已保存的索引，不必重新扫描。
+
+并行转换时工作进程各自映射语料与索引，父进程只分发分片的域序号范围；
+工作进程直接从映射的内存中解码各个域，输入文本既不复制到父进程，也不经过pickle。
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from . import batch
+from .stream import DEFAULT_MAX_FIELD_SIZE, iter_field_spans
+
+INDEX_SUFFIX = '.eqidx'
+# 每个分片包含的域数
+DEFAULT_SHARD_SIZE = 4096
+
+# 索引文件头：魔数（末字节为字节序）、语料大小、语料修改时间（纳秒）、扫描时的 max_field_size、域数。
+# 文件头之后是 count 个偏移（array 'Q'），再是 count 个长度（array 'I'），均为本机字节序，可直接映射为数组
+_MAGIC = b'MSEQIX1' + (b'<' if sys.byteorder == 'little' else b'>')
+_HEADER = struct.Struct('=8sQqQQ')
+_OFFSET_SIZE = array('Q').itemsize
+_LENGTH_SIZE = array('I').itemsize
+# 长度数组能表示的最大值，也即 max_field_size 的上限（域的长度不超过 max_field_size）
+MAX_FIELD_SIZE_LIMIT = (1 << (8 * _LENGTH_SIZE)) - 1
+
+# 索引转换的单条结果：index 为域在语料中的序号，offset/length 为其字节范围，其余字段与 BatchItem 相同
+IndexedItem = namedtuple('IndexedItem', ['index', 'offset', 'length', 'latex', 'is_block', 'error', 'errors'])
+
+
+def _map(path):
+    """只读映射整个文件；空文件无法映射，返回空字节串"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class FieldIndex:
+    """语料中每个EQ域的偏移与长度，保存在数组（或映射自索引文件的内存）中"""
+
+    def __init__(self, offsets, lengths, corpus_size, corpus_mtime_ns, max_field_size, mapping=None):
+        self.offsets = offsets
+        self.lengths = lengths
+        self.corpus_size = corpus_size
+        self.corpus_mtime_ns = corpus_mtime_ns
+        self.max_field_size = max_field_size
+        # 从索引文件加载时持有的映射，close 时释放
+        self._mapping = mapping
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def span(self, i):
+        """第 i 个域的 (偏移, 长度)"""
+        return self.offsets[i], self.lengths[i]
+
+    def close(self):
+        if self._mapping is not None:
+            # 先释放指向映射的内存视图，映射才能关闭
+            self.offsets.release()
+            self.lengths.release()
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def matches(self, corpus_path, max_field_size):
+        """索引是否仍对应当前的语料文件与扫描参数"""
+        stat = os.stat(corpus_path)
+        return (stat.st_size == self.corpus_size and stat.st_mtime_ns == self.corpus_mtime_ns
+                and max_field_size == self.max_field_size)
+
+    def save(self, index_path):
+        """写入索引文件，先写临时文件再替换，中途失败不会留下损坏的索引"""
+        offsets = self.offsets if isinstance(self.offsets, array) else array('Q', self.offsets)
+        lengths = self.lengths if isinstance(self.lengths, array) else array('I', self.lengths)
+        temporary = f"{index_path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, self.corpus_size, self.corpus_mtime_ns,
+                                 self.max_field_size, len(offsets)))
+            offsets.tofile(f)
+            lengths.tofile(f)
+        os.replace(temporary, index_path)
+
+
+def build_index(corpus_path, max_field_size=DEFAULT_MAX_FIELD_SIZE):
+    """映射语料文件并扫描全部EQ域，返回 FieldIndex"""
+    if max_field_size > MAX_FIELD_SIZE_LIMIT:
+        raise ValueError(f"max_field_size 不能超过 {MAX_FIELD_SIZE_LIMIT}（索引以32位无符号整数保存域的长度）")
+    stat = os.stat(corpus_path)
+    offsets = array('Q')
+    lengths = array('I')
+    data = _map(corpus_path)
+    try:
+        for start, end in iter_field_spans(data, max_field_size):
+            offsets.append(start)
+            lengths.append(end - start)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+    return FieldIndex(offsets, lengths, stat.st_size, stat.st_mtime_ns, max_field_size)
+
+
+def load_index(index_path):
+    """映射已保存的索引文件，偏移与长度直接作为内存视图使用；文件格式不符时返回 None"""
+    try:
+        mapping = _map(index_path)
+    except FileNotFoundError:
+        return None
+    if len(mapping) < _HEADER.size:
+        if isinstance(mapping, mmap.mmap):
+            mapping.close()
+        return None
+    magic, corpus_size, corpus_mtime_ns, max_field_size, count = _HEADER.unpack_from(mapping)
+    if magic != _MAGIC or len(mapping) != _HEADER.size + count * (_OFFSET_SIZE + _LENGTH_SIZE):
+        mapping.close()
+        return None
+    view = memoryview(mapping)
+    offsets_end = _HEADER.size + count * _OFFSET_SIZE
+    offsets = view[_HEADER.size:offsets_end].cast('Q')
+    lengths = view[offsets_end:].cast('I')
+    view.release()
+    return FieldIndex(offsets, lengths, corpus_size, corpus_mtime_ns, max_field_size, mapping)
+
+
+def open_index(corpus_path, index_path=None, max_field_size=DEFAULT_MAX_FIELD_SIZE, rebuild=False):
+    """返回语料的索引：已保存且仍然有效时直接加载，否则重新扫描并保存
+
+    返回 (FieldIndex, 是否复用了已保存的索引)。
+    """
+    if index_path is None:
+        index_path = corpus_path + INDEX_SUFFIX
+    if not rebuild:
+        index = load_index(index_path)
+        if index is not None:
+            if index.matches(corpus_path, max_field_size):
+                return index, True
+            index.close()
+    index = build_index(corpus_path, max_field_size)
+    index.save(index_path)
+    return index, False
+
+
+def _decode_shard(corpus, index, first, last):
+    """从映射的语料中解码第 first 到 last-1 个域；无法解码的域为 None"""
+    view = memoryview(corpus)
+    texts = []
+    try:
+        for i in range(first, last):
+            offset, length = index.span(i)
+            try:
+                texts.append(str(view[offset:offset + length], 'utf-8'))
+            except UnicodeDecodeError:
+                texts.append(None)
+    finally:
+        view.release()
+    return texts
+
+
+def _convert_shard(converter, corpus, index, first, last):
+    items = []
+    for i, text in enumerate(_decode_shard(corpus, index, first, last), first):
+        if text is None:
+            items.append(batch.BatchItem(i, None, None, "EQ域不是有效的UTF-8文本", ()))
+        else:
+            items.append(batch.BatchItem(i, *converter._try_convert(text)))
+    return items
+
+
+# 工作进程各自映射的语料与索引，由 _init_worker 打开一次
+_worker_corpus = None
+_worker_index = None
+
+
+def _init_worker(options, corpus_path, index_path):
+    global _worker_corpus, _worker_index
+    batch._init_worker(options)
+    _worker_corpus = _map(corpus_path)
+    _worker_index = load_index(index_path)
+
+
+def _run_shard(first, last):
+    """在工作进程中转换一个分片，连同本分片产生的指标一起返回"""
+    converter = batch._worker_converter
+    items = _convert_shard(converter, _worker_corpus, _worker_index, first, last)
+    metrics = converter.metrics
+    return items, metrics.drain() if metrics is not None else None
+
+
+def convert_index(corpus_path, converter, workers=None, shard_size=DEFAULT_SHARD_SIZE, index_path=None,
+                  max_field_size=DEFAULT_MAX_FIELD_SIZE, rebuild=False):
+    """按索引转换语料中的全部EQ域，按语料中的顺序产出 IndexedItem
+
+    workers（默认为CPU核数）大于1时，每个分片的 shard_size 个域由一个工作进程直接从映射的语料中读取并转换。
+    """
+    if shard_size < 1:
+        raise ValueError("shard_size 必须为正整数")
+    if index_path is None:
+        index_path = corpus_path + INDEX_SUFFIX
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    index, _ = open_index(corpus_path, index_path, max_field_size, rebuild)
+    corpus = _map(corpus_path)
+    try:
+        shards = ((first, min(first + shard_size, len(index))) for first in range(0, len(index), shard_size))
+
+        def indexed(items):
+            for item in items:
+                offset, length = index.span(item.index)
+                yield IndexedItem(item.index, offset, length, *item[1:])
+
+        if workers <= 1:
+            for first, last in shards:
+                yield from indexed(_convert_shard(converter, corpus, index, first, last))
+            return
+
+        # 限制同时在途的分片数，结果按分片顺序产出
+        max_pending = workers * 2
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(converter._worker_options(), corpus_path, index_path)) as pool:
+            pending = deque()
+            for first, last in shards:
+                pending.append(pool.submit(_run_shard, first, last))
+                if len(pending) >= max_pending:
+                    yield from indexed(batch._chunk_result(converter, pending.popleft()))
+            while pending:
+                yield from indexed(batch._chunk_result(converter, pending.popleft()))
+    finally:
+        if isinstance(corpus, mmap.mmap):
+            corpus.close()
+        index.close()
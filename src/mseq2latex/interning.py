@@ -0,0 +1,122 @@
+"""结构共享（hash-consing）的子树驻留
+
+开启后语法分析的每个动作都把新建的节点交给 SubtreeInterner.intern：结构相同的子树只保留一个节点，
+同一文档中反复出现的 \\f(1,2)、\\r(x) 等子表达式在多个域之间共享。被复用过的节点登记在 memo 中，
+生成LaTeX时（ASTNode.to_latex(memo)）只展开一次，之后直接输出缓存的结果。
+
+节点一经驻留就不再修改。分析动作自底向上构建节点，子节点总是先于父节点驻留，
+因此结构键中直接放子节点本身（按对象身份比较），不必递归比较整棵子树。
+表达式序列在分析过程中逐项原地追加，在包含它的节点驻留时才一并驻留。
+"""
+from operator import attrgetter
+
+from .ast_nodes import ExpressionSequence
+
+# 默认最多驻留的节点数，超出时整体清空，避免长时间运行的批量转换无限占用内存
+DEFAULT_MAX_NODES = 1 << 18
+
+# 类型 -> 计算该类型结构键的函数
+_key_functions = {}
+# 类型 -> 可能引用表达式序列的槽位名
+_child_slots = {}
+
+
+def _key_function(cls):
+    """为节点类型生成结构键函数，键为类型加全部槽位的值
+
+    elements 槽位为子节点列表，转为元组；options 槽位为选项字典，转为有序的项；其余槽位的值均可直接哈希。
+    """
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get('__slots__', ())
+        names.extend((slots,) if isinstance(slots, str) else slots)
+    getter = attrgetter(*names)
+    _child_slots[cls] = tuple(name for name in names if name not in ('is_block', 'options'))
+    lists = [i for i, name in enumerate(names) if name == 'elements']
+    options = [i for i, name in enumerate(names) if name == 'options']
+
+    if not lists and not options:
+        def key(node):
+            return cls, getter(node)
+    else:
+        def key(node):
+            values = list(getter(node))
+            for i in lists:
+                values[i] = tuple(values[i])
+            for i in options:
+                values[i] = tuple(sorted(values[i].items()))
+            return cls, tuple(values)
+
+    _key_functions[cls] = key
+    return key
+
+
+class SubtreeInterner:
+    """按结构驻留AST节点，并登记被复用的节点供生成LaTeX时缓存
+
+    同一个驻留器可跨多个域使用（如一批转换），max_nodes 为驻留节点数的上限，超出时清空重新开始。
+    """
+
+    def __init__(self, max_nodes=DEFAULT_MAX_NODES):
+        self.max_nodes = max_nodes
+        # 结构键 -> 规范节点
+        self._nodes = {}
+        # 被复用过的规范节点 -> 缓存的LaTeX（尚未生成时为 None），即 to_latex 的 memo 参数
+        self.memo = {}
+        self.lookups = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def clear(self):
+        """清空驻留的节点与缓存的输出（保留统计）"""
+        self._nodes.clear()
+        self.memo.clear()
+
+    def intern(self, node):
+        """返回与 node 结构相同的规范节点；node 的子节点除表达式序列外应已驻留"""
+        cls = type(node)
+        key_function = _key_functions.get(cls) or _key_function(cls)
+        if cls is not ExpressionSequence:
+            # 序列的元素都是项，不会是序列；其他节点先驻留直接引用的序列
+            for name in _child_slots[cls]:
+                value = getattr(node, name)
+                if type(value) is ExpressionSequence:
+                    setattr(node, name, self.intern(value))
+                elif type(value) is list:
+                    for i, element in enumerate(value):
+                        if type(element) is ExpressionSequence:
+                            value[i] = self.intern(element)
+        key = key_function(node)
+        self.lookups += 1
+        canonical = self._nodes.get(key)
+        if canonical is None:
+            if len(self._nodes) >= self.max_nodes:
+                self.clear()
+            self._nodes[key] = node
+            return node
+        self.hits += 1
+        if canonical not in self.memo:
+            self.memo[canonical] = None
+        return canonical
+
+    def to_latex(self, tree):
+        """生成LaTeX，被复用的子树只展开一次"""
+        return tree.to_latex(self.memo)
+
+    def to_latex_into(self, tree, writer):
+        """与 to_latex 相同，但把片段写入 writer（见 ASTNode.to_latex_into）"""
+        tree.to_latex_into(writer, self.memo)
+
+    def stats(self):
+        """返回驻留统计：dedup_ratio 为新建节点中与已有节点结构相同的比例，
+        emitted 为已缓存输出的共享子树数"""
+        return {
+            'nodes': len(self._nodes),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'dedup_ratio': self.hits / self.lookups if self.lookups else 0.0,
+            'shared': len(self.memo),
+            'emitted': sum(latex is not None for latex in self.memo.values()),
+        }
@@ -1,5 +1,13 @@
+import re
+import sys
+import threading
+from functools import lru_cache, partial
+
 import ply.lex as lex
 
+from .ast_nodes import CommandOption, WideText
+from .errors import report_illegal
+
 # 定义标记
 tokens = (
     'LBRACE',          # {
@@ -34,6 +42,51 @@ tokens = (
     'OPERATOR',        # 操作符（+, -, 等）
 )
 
+# 生成LaTeX时需要用 \text{} 包围的文字：CJK表意文字（含扩展A至H区、兼容表意文字）、部首、
+# 假名、注音、谚文、CJK符号与标点、带圈与兼容字符，以及全角/半角形式
+WIDE_SCRIPT = re.compile(
+    '['
+    '\u1100-\u11ff'           # 谚文字母
+    '\u2e80-\u2fdf'           # CJK部首补充、康熙部首
+    '\u2ff0-\u2fff'           # 表意文字描述字符
+    '\u3001-\u303f'           # CJK符号和标点（U+3000 全角空格为空白，不会出现在文本标记中）
+    '\u3040-\u33ff'           # 平假名、片假名、注音、谚文兼容字母、带圈CJK字符、CJK兼容字符
+    '\u3400-\u4dbf'           # CJK扩展A
+    '\u4e00-\u9fff'           # CJK统一表意文字
+    '\ua960-\ua97f'           # 谚文字母扩展A
+    '\uac00-\ud7ff'           # 谚文音节、谚文字母扩展B
+    '\uf900-\ufaff'           # CJK兼容表意文字
+    '\ufe30-\ufe4f'           # CJK兼容形式
+    '\uff00-\uffef'           # 半角及全角形式
+    '\U0001b000-\U0001b16f'   # 假名补充、假名扩展A、小假名扩展
+    '\U0001f200-\U0001f2ff'   # 带圈表意文字补充
+    '\U00020000-\U0003134f'   # CJK扩展B至G、兼容表意文字补充
+    '\U00031350-\U000323af'   # CJK扩展H
+    ']')
+
+# 携带选项的标记：值为 decode_option 解码后的 CommandOption
+OPTION_TOKENS = frozenset(('ALIGNMENT_OPTION', 'ARRAY_OPTION', 'BOX_OPTION', 'INTEGRAL_OPTION',
+                           'DISPLACE_OPTION', 'BRACKET_OPTION'))
+
+@lru_cache(maxsize=1024)
+def decode_option(text):
+    """把选项原文解码为 CommandOption；同一原文只解码一次，得到同一个不可变对象
+
+    选项名为反斜杠后的两个字母；\\fc\\字符 等带字符的选项取该字符，\\co数字 等取整数，其余为 True。
+    数字超出整数转换长度上限时值为 None，节点忽略该选项。
+    """
+    kind = text[1:3]
+    if len(text) == 3:
+        value = True
+    elif text[3] == '\\':
+        value = text[4]
+    else:
+        try:
+            value = int(text[3:])
+        except ValueError:
+            value = None
+    return CommandOption(kind, value, text)
+
 # 标记规则
 t_LBRACE = r'\{'
 t_RBRACE = r'\}'
@@ -53,31 +106,37 @@ def t_EQ(t):
 def t_ALIGNMENT_OPTION(t):
     r'\\al|\\ac|\\ar'
     # 匹配 \al、\ac、\ar（数组和重叠共享的对齐选项）
+    t.value = decode_option(t.value)
     return t
 
 def t_ARRAY_OPTION(t):
     r'\\co\d+|\\vs\d+|\\hs\d+'
     # 匹配 \con、\vsn、\hsn（数组特有选项）
+    t.value = decode_option(t.value)
     return t
 
 def t_BOX_OPTION(t):
     r'\\to|\\bo|\\le|\\ri'
     # 匹配 \to、\bo、\le、\ri
+    t.value = decode_option(t.value)
     return t
 
 def t_INTEGRAL_OPTION(t):
     r'\\su|\\pr|\\in|\\fc\\.|\\vc\\.'
     # 匹配 \su、\pr、\in、\fc\字符、\vc\字符
+    t.value = decode_option(t.value)
     return t
 
 def t_DISPLACE_OPTION(t):
     r'\\fo\d+|\\ba\d+|\\li'
     # 匹配 \fo数字、\ba数字、\li
+    t.value = decode_option(t.value)
     return t
 
 def t_BRACKET_OPTION(t):
     r'\\[lr]c\\.|\\bc\\.'
     # 匹配 \lc\字符、\rc\字符、\bc\字符
+    t.value = decode_option(t.value)
     return t
 
 def t_CMD_ARRAY(t):
@@ -142,6 +201,8 @@ def t_IDENTIFIER(t):
     # 检查是否是保留字
     if t.value == 'EQ':
         t.type = 'EQ'
+    # 驻留标识符，大批量保留AST时相同的名字只存一份
+    t.value = sys.intern(t.value)
     return t
 
 def t_OPERATOR(t):
@@ -151,6 +212,9 @@ def t_OPERATOR(t):
 def t_TEXT(t):
     r'[^\{\}\\(),;+\-*/=<>\s\d]+'
     # 匹配除了特殊符号、空白、数字之外的所有字符（包括中文）
+    # 含CJK等文字的文本在此分类一次，生成LaTeX时按类型包围 \text{}
+    if WIDE_SCRIPT.search(t.value):
+        t.value = WideText(t.value)
     return t
 
 def t_newline(t):
@@ -158,8 +222,162 @@ def t_newline(t):
     t.lexer.lineno += len(t.value)
 
 def t_error(t):
-    print(f"非法字符 '{t.value[0]}'")
-    t.lexer.skip(1)
+    # 连续的非法字符合并为一条错误，一次跳过
+    lexer = t.lexer
+    data = lexer.lexdata
+    end = t.lexpos + 1
+    while end < len(data) and data[end] not in t_ignore and not any(
+            regex.match(data, end) for regex, _ in lexer.lexre):
+        end += 1
+    report_illegal(data[t.lexpos:end], t.lexpos)
+    lexer.skip(end - t.lexpos)
+
+def token_specification():
+    """按PLY的匹配优先级列出 (标记类型, 正则)：函数规则按定义顺序，字符串规则按长度降序"""
+    functions = []
+    strings = []
+    for name, rule in globals().items():
+        if not name.startswith('t_') or name in ('t_error', 't_ignore'):
+            continue
+        if callable(rule):
+            functions.append((rule.__code__.co_firstlineno, name[2:], rule.__doc__))
+        else:
+            strings.append((name[2:], rule))
+    functions.sort()
+    strings.sort(key=lambda item: len(item[1]), reverse=True)
+    return [(name, regex) for _, name, regex in functions] + strings
+
+# 词法分析模式：'ply' 为PLY的词法分析器，'table' 为单个主正则加分组查表的 TableLexer
+LEXER_MODES = ('ply', 'table')
+
+# 最常见的标记排在主正则最前面，减少每个标记平均尝试的分支数。
+# 它们与其余规则在同一位置不会同时匹配（EQ 保持在标识符与文本之前），调整顺序不改变切分结果
+_COMMON_TOKENS = ('EQ', 'IDENTIFIER', 'LPAREN', 'RPAREN', 'NUMBER', 'OPERATOR', 'COMMA', 'TEXT')
+
+class Token:
+    """TableLexer 产出的标记，字段与PLY的 LexToken 相同
+
+    语法分析器在报告错误前会补上 lexer 属性，错误恢复会给标记打上 recovered 并改写 type，
+    因此不用元组，而是用只有固定槽位的轻量对象。
+    """
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer', 'recovered')
+
+    def __init__(self, type, value, lineno, lexpos):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    def __repr__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+def _build_table():
+    """把全部规则编译为一个主正则（与PLY一样使用 re.VERBOSE）：忽略字符并入每个标记的前导部分，
+    最后用单字符分组兜底捕获非法字符"""
+    specification = dict(token_specification())
+    order = [name for name in _COMMON_TOKENS if name in specification]
+    order += [name for name in specification if name not in order]
+    for name in order:
+        if re.compile(specification[name]).groups:
+            raise lex.LexError(f"规则 t_{name} 的正则不能含捕获分组", name)
+    ignore = re.escape(t_ignore)
+    master = re.compile(f"[{ignore}]*(?:"
+                        + '|'.join(f"({specification[name]})" for name in order)
+                        + f"|([^{ignore}]))", re.VERBOSE)
+    return master.finditer, (None,) + tuple(order) + (None,)
+
+class TableLexer:
+    """表驱动的词法分析器：一次正则匹配切出一个标记，按分组序号查表得到类型，不经过规则回调
+
+    产出的标记序列（类型、值、行号、位置）以及非法字符的报告与PLY词法分析器完全一致。
+    与PLY词法分析器一样提供 input/token/clone，可直接交给语法分析器，由 parse(eq_text) 输入一次。
+    """
+    __slots__ = ('lineno', 'token')
+
+    def __init__(self, lineno=1):
+        self.lineno = lineno
+        # 取下一个标记，输入结束时返回 None；input 时替换为对应输入的迭代器
+        self.token = partial(next, iter(()), None)
+
+    def input(self, data):
+        self.token = partial(next, self._tokens(data), None)
+
+    def clone(self):
+        return TableLexer(self.lineno)
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+    def _tokens(self, data):
+        finditer, types = _master_table()
+        illegal = None          # 尚未报告的一段连续非法字符的 [起点, 终点]
+        lineno = self.lineno
+        for match in finditer(data):
+            index = match.lastindex
+            kind = types[index]
+            start = match.start(index)
+            if kind is None:
+                # 非法字符：紧邻的非法字符合并为一段，由下一个标记或输入结束时一次报告
+                if illegal is not None and illegal[1] == start:
+                    illegal[1] = start + 1
+                    continue
+                if illegal is not None:
+                    report_illegal(data[illegal[0]:illegal[1]], illegal[0])
+                illegal = [start, start + 1]
+                continue
+            if illegal is not None:
+                report_illegal(data[illegal[0]:illegal[1]], illegal[0])
+                illegal = None
+            value = match.group(index)
+            if kind == 'IDENTIFIER':
+                value = sys.intern(value)
+            elif kind == 'NUMBER':
+                value = int(value)
+            elif kind == 'TEXT':
+                if WIDE_SCRIPT.search(value):
+                    value = WideText(value)
+            elif kind in OPTION_TOKENS:
+                value = decode_option(value)
+            elif kind == 'newline':
+                lineno = self.lineno = lineno + len(value)
+                continue
+            yield Token(kind, value, lineno, start)
+        if illegal is not None:
+            report_illegal(data[illegal[0]:illegal[1]], illegal[0])
+
+# 词法分析器在首次使用时构建，导入本模块不做任何规则校验与编译
+_lexer = None
+_table_lexer = None
+_lexer_lock = threading.Lock()
+# TableLexer 的 (主正则的 finditer, 分组序号 -> 标记类型)
+_table = None
+
+def _master_table():
+    global _table
+    if _table is None:
+        with _lexer_lock:
+            if _table is None:
+                _table = _build_table()
+    return _table
+
+def get_lexer(mode='ply'):
+    """返回模块级词法分析器，首次调用时构建；mode 为 'table' 时返回 TableLexer"""
+    global _lexer, _table_lexer
+    if mode == 'table':
+        if _table_lexer is None:
+            _master_table()
+            _table_lexer = TableLexer()
+        return _table_lexer
+    if mode != 'ply':
+        raise ValueError(f"未知的词法分析模式: {mode}")
+    if _lexer is None:
+        with _lexer_lock:
+            if _lexer is None:
+                _lexer = lex.lex()
+    return _lexer
 
-# 构建词法分析器
-lexer = lex.lex()
+def __getattr__(name):
+    # 兼容旧的模块属性 lexer
+    if name == 'lexer':
+        return get_lexer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
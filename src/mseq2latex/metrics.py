@@ -0,0 +1,183 @@
+"""转换过程的分阶段计时与指标导出
+
+在转换器上设置 metrics 钩子后，每次转换都会以一个 ConversionMetrics 调用该钩子。
+MetricsCollector 是一个现成的钩子，按引擎汇总各阶段耗时与规模的直方图，并导出为Prometheus文本格式。
+未设置钩子时转换器不做任何计时。
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import namedtuple
+
+# 单次转换的指标：engine 为 'ply'、'descent' 或 'cache'（缓存命中）；
+# 各阶段耗时单位为秒，不适用的阶段为 None（递归下降引擎边扫描边生成，只记录 parse_seconds）
+ConversionMetrics = namedtuple('ConversionMetrics', [
+    'engine', 'lex_seconds', 'parse_seconds', 'emit_seconds',
+    'tokens', 'nodes', 'output_length', 'error',
+])
+
+# 耗时直方图的桶上界（秒）
+DEFAULT_TIME_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3,
+                        5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5)
+# 标记数、节点数、输出长度直方图的桶上界
+DEFAULT_SIZE_BUCKETS = (4, 16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+
+_PHASES = ('lex', 'parse', 'emit')
+_SIZES = (
+    ('tokens', 'mseq2latex_tokens', '每次转换的标记数'),
+    ('nodes', 'mseq2latex_nodes', '每次转换的AST节点数'),
+    ('output_length', 'mseq2latex_output_length', '每次转换输出的LaTeX字符数'),
+)
+
+
+class TimedLexer:
+    """包装词法分析器，累计 token() 的耗时与产出的标记数，供语法分析器按需取标记"""
+    __slots__ = ('lexer', 'seconds', 'tokens')
+
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.seconds = 0.0
+        self.tokens = 0
+
+    def input(self, data):
+        start = time.perf_counter()
+        self.lexer.input(data)
+        self.seconds += time.perf_counter() - start
+
+    def token(self):
+        start = time.perf_counter()
+        token = self.lexer.token()
+        self.seconds += time.perf_counter() - start
+        if token is not None:
+            self.tokens += 1
+        return token
+
+
+class _Histogram:
+    """固定桶的直方图，counts 为各桶的非累计计数，最后一个桶对应 +Inf"""
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        for i, n in enumerate(counts):
+            self.counts[i] += n
+        self.sum += total
+        self.count += count
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value) if value != float('inf') else '+Inf'
+    return str(value)
+
+
+def _format_labels(labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels)
+
+
+class MetricsCollector:
+    """线程安全的指标汇总器，可直接作为转换器的 metrics 钩子"""
+
+    def __init__(self, time_buckets=DEFAULT_TIME_BUCKETS, size_buckets=DEFAULT_SIZE_BUCKETS):
+        self.time_buckets = tuple(time_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self._lock = threading.Lock()
+        # (指标名, 标签元组) -> _Histogram
+        self._histograms = {}
+        # (引擎, 结果) -> 次数
+        self._conversions = {}
+
+    def __reduce__(self):
+        # 传给工作进程时只复制桶配置，各进程从空汇总开始，再由 drain/merge 汇总回来
+        return (self.__class__, (self.time_buckets, self.size_buckets))
+
+    def _histogram(self, name, labels, bounds):
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = _Histogram(bounds)
+        return histogram
+
+    def __call__(self, metrics):
+        engine = metrics.engine
+        outcome = 'error' if metrics.error else 'ok'
+        with self._lock:
+            key = (engine, outcome)
+            self._conversions[key] = self._conversions.get(key, 0) + 1
+            for phase, seconds in zip(_PHASES, metrics[1:4]):
+                if seconds is not None:
+                    labels = (('engine', engine), ('phase', phase))
+                    self._histogram('mseq2latex_phase_seconds', labels, self.time_buckets).observe(seconds)
+            for field, name, _ in _SIZES:
+                value = getattr(metrics, field)
+                if value is not None:
+                    self._histogram(name, (('engine', engine),), self.size_buckets).observe(value)
+
+    def drain(self):
+        """取出当前汇总并清空，返回可序列化的状态，用于从工作进程汇总"""
+        with self._lock:
+            state = (
+                [(name, labels, h.counts, h.sum, h.count)
+                 for (name, labels), h in self._histograms.items()],
+                dict(self._conversions),
+            )
+            self._histograms.clear()
+            self._conversions.clear()
+        return state
+
+    def merge(self, state):
+        """并入 drain 返回的状态"""
+        histograms, conversions = state
+        with self._lock:
+            for name, labels, counts, total, count in histograms:
+                bounds = self.time_buckets if name == 'mseq2latex_phase_seconds' else self.size_buckets
+                self._histogram(name, labels, bounds).merge(counts, total, count)
+            for key, count in conversions.items():
+                self._conversions[key] = self._conversions.get(key, 0) + count
+
+    def to_prometheus(self):
+        """以Prometheus文本格式导出全部指标"""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            conversions = sorted(self._conversions.items())
+            lines = [
+                '# HELP mseq2latex_conversions_total 转换次数',
+                '# TYPE mseq2latex_conversions_total counter',
+            ]
+            for (engine, outcome), count in conversions:
+                lines.append(f'mseq2latex_conversions_total{{engine="{engine}",outcome="{outcome}"}} {count}')
+
+            descriptions = {'mseq2latex_phase_seconds': '各阶段耗时（秒）'}
+            descriptions.update((name, help_text) for _, name, help_text in _SIZES)
+            current = None
+            for (name, labels), histogram in histograms:
+                if name != current:
+                    current = name
+                    lines.append(f'# HELP {name} {descriptions[name]}')
+                    lines.append(f'# TYPE {name} histogram')
+                label_text = _format_labels(labels)
+                cumulative = 0
+                for bound, count in zip(histogram.bounds + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label_text},le="{_format_value(bound)}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label_text}}} {_format_value(histogram.sum)}')
+                lines.append(f'{name}_count{{{label_text}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """原子地写出Prometheus文本文件（可供 node_exporter 的 textfile 收集器读取）"""
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(temporary, path)
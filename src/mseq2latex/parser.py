@@ -1,69 +1,89 @@
+import os
+import threading
+
 import ply.yacc as yacc
 from .lexer import tokens
-from .ast_nodes import EQField, Fraction, Radical, Superscript, Subscript, SpaceCommand, ExpressionSequence, Bracket, Displace, Integral, List, Overstrike, Box, Array
+from .errors import report_syntax
+from .ast_nodes import ErrorNode, EQField, Fraction, Radical, Superscript, Subscript, SpaceCommand, ExpressionSequence, Bracket, Displace, Integral, List, Overstrike, Box, Array
+
+def _interned(p, node):
+    # 开启子树共享时（见 interning），换成结构相同的已有节点
+    interner = p.parser.interner
+    return node if interner is None else interner.intern(node)
 
 # 语法规则
 def p_eq_field(p):
     '''eq_field : LBRACE EQ expression RBRACE'''
-    p[0] = EQField(p[3])
+    p[0] = _interned(p, EQField(p[3]))
+
+def p_expression_term(p):
+    '''expression : term'''
+    p[0] = p[1]
 
 def p_expression_sequence(p):
-    '''expression : expression expression'''
-    # 处理表达式序列，如 "3 \s\up(y)"
-    if isinstance(p[1], ExpressionSequence):
+    '''expression : expression term'''
+    # 处理表达式序列，如 "3 \s\up(y)"：左递归逐项追加到同一个扁平序列，线性时间、无冲突
+    if isinstance(p[2], ErrorNode):
+        # 错误恢复产生的空节点不进入序列，避免多余的空格
+        p[0] = p[1]
+    elif isinstance(p[1], ErrorNode):
+        p[0] = p[2]
+    elif isinstance(p[1], ExpressionSequence):
+        # 项不会是序列，左侧的序列必然是本产生式正在构建的序列，可以原地追加；
+        # 开启子树驻留时，序列在包含它的节点驻留时一并驻留（见 interning）
         p[1].add_element(p[2])
         p[0] = p[1]
     else:
         p[0] = ExpressionSequence([p[1], p[2]])
 
 def p_expression_fraction(p):
-    '''expression : CMD_FRACTION LPAREN expression COMMA expression RPAREN
-                  | CMD_FRACTION LPAREN expression SEMICOLON expression RPAREN'''
-    p[0] = Fraction(p[3], p[5])
+    '''term : CMD_FRACTION LPAREN expression COMMA expression RPAREN
+            | CMD_FRACTION LPAREN expression SEMICOLON expression RPAREN'''
+    p[0] = _interned(p, Fraction(p[3], p[5]))
 
 def p_expression_identifier(p):
-    '''expression : IDENTIFIER'''
+    '''term : IDENTIFIER'''
     p[0] = p[1]
 
 def p_expression_number(p):
-    '''expression : NUMBER'''
+    '''term : NUMBER'''
     p[0] = p[1]
 
 def p_expression_radical(p):
-    '''expression : CMD_RADICAL LPAREN expression COMMA expression RPAREN
-                  | CMD_RADICAL LPAREN expression RPAREN'''
+    '''term : CMD_RADICAL LPAREN expression COMMA expression RPAREN
+            | CMD_RADICAL LPAREN expression RPAREN'''
     if len(p) == 7:  # 有两个参数的根式 \r(degree,radicand)
-        p[0] = Radical(p[3], p[5])
+        p[0] = _interned(p, Radical(p[3], p[5]))
     else:  # 只有一个参数的根式 \r(radicand) - 默认为平方根
-        p[0] = Radical(None, p[3])
+        p[0] = _interned(p, Radical(None, p[3]))
 
 def p_expression_superscript(p):
-    '''expression : CMD_SUP LPAREN expression RPAREN'''
-    p[0] = Superscript(p[3])
+    '''term : CMD_SUP LPAREN expression RPAREN'''
+    p[0] = _interned(p, Superscript(p[3]))
 
 def p_expression_subscript(p):
-    '''expression : CMD_SUB LPAREN expression RPAREN'''
-    p[0] = Subscript(p[3])
+    '''term : CMD_SUB LPAREN expression RPAREN'''
+    p[0] = _interned(p, Subscript(p[3]))
 
 def p_expression_space_ai(p):
-    '''expression : CMD_ALIGN_INC LPAREN expression RPAREN'''
-    p[0] = SpaceCommand('ai', p[3])
+    '''term : CMD_ALIGN_INC LPAREN expression RPAREN'''
+    p[0] = _interned(p, SpaceCommand('ai', p[3]))
 
 def p_expression_space_di(p):
-    '''expression : CMD_ALIGN_DEC LPAREN expression RPAREN'''
-    p[0] = SpaceCommand('di', p[3])
+    '''term : CMD_ALIGN_DEC LPAREN expression RPAREN'''
+    p[0] = _interned(p, SpaceCommand('di', p[3]))
 
 def p_expression_bracket_simple(p):
-    '''expression : CMD_BRACKET LPAREN expression RPAREN'''
+    '''term : CMD_BRACKET LPAREN expression RPAREN'''
     # 简单括号 \b(expression)
-    p[0] = Bracket(p[3])
+    p[0] = _interned(p, Bracket(p[3]))
 
 def p_expression_bracket_with_options(p):
-    '''expression : CMD_BRACKET bracket_options LPAREN expression RPAREN'''
+    '''term : CMD_BRACKET bracket_options LPAREN expression RPAREN'''
     # 带选项的括号 \b \lc\{ \rc\) (expression)
     bracket = Bracket(p[4])
     bracket.set_bracket_options(p[2])
-    p[0] = bracket
+    p[0] = _interned(p, bracket)
 
 def p_bracket_options(p):
     '''bracket_options : BRACKET_OPTION
@@ -75,18 +95,18 @@ def p_bracket_options(p):
         p[0] = p[1]
 
 def p_expression_displace_simple(p):
-    '''expression : CMD_DISPLACE LPAREN RPAREN'''
+    '''term : CMD_DISPLACE LPAREN RPAREN'''
     # 简单置换 \d()
-    p[0] = Displace("")
+    p[0] = _interned(p, Displace(""))
 
 def p_expression_displace_with_content(p):
-    '''expression : CMD_DISPLACE LPAREN expression RPAREN'''
+    '''term : CMD_DISPLACE LPAREN expression RPAREN'''
     # 带内容的置换 \d(content)
-    p[0] = Displace(p[3])
+    p[0] = _interned(p, Displace(p[3]))
 
 def p_expression_displace_with_options(p):
-    '''expression : CMD_DISPLACE displace_options LPAREN RPAREN
-                  | CMD_DISPLACE displace_options LPAREN expression RPAREN'''
+    '''term : CMD_DISPLACE displace_options LPAREN RPAREN
+            | CMD_DISPLACE displace_options LPAREN expression RPAREN'''
     # 带选项的置换 \d \fo10 \li() 或 \d \fo10 \li(content)
     if len(p) == 5:
         # 空内容
@@ -95,7 +115,7 @@ def p_expression_displace_with_options(p):
         # 有内容
         displace = Displace(p[4])
     displace.set_displace_options(p[2])
-    p[0] = displace
+    p[0] = _interned(p, displace)
 
 def p_displace_options(p):
     '''displace_options : DISPLACE_OPTION
@@ -107,16 +127,16 @@ def p_displace_options(p):
         p[0] = p[1]
 
 def p_expression_integral_simple(p):
-    '''expression : CMD_INTEGRAL LPAREN expression COMMA expression COMMA expression RPAREN'''
+    '''term : CMD_INTEGRAL LPAREN expression COMMA expression COMMA expression RPAREN'''
     # 简单积分 \i(lower,upper,integrand)
-    p[0] = Integral(p[3], p[5], p[7])
+    p[0] = _interned(p, Integral(p[3], p[5], p[7]))
 
 def p_expression_integral_with_options(p):
-    '''expression : CMD_INTEGRAL integral_options LPAREN expression COMMA expression COMMA expression RPAREN'''
+    '''term : CMD_INTEGRAL integral_options LPAREN expression COMMA expression COMMA expression RPAREN'''
     # 带选项的积分 \i \su(1,5,3)
     integral = Integral(p[4], p[6], p[8])
     integral.set_integral_options(p[2])
-    p[0] = integral
+    p[0] = _interned(p, integral)
 
 def p_integral_options(p):
     '''integral_options : INTEGRAL_OPTION
@@ -128,9 +148,9 @@ def p_integral_options(p):
         p[0] = p[1]
 
 def p_expression_list(p):
-    '''expression : CMD_LIST LPAREN list_elements RPAREN'''
+    '''term : CMD_LIST LPAREN list_elements RPAREN'''
     # 列表 \l(A,B,C,D,E)
-    p[0] = List(p[3])
+    p[0] = _interned(p, List(p[3]))
 
 def p_list_elements(p):
     '''list_elements : expression
@@ -145,16 +165,16 @@ def p_list_elements(p):
         p[0] = p[1]
 
 def p_expression_overstrike_simple(p):
-    '''expression : CMD_OVERSTRIKE LPAREN overstrike_elements RPAREN'''
+    '''term : CMD_OVERSTRIKE LPAREN overstrike_elements RPAREN'''
     # 简单重叠 \o(A,B,C)
-    p[0] = Overstrike(p[3])
+    p[0] = _interned(p, Overstrike(p[3]))
 
 def p_expression_overstrike_with_options(p):
-    '''expression : CMD_OVERSTRIKE overstrike_options LPAREN overstrike_elements RPAREN'''
+    '''term : CMD_OVERSTRIKE overstrike_options LPAREN overstrike_elements RPAREN'''
     # 带选项的重叠 \o \al(A,B,C)
     overstrike = Overstrike(p[4])
     overstrike.set_overstrike_options(p[2])
-    p[0] = overstrike
+    p[0] = _interned(p, overstrike)
 
 def p_overstrike_options(p):
     '''overstrike_options : ALIGNMENT_OPTION
@@ -177,16 +197,16 @@ def p_overstrike_elements(p):
         p[0] = p[1]
 
 def p_expression_array_simple(p):
-    '''expression : CMD_ARRAY LPAREN array_elements RPAREN'''
+    '''term : CMD_ARRAY LPAREN array_elements RPAREN'''
     # 简单数组 \a(A,B,C,D)
-    p[0] = Array(p[3])
+    p[0] = _interned(p, Array(p[3]))
 
 def p_expression_array_with_options(p):
-    '''expression : CMD_ARRAY array_options LPAREN array_elements RPAREN'''
+    '''term : CMD_ARRAY array_options LPAREN array_elements RPAREN'''
     # 带选项的数组 \a \al \co2 \vs3 \hs3(Axy,Bxy,A,B)
     array = Array(p[4])
     array.set_array_options(p[2])
-    p[0] = array
+    p[0] = _interned(p, array)
 
 def p_array_options(p):
     '''array_options : ALIGNMENT_OPTION
@@ -211,16 +231,16 @@ def p_array_elements(p):
         p[0] = p[1]
 
 def p_expression_box_simple(p):
-    '''expression : CMD_BOX LPAREN expression RPAREN'''
+    '''term : CMD_BOX LPAREN expression RPAREN'''
     # 简单边框 \x(element)
-    p[0] = Box(p[3])
+    p[0] = _interned(p, Box(p[3]))
 
 def p_expression_box_with_options(p):
-    '''expression : CMD_BOX box_options LPAREN expression RPAREN'''
+    '''term : CMD_BOX box_options LPAREN expression RPAREN'''
     # 带选项的边框 \x \to \bo(element)
     box = Box(p[4])
     box.set_box_options(p[2])
-    p[0] = box
+    p[0] = _interned(p, box)
 
 def p_box_options(p):
     '''box_options : BOX_OPTION
@@ -232,18 +252,52 @@ def p_box_options(p):
         p[0] = p[1]
 
 def p_expression_text(p):
-    '''expression : TEXT'''
+    '''term : TEXT'''
     p[0] = p[1]
 
 def p_expression_operator(p):
-    '''expression : OPERATOR'''
+    '''term : OPERATOR'''
     p[0] = p[1]
 
-def p_error(p):
-    if p:
-        print(f"语法错误在标记 {p.type}")
-    else:
-        print("语法错误在文件末尾")
+def p_expression_error(p):
+    '''term : error'''
+    # 错误恢复：用空节点代替出错的部分，继续分析后面的参数与表达式
+    token = p[1]
+    if hasattr(token, 'recovered'):
+        # 同一标记第二次触发恢复，说明它在当前位置永远无法移进（如多余的右括号），
+        # 将其改为 error 符号，由分析器丢弃，避免反复恢复陷入死循环
+        token.type = 'error'
+    elif hasattr(token, 'type'):
+        token.recovered = True
+    p[0] = ErrorNode()
 
-# 构建语法分析器
-parser = yacc.yacc()
+def p_error(p):
+    # 错误交给当前线程的收集器；未开启错误恢复时终止分析
+    report_syntax(p)
+
+# 语法分析器在首次使用时从随包发布的 parsetab.py 构建：
+# 签名一致时直接加载分析表，不生成 parser.out，也不回写任何文件，可用于只读安装
+_parser = None
+_parser_lock = threading.Lock()
+
+def get_parser():
+    """返回模块级语法分析器，首次调用时构建"""
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                parser = yacc.yacc(debug=False, write_tables=False)
+                # 可选的 SubtreeInterner，由转换器在各线程的分析器副本上设置
+                parser.interner = None
+                _parser = parser
+    return _parser
+
+def __getattr__(name):
+    # 兼容旧的模块属性 parser
+    if name == 'parser':
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+if __name__ == '__main__':
+    # 修改文法后运行 python -m mseq2latex.parser 重新生成 parsetab.py 与 parser.out
+    yacc.yacc(outputdir=os.path.dirname(os.path.abspath(__file__)))
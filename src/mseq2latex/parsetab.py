@@ -6,9 +6,9 @@ _tabversion = '3.10'
 
 _lr_method = 'LALR'
 
-_lr_signature = 'ALIGNMENT_OPTION ARRAY_OPTION BOX_OPTION BRACKET_OPTION CMD_ALIGN_DEC CMD_ALIGN_INC CMD_ARRAY CMD_BOX CMD_BRACKET CMD_DISPLACE CMD_FRACTION CMD_INTEGRAL CMD_LIST CMD_OVERSTRIKE CMD_RADICAL CMD_SUB CMD_SUP COMMA DISPLACE_OPTION EQ IDENTIFIER INTEGRAL_OPTION LBRACE LPAREN NUMBER OPERATOR RBRACE RPAREN SEMICOLON TEXTeq_field : LBRACE EQ expression RBRACEexpression : expression expressionexpression : CMD_FRACTION LPAREN expression COMMA expression RPAREN\n| CMD_FRACTION LPAREN expression SEMICOLON expression RPARENexpression : IDENTIFIERexpression : NUMBERexpression : CMD_RADICAL LPAREN expression COMMA expression RPAREN\n| CMD_RADICAL LPAREN expression RPARENexpression : CMD_SUP LPAREN expression RPARENexpression : CMD_SUB LPAREN expression RPARENexpression : CMD_ALIGN_INC LPAREN expression RPARENexpression : CMD_ALIGN_DEC LPAREN expression RPARENexpression : CMD_BRACKET LPAREN expression RPARENexpression : CMD_BRACKET bracket_options LPAREN expression RPARENbracket_options : BRACKET_OPTION\n| bracket_options BRACKET_OPTIONexpression : CMD_DISPLACE LPAREN RPARENexpression : CMD_DISPLACE LPAREN expression RPARENexpression : CMD_DISPLACE displace_options LPAREN RPAREN\n| CMD_DISPLACE displace_options LPAREN expression RPARENdisplace_options : DISPLACE_OPTION\n| displace_options DISPLACE_OPTIONexpression : CMD_INTEGRAL LPAREN expression COMMA expression COMMA expression RPARENexpression : CMD_INTEGRAL integral_options LPAREN expression COMMA expression COMMA expression RPARENintegral_options : INTEGRAL_OPTION\n| integral_options INTEGRAL_OPTIONexpression : CMD_LIST LPAREN list_elements RPARENlist_elements : expression\n| list_elements COMMA expression\n| list_elements SEMICOLON expressionexpression : CMD_OVERSTRIKE LPAREN overstrike_elements RPARENexpression : CMD_OVERSTRIKE overstrike_options LPAREN overstrike_elements RPARENoverstrike_options : ALIGNMENT_OPTION\n| overstrike_options ALIGNMENT_OPTIONoverstrike_elements : expression\n| overstrike_elements COMMA expressionexpression : CMD_ARRAY LPAREN array_elements RPARENexpression : CMD_ARRAY array_options LPAREN array_elements RPARENarray_options : ALIGNMENT_OPTION\n| ARRAY_OPTION\n| array_options ALIGNMENT_OPTION\n| array_options ARRAY_OPTIONarray_elements : expression\n| array_elements COMMA expressionexpression : CMD_BOX LPAREN expression RPARENexpression : CMD_BOX box_options LPAREN expression RPARENbox_options : BOX_OPTION\n| box_options BOX_OPTIONexpression : TEXTexpression : OPERATOR'
+_lr_signature = 'ALIGNMENT_OPTION ARRAY_OPTION BOX_OPTION BRACKET_OPTION CMD_ALIGN_DEC CMD_ALIGN_INC CMD_ARRAY CMD_BOX CMD_BRACKET CMD_DISPLACE CMD_FRACTION CMD_INTEGRAL CMD_LIST CMD_OVERSTRIKE CMD_RADICAL CMD_SUB CMD_SUP COMMA DISPLACE_OPTION EQ IDENTIFIER INTEGRAL_OPTION LBRACE LPAREN NUMBER OPERATOR RBRACE RPAREN SEMICOLON TEXTeq_field : LBRACE EQ expression RBRACEexpression : termexpression : expression termterm : CMD_FRACTION LPAREN expression COMMA expression RPAREN\n| CMD_FRACTION LPAREN expression SEMICOLON expression RPARENterm : IDENTIFIERterm : NUMBERterm : CMD_RADICAL LPAREN expression COMMA expression RPAREN\n| CMD_RADICAL LPAREN expression RPARENterm : CMD_SUP LPAREN expression RPARENterm : CMD_SUB LPAREN expression RPARENterm : CMD_ALIGN_INC LPAREN expression RPARENterm : CMD_ALIGN_DEC LPAREN expression RPARENterm : CMD_BRACKET LPAREN expression RPARENterm : CMD_BRACKET bracket_options LPAREN expression RPARENbracket_options : BRACKET_OPTION\n| bracket_options BRACKET_OPTIONterm : CMD_DISPLACE LPAREN RPARENterm : CMD_DISPLACE LPAREN expression RPARENterm : CMD_DISPLACE displace_options LPAREN RPAREN\n| CMD_DISPLACE displace_options LPAREN expression RPARENdisplace_options : DISPLACE_OPTION\n| displace_options DISPLACE_OPTIONterm : CMD_INTEGRAL LPAREN expression COMMA expression COMMA expression RPARENterm : CMD_INTEGRAL integral_options LPAREN expression COMMA expression COMMA expression RPARENintegral_options : INTEGRAL_OPTION\n| integral_options INTEGRAL_OPTIONterm : CMD_LIST LPAREN list_elements RPARENlist_elements : expression\n| list_elements COMMA expression\n| list_elements SEMICOLON expressionterm : CMD_OVERSTRIKE LPAREN overstrike_elements RPARENterm : CMD_OVERSTRIKE overstrike_options LPAREN overstrike_elements RPARENoverstrike_options : ALIGNMENT_OPTION\n| overstrike_options ALIGNMENT_OPTIONoverstrike_elements : expression\n| overstrike_elements COMMA expressionterm : CMD_ARRAY LPAREN array_elements RPARENterm : CMD_ARRAY array_options LPAREN array_elements RPARENarray_options : ALIGNMENT_OPTION\n| ARRAY_OPTION\n| array_options ALIGNMENT_OPTION\n| array_options ARRAY_OPTIONarray_elements : expression\n| array_elements COMMA expressionterm : CMD_BOX LPAREN expression RPARENterm : CMD_BOX box_options LPAREN expression RPARENbox_options : BOX_OPTION\n| box_options BOX_OPTIONterm : TEXTterm : OPERATORterm : error'
     
-_lr_action_items = {'LBRACE':([0,],[2,]),'$end':([1,23,],[0,-1,]),'EQ':([2,],[3,]),'CMD_FRACTION':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[5,5,-5,-6,-49,-50,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,5,-17,5,5,5,5,5,5,5,5,5,5,5,5,5,5,-8,-9,-10,-11,-12,-13,5,-18,-19,5,5,5,-27,5,5,-31,5,-37,5,-45,5,5,5,5,-14,-20,5,5,5,5,5,-32,5,-38,-46,-3,-4,-7,5,5,5,5,-23,5,-24,]),'IDENTIFIER':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[6,6,-5,-6,-49,-50,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,-17,6,6,6,6,6,6,6,6,6,6,6,6,6,6,-8,-9,-10,-11,-12,-13,6,-18,-19,6,6,6,-27,6,6,-31,6,-37,6,-45,6,6,6,6,-14,-20,6,6,6,6,6,-32,6,-38,-46,-3,-4,-7,6,6,6,6,-23,6,-24,]),'NUMBER':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[7,7,-5,-6,-49,-50,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,-17,7,7,7,7,7,7,7,7,7,7,7,7,7,7,-8,-9,-10,-11,-12,-13,7,-18,-19,7,7,7,-27,7,7,-31,7,-37,7,-45,7,7,7,7,-14,-20,7,7,7,7,7,-32,7,-38,-46,-3,-4,-7,7,7,7,7,-23,7,-24,]),'CMD_RADICAL':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[8,8,-5,-6,-49,-50,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,-17,8,8,8,8,8,8,8,8,8,8,8,8,8,8,-8,-9,-10,-11,-12,-13,8,-18,-19,8,8,8,-27,8,8,-31,8,-37,8,-45,8,8,8,8,-14,-20,8,8,8,8,8,-32,8,-38,-46,-3,-4,-7,8,8,8,8,-23,8,-24,]),'CMD_SUP':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[9,9,-5,-6,-49,-50,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,-17,9,9,9,9,9,9,9,9,9,9,9,9,9,9,-8,-9,-10,-11,-12,-13,9,-18,-19,9,9,9,-27,9,9,-31,9,-37,9,-45,9,9,9,9,-14,-20,9,9,9,9,9,-32,9,-38,-46,-3,-4,-7,9,9,9,9,-23,9,-24,]),'CMD_SUB':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[10,10,-5,-6,-49,-50,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,-17,10,10,10,10,10,10,10,10,10,10,10,10,10,10,-8,-9,-10,-11,-12,-13,10,-18,-19,10,10,10,-27,10,10,-31,10,-37,10,-45,10,10,10,10,-14,-20,10,10,10,10,10,-32,10,-38,-46,-3,-4,-7,10,10,10,10,-23,10,-24,]),'CMD_ALIGN_INC':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[11,11,-5,-6,-49,-50,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,-17,11,11,11,11,11,11,11,11,11,11,11,11,11,11,-8,-9,-10,-11,-12,-13,11,-18,-19,11,11,11,-27,11,11,-31,11,-37,11,-45,11,11,11,11,-14,-20,11,11,11,11,11,-32,11,-38,-46,-3,-4,-7,11,11,11,11,-23,11,-24,]),'CMD_ALIGN_DEC':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[12,12,-5,-6,-49,-50,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,-17,12,12,12,12,12,12,12,12,12,12,12,12,12,12,-8,-9,-10,-11,-12,-13,12,-18,-19,12,12,12,-27,12,12,-31,12,-37,12,-45,12,12,12,12,-14,-20,12,12,12,12,12,-32,12,-38,-46,-3,-4,-7,12,12,12,12,-23,12,-24,]),'CMD_BRACKET':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[13,13,-5,-6,-49,-50,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,-17,13,13,13,13,13,13,13,13,13,13,13,13,13,13,-8,-9,-10,-11,-12,-13,13,-18,-19,13,13,13,-27,13,13,-31,13,-37,13,-45,13,13,13,13,-14,-20,13,13,13,13,13,-32,13,-38,-46,-3,-4,-7,13,13,13,13,-23,13,-24,]),'CMD_DISPLACE':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[14,14,-5,-6,-49,-50,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,-17,14,14,14,14,14,14,14,14,14,14,14,14,14,14,-8,-9,-10,-11,-12,-13,14,-18,-19,14,14,14,-27,14,14,-31,14,-37,14,-45,14,14,14,14,-14,-20,14,14,14,14,14,-32,14,-38,-46,-3,-4,-7,14,14,14,14,-23,14,-24,]),'CMD_INTEGRAL':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[15,15,-5,-6,-49,-50,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,-17,15,15,15,15,15,15,15,15,15,15,15,15,15,15,-8,-9,-10,-11,-12,-13,15,-18,-19,15,15,15,-27,15,15,-31,15,-37,15,-45,15,15,15,15,-14,-20,15,15,15,15,15,-32,15,-38,-46,-3,-4,-7,15,15,15,15,-23,15,-24,]),'CMD_LIST':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[16,16,-5,-6,-49,-50,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,-17,16,16,16,16,16,16,16,16,16,16,16,16,16,16,-8,-9,-10,-11,-12,-13,16,-18,-19,16,16,16,-27,16,16,-31,16,-37,16,-45,16,16,16,16,-14,-20,16,16,16,16,16,-32,16,-38,-46,-3,-4,-7,16,16,16,16,-23,16,-24,]),'CMD_OVERSTRIKE':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[17,17,-5,-6,-49,-50,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,-17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,-8,-9,-10,-11,-12,-13,17,-18,-19,17,17,17,-27,17,17,-31,17,-37,17,-45,17,17,17,17,-14,-20,17,17,17,17,17,-32,17,-38,-46,-3,-4,-7,17,17,17,17,-23,17,-24,]),'CMD_ARRAY':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[18,18,-5,-6,-49,-50,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,-17,18,18,18,18,18,18,18,18,18,18,18,18,18,18,-8,-9,-10,-11,-12,-13,18,-18,-19,18,18,18,-27,18,18,-31,18,-37,18,-45,18,18,18,18,-14,-20,18,18,18,18,18,-32,18,-38,-46,-3,-4,-7,18,18,18,18,-23,18,-24,]),'CMD_BOX':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[19,19,-5,-6,-49,-50,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,-17,19,19,19,19,19,19,19,19,19,19,19,19,19,19,-8,-9,-10,-11,-12,-13,19,-18,-19,19,19,19,-27,19,19,-31,19,-37,19,-45,19,19,19,19,-14,-20,19,19,19,19,19,-32,19,-38,-46,-3,-4,-7,19,19,19,19,-23,19,-24,]),'TEXT':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[20,20,-5,-6,-49,-50,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,-17,20,20,20,20,20,20,20,20,20,20,20,20,20,20,-8,-9,-10,-11,-12,-13,20,-18,-19,20,20,20,-27,20,20,-31,20,-37,20,-45,20,20,20,20,-14,-20,20,20,20,20,20,-32,20,-38,-46,-3,-4,-7,20,20,20,20,-23,20,-24,]),'OPERATOR':([3,4,6,7,20,21,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,59,60,61,63,64,67,69,70,73,74,77,78,80,81,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,101,102,104,105,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,],[21,21,-5,-6,-49,-50,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,-17,21,21,21,21,21,21,21,21,21,21,21,21,21,21,-8,-9,-10,-11,-12,-13,21,-18,-19,21,21,21,-27,21,21,-31,21,-37,21,-45,21,21,21,21,-14,-20,21,21,21,21,21,-32,21,-38,-46,-3,-4,-7,21,21,21,21,-23,21,-24,]),'RBRACE':([4,6,7,20,21,22,59,83,84,85,86,87,88,90,91,95,98,101,104,109,110,116,118,119,120,121,122,127,129,],[23,-5,-6,-49,-50,-2,-17,-8,-9,-10,-11,-12,-13,-18,-19,-27,-31,-37,-45,-14,-20,-32,-38,-46,-3,-4,-7,-23,-24,]),'LPAREN':([5,8,9,10,11,12,13,14,15,16,17,18,19,31,32,34,35,37,38,41,42,44,45,46,48,49,58,62,65,71,75,76,79,],[24,25,26,27,28,29,30,33,36,39,40,43,47,57,-15,61,-21,64,-25,70,-33,74,-39,-40,78,-47,-16,-22,-26,-34,-41,-42,-48,]),'COMMA':([6,7,20,21,22,50,51,59,63,66,67,68,69,72,73,83,84,85,86,87,88,90,91,94,95,98,100,101,103,104,109,110,111,113,114,115,116,117,118,119,120,121,122,124,127,129,],[-5,-6,-49,-50,-2,80,82,-17,93,96,-28,99,-35,102,-43,-8,-9,-10,-11,-12,-13,-18,-19,112,-27,-31,99,-37,102,-45,-14,-20,123,-29,-30,-36,-32,-44,-38,-46,-3,-4,-7,126,-23,-24,]),'SEMICOLON':([6,7,20,21,22,50,59,66,67,83,84,85,86,87,88,90,91,95,98,101,104,109,110,113,114,116,118,119,120,121,122,127,129,],[-5,-6,-49,-50,-2,81,-17,97,-28,-8,-9,-10,-11,-12,-13,-18,-19,-27,-31,-37,-45,-14,-20,-29,-30,-32,-38,-46,-3,-4,-7,-23,-24,]),'RPAREN':([6,7,20,21,22,33,51,52,53,54,55,56,59,60,61,66,67,68,69,72,73,77,83,84,85,86,87,88,89,90,91,92,95,98,100,101,103,104,105,106,107,108,109,110,113,114,115,116,117,118,119,120,121,122,125,127,128,129,],[-5,-6,-49,-50,-2,59,83,84,85,86,87,88,-17,90,91,95,-28,98,-35,101,-43,104,-8,-9,-10,-11,-12,-13,109,-18,-19,110,-27,-31,116,-37,118,-45,119,120,121,122,-14,-20,-29,-30,-36,-32,-44,-38,-46,-3,-4,-7,127,-23,129,-24,]),'BRACKET_OPTION':([13,31,32,58,],[32,58,-15,-16,]),'DISPLACE_OPTION':([14,34,35,62,],[35,62,-21,-22,]),'INTEGRAL_OPTION':([15,37,38,65,],[38,65,-25,-26,]),'ALIGNMENT_OPTION':([17,18,41,42,44,45,46,71,75,76,],[42,45,71,-33,75,-39,-40,-34,-41,-42,]),'ARRAY_OPTION':([18,44,45,46,75,76,],[46,76,-39,-40,-41,-42,]),'BOX_OPTION':([19,48,49,79,],[49,79,-47,-48,]),}
+_lr_action_items = {'LBRACE':([0,],[2,]),'$end':([1,24,],[0,-1,]),'EQ':([2,],[3,]),'CMD_FRACTION':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[6,6,-2,-6,-7,-50,-51,-52,-3,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,6,-18,6,6,6,6,6,6,6,6,6,6,6,6,6,6,-9,-10,-11,-12,-13,-14,6,-19,-20,6,6,6,-28,6,6,-32,6,-38,6,-46,6,6,6,6,-15,-21,6,6,6,6,6,-33,6,-39,-47,-4,-5,-8,6,6,6,6,-24,6,-25,]),'IDENTIFIER':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[7,7,-2,-6,-7,-50,-51,-52,-3,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,7,-18,7,7,7,7,7,7,7,7,7,7,7,7,7,7,-9,-10,-11,-12,-13,-14,7,-19,-20,7,7,7,-28,7,7,-32,7,-38,7,-46,7,7,7,7,-15,-21,7,7,7,7,7,-33,7,-39,-47,-4,-5,-8,7,7,7,7,-24,7,-25,]),'NUMBER':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[8,8,-2,-6,-7,-50,-51,-52,-3,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,8,-18,8,8,8,8,8,8,8,8,8,8,8,8,8,8,-9,-10,-11,-12,-13,-14,8,-19,-20,8,8,8,-28,8,8,-32,8,-38,8,-46,8,8,8,8,-15,-21,8,8,8,8,8,-33,8,-39,-47,-4,-5,-8,8,8,8,8,-24,8,-25,]),'CMD_RADICAL':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[9,9,-2,-6,-7,-50,-51,-52,-3,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,9,-18,9,9,9,9,9,9,9,9,9,9,9,9,9,9,-9,-10,-11,-12,-13,-14,9,-19,-20,9,9,9,-28,9,9,-32,9,-38,9,-46,9,9,9,9,-15,-21,9,9,9,9,9,-33,9,-39,-47,-4,-5,-8,9,9,9,9,-24,9,-25,]),'CMD_SUP':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[10,10,-2,-6,-7,-50,-51,-52,-3,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,10,-18,10,10,10,10,10,10,10,10,10,10,10,10,10,10,-9,-10,-11,-12,-13,-14,10,-19,-20,10,10,10,-28,10,10,-32,10,-38,10,-46,10,10,10,10,-15,-21,10,10,10,10,10,-33,10,-39,-47,-4,-5,-8,10,10,10,10,-24,10,-25,]),'CMD_SUB':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[11,11,-2,-6,-7,-50,-51,-52,-3,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,11,-18,11,11,11,11,11,11,11,11,11,11,11,11,11,11,-9,-10,-11,-12,-13,-14,11,-19,-20,11,11,11,-28,11,11,-32,11,-38,11,-46,11,11,11,11,-15,-21,11,11,11,11,11,-33,11,-39,-47,-4,-5,-8,11,11,11,11,-24,11,-25,]),'CMD_ALIGN_INC':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[12,12,-2,-6,-7,-50,-51,-52,-3,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,12,-18,12,12,12,12,12,12,12,12,12,12,12,12,12,12,-9,-10,-11,-12,-13,-14,12,-19,-20,12,12,12,-28,12,12,-32,12,-38,12,-46,12,12,12,12,-15,-21,12,12,12,12,12,-33,12,-39,-47,-4,-5,-8,12,12,12,12,-24,12,-25,]),'CMD_ALIGN_DEC':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[13,13,-2,-6,-7,-50,-51,-52,-3,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,13,-18,13,13,13,13,13,13,13,13,13,13,13,13,13,13,-9,-10,-11,-12,-13,-14,13,-19,-20,13,13,13,-28,13,13,-32,13,-38,13,-46,13,13,13,13,-15,-21,13,13,13,13,13,-33,13,-39,-47,-4,-5,-8,13,13,13,13,-24,13,-25,]),'CMD_BRACKET':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[14,14,-2,-6,-7,-50,-51,-52,-3,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,14,-18,14,14,14,14,14,14,14,14,14,14,14,14,14,14,-9,-10,-11,-12,-13,-14,14,-19,-20,14,14,14,-28,14,14,-32,14,-38,14,-46,14,14,14,14,-15,-21,14,14,14,14,14,-33,14,-39,-47,-4,-5,-8,14,14,14,14,-24,14,-25,]),'CMD_DISPLACE':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[15,15,-2,-6,-7,-50,-51,-52,-3,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,15,-18,15,15,15,15,15,15,15,15,15,15,15,15,15,15,-9,-10,-11,-12,-13,-14,15,-19,-20,15,15,15,-28,15,15,-32,15,-38,15,-46,15,15,15,15,-15,-21,15,15,15,15,15,-33,15,-39,-47,-4,-5,-8,15,15,15,15,-24,15,-25,]),'CMD_INTEGRAL':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[16,16,-2,-6,-7,-50,-51,-52,-3,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,16,-18,16,16,16,16,16,16,16,16,16,16,16,16,16,16,-9,-10,-11,-12,-13,-14,16,-19,-20,16,16,16,-28,16,16,-32,16,-38,16,-46,16,16,16,16,-15,-21,16,16,16,16,16,-33,16,-39,-47,-4,-5,-8,16,16,16,16,-24,16,-25,]),'CMD_LIST':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[17,17,-2,-6,-7,-50,-51,-52,-3,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,17,-18,17,17,17,17,17,17,17,17,17,17,17,17,17,17,-9,-10,-11,-12,-13,-14,17,-19,-20,17,17,17,-28,17,17,-32,17,-38,17,-46,17,17,17,17,-15,-21,17,17,17,17,17,-33,17,-39,-47,-4,-5,-8,17,17,17,17,-24,17,-25,]),'CMD_OVERSTRIKE':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[18,18,-2,-6,-7,-50,-51,-52,-3,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,-18,18,18,18,18,18,18,18,18,18,18,18,18,18,18,-9,-10,-11,-12,-13,-14,18,-19,-20,18,18,18,-28,18,18,-32,18,-38,18,-46,18,18,18,18,-15,-21,18,18,18,18,18,-33,18,-39,-47,-4,-5,-8,18,18,18,18,-24,18,-25,]),'CMD_ARRAY':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[19,19,-2,-6,-7,-50,-51,-52,-3,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,19,-18,19,19,19,19,19,19,19,19,19,19,19,19,19,19,-9,-10,-11,-12,-13,-14,19,-19,-20,19,19,19,-28,19,19,-32,19,-38,19,-46,19,19,19,19,-15,-21,19,19,19,19,19,-33,19,-39,-47,-4,-5,-8,19,19,19,19,-24,19,-25,]),'CMD_BOX':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[20,20,-2,-6,-7,-50,-51,-52,-3,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,20,-18,20,20,20,20,20,20,20,20,20,20,20,20,20,20,-9,-10,-11,-12,-13,-14,20,-19,-20,20,20,20,-28,20,20,-32,20,-38,20,-46,20,20,20,20,-15,-21,20,20,20,20,20,-33,20,-39,-47,-4,-5,-8,20,20,20,20,-24,20,-25,]),'TEXT':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[21,21,-2,-6,-7,-50,-51,-52,-3,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,21,-18,21,21,21,21,21,21,21,21,21,21,21,21,21,21,-9,-10,-11,-12,-13,-14,21,-19,-20,21,21,21,-28,21,21,-32,21,-38,21,-46,21,21,21,21,-15,-21,21,21,21,21,21,-33,21,-39,-47,-4,-5,-8,21,21,21,21,-24,21,-25,]),'OPERATOR':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[22,22,-2,-6,-7,-50,-51,-52,-3,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,22,-18,22,22,22,22,22,22,22,22,22,22,22,22,22,22,-9,-10,-11,-12,-13,-14,22,-19,-20,22,22,22,-28,22,22,-32,22,-38,22,-46,22,22,22,22,-15,-21,22,22,22,22,22,-33,22,-39,-47,-4,-5,-8,22,22,22,22,-24,22,-25,]),'error':([3,4,5,7,8,21,22,23,25,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,61,62,63,65,66,69,71,72,75,76,79,80,82,83,84,85,86,87,88,89,90,91,92,93,94,95,96,97,98,99,100,101,103,104,106,107,108,109,110,111,112,113,114,115,116,117,118,119,120,121,122,123,124,125,126,127,128,129,130,131,],[23,23,-2,-6,-7,-50,-51,-52,-3,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,23,-18,23,23,23,23,23,23,23,23,23,23,23,23,23,23,-9,-10,-11,-12,-13,-14,23,-19,-20,23,23,23,-28,23,23,-32,23,-38,23,-46,23,23,23,23,-15,-21,23,23,23,23,23,-33,23,-39,-47,-4,-5,-8,23,23,23,23,-24,23,-25,]),'RBRACE':([4,5,7,8,21,22,23,25,61,85,86,87,88,89,90,92,93,97,100,103,106,111,112,118,120,121,122,123,124,129,131,],[24,-2,-6,-7,-50,-51,-52,-3,-18,-9,-10,-11,-12,-13,-14,-19,-20,-28,-32,-38,-46,-15,-21,-33,-39,-47,-4,-5,-8,-24,-25,]),'COMMA':([5,7,8,21,22,23,25,52,53,61,65,68,69,70,71,74,75,85,86,87,88,89,90,92,93,96,97,100,102,103,105,106,111,112,113,115,116,117,118,119,120,121,122,123,124,126,129,131,],[-2,-6,-7,-50,-51,-52,-3,82,84,-18,95,98,-29,101,-36,104,-44,-9,-10,-11,-12,-13,-14,-19,-20,114,-28,-32,101,-38,104,-46,-15,-21,125,-30,-31,-37,-33,-45,-39,-47,-4,-5,-8,128,-24,-25,]),'SEMICOLON':([5,7,8,21,22,23,25,52,61,68,69,85,86,87,88,89,90,92,93,97,100,103,106,111,112,115,116,118,120,121,122,123,124,129,131,],[-2,-6,-7,-50,-51,-52,-3,83,-18,99,-29,-9,-10,-11,-12,-13,-14,-19,-20,-28,-32,-38,-46,-15,-21,-30,-31,-33,-39,-47,-4,-5,-8,-24,-25,]),'RPAREN':([5,7,8,21,22,23,25,35,53,54,55,56,57,58,61,62,63,68,69,70,71,74,75,79,85,86,87,88,89,90,91,92,93,94,97,100,102,103,105,106,107,108,109,110,111,112,115,116,117,118,119,120,121,122,123,124,127,129,130,131,],[-2,-6,-7,-50,-51,-52,-3,61,85,86,87,88,89,90,-18,92,93,97,-29,100,-36,103,-44,106,-9,-10,-11,-12,-13,-14,111,-19,-20,112,-28,-32,118,-38,120,-46,121,122,123,124,-15,-21,-30,-31,-37,-33,-45,-39,-47,-4,-5,-8,129,-24,131,-25,]),'LPAREN':([6,9,10,11,12,13,14,15,16,17,18,19,20,33,34,36,37,39,40,43,44,46,47,48,50,51,60,64,67,73,77,78,81,],[26,27,28,29,30,31,32,35,38,41,42,45,49,59,-16,63,-22,66,-26,72,-34,76,-40,-41,80,-48,-17,-23,-27,-35,-42,-43,-49,]),'BRACKET_OPTION':([14,33,34,60,],[34,60,-16,-17,]),'DISPLACE_OPTION':([15,36,37,64,],[37,64,-22,-23,]),'INTEGRAL_OPTION':([16,39,40,67,],[40,67,-26,-27,]),'ALIGNMENT_OPTION':([18,19,43,44,46,47,48,73,77,78,],[44,47,73,-34,77,-40,-41,-35,-42,-43,]),'ARRAY_OPTION':([19,46,47,48,77,78,],[48,78,-40,-41,-42,-43,]),'BOX_OPTION':([20,50,51,81,],[51,81,-48,-49,]),}
 
 _lr_action = {}
 for _k, _v in _lr_action_items.items():
@@ -17,7 +17,7 @@ for _k, _v in _lr_action_items.items():
       _lr_action[_x][_k] = _y
 del _lr_action_items
 
-_lr_goto_items = {'eq_field':([0,],[1,]),'expression':([3,4,22,24,25,26,27,28,29,30,33,36,39,40,43,47,50,51,52,53,54,55,56,57,60,61,63,64,67,69,70,73,74,77,78,80,81,82,89,92,93,94,96,97,99,102,105,106,107,108,111,112,113,114,115,117,123,124,125,126,128,],[4,22,22,50,51,52,53,54,55,56,60,63,67,69,73,77,22,22,22,22,22,22,22,89,22,92,22,94,22,22,69,22,73,22,105,106,107,108,22,22,111,22,113,114,115,117,22,22,22,22,22,124,22,22,22,22,125,22,22,128,22,]),'bracket_options':([13,],[31,]),'displace_options':([14,],[34,]),'integral_options':([15,],[37,]),'overstrike_options':([17,],[41,]),'array_options':([18,],[44,]),'box_options':([19,],[48,]),'list_elements':([39,],[66,]),'overstrike_elements':([40,70,],[68,100,]),'array_elements':([43,74,],[72,103,]),}
+_lr_goto_items = {'eq_field':([0,],[1,]),'expression':([3,26,27,28,29,30,31,32,35,38,41,42,45,49,59,63,66,72,76,80,82,83,84,95,98,99,101,104,114,125,128,],[4,52,53,54,55,56,57,58,62,65,69,71,75,79,91,94,96,71,75,107,108,109,110,113,115,116,117,119,126,127,130,]),'term':([3,4,26,27,28,29,30,31,32,35,38,41,42,45,49,52,53,54,55,56,57,58,59,62,63,65,66,69,71,72,75,76,79,80,82,83,84,91,94,95,96,98,99,101,104,107,108,109,110,113,114,115,116,117,119,125,126,127,128,130,],[5,25,5,5,5,5,5,5,5,5,5,5,5,5,5,25,25,25,25,25,25,25,5,25,5,25,5,25,25,5,25,5,25,5,5,5,5,25,25,5,25,5,5,5,5,25,25,25,25,25,5,25,25,25,25,5,25,25,5,25,]),'bracket_options':([14,],[33,]),'displace_options':([15,],[36,]),'integral_options':([16,],[39,]),'overstrike_options':([18,],[43,]),'array_options':([19,],[46,]),'box_options':([20,],[50,]),'list_elements':([41,],[68,]),'overstrike_elements':([42,72,],[70,102,]),'array_elements':([45,76,],[74,105,]),}
 
 _lr_goto = {}
 for _k, _v in _lr_goto_items.items():
@@ -27,54 +27,56 @@ for _k, _v in _lr_goto_items.items():
 del _lr_goto_items
 _lr_productions = [
   ("S' -> eq_field","S'",1,None,None,None),
-  ('eq_field -> LBRACE EQ expression RBRACE','eq_field',4,'p_eq_field','parser.py',7),
-  ('expression -> expression expression','expression',2,'p_expression_sequence','parser.py',11),
-  ('expression -> CMD_FRACTION LPAREN expression COMMA expression RPAREN','expression',6,'p_expression_fraction','parser.py',20),
-  ('expression -> CMD_FRACTION LPAREN expression SEMICOLON expression RPAREN','expression',6,'p_expression_fraction','parser.py',21),
-  ('expression -> IDENTIFIER','expression',1,'p_expression_identifier','parser.py',25),
-  ('expression -> NUMBER','expression',1,'p_expression_number','parser.py',29),
-  ('expression -> CMD_RADICAL LPAREN expression COMMA expression RPAREN','expression',6,'p_expression_radical','parser.py',33),
-  ('expression -> CMD_RADICAL LPAREN expression RPAREN','expression',4,'p_expression_radical','parser.py',34),
-  ('expression -> CMD_SUP LPAREN expression RPAREN','expression',4,'p_expression_superscript','parser.py',41),
-  ('expression -> CMD_SUB LPAREN expression RPAREN','expression',4,'p_expression_subscript','parser.py',45),
-  ('expression -> CMD_ALIGN_INC LPAREN expression RPAREN','expression',4,'p_expression_space_ai','parser.py',49),
-  ('expression -> CMD_ALIGN_DEC LPAREN expression RPAREN','expression',4,'p_expression_space_di','parser.py',53),
-  ('expression -> CMD_BRACKET LPAREN expression RPAREN','expression',4,'p_expression_bracket_simple','parser.py',57),
-  ('expression -> CMD_BRACKET bracket_options LPAREN expression RPAREN','expression',5,'p_expression_bracket_with_options','parser.py',62),
-  ('bracket_options -> BRACKET_OPTION','bracket_options',1,'p_bracket_options','parser.py',69),
-  ('bracket_options -> bracket_options BRACKET_OPTION','bracket_options',2,'p_bracket_options','parser.py',70),
-  ('expression -> CMD_DISPLACE LPAREN RPAREN','expression',3,'p_expression_displace_simple','parser.py',78),
-  ('expression -> CMD_DISPLACE LPAREN expression RPAREN','expression',4,'p_expression_displace_with_content','parser.py',83),
-  ('expression -> CMD_DISPLACE displace_options LPAREN RPAREN','expression',4,'p_expression_displace_with_options','parser.py',88),
-  ('expression -> CMD_DISPLACE displace_options LPAREN expression RPAREN','expression',5,'p_expression_displace_with_options','parser.py',89),
-  ('displace_options -> DISPLACE_OPTION','displace_options',1,'p_displace_options','parser.py',101),
-  ('displace_options -> displace_options DISPLACE_OPTION','displace_options',2,'p_displace_options','parser.py',102),
-  ('expression -> CMD_INTEGRAL LPAREN expression COMMA expression COMMA expression RPAREN','expression',8,'p_expression_integral_simple','parser.py',110),
-  ('expression -> CMD_INTEGRAL integral_options LPAREN expression COMMA expression COMMA expression RPAREN','expression',9,'p_expression_integral_with_options','parser.py',115),
-  ('integral_options -> INTEGRAL_OPTION','integral_options',1,'p_integral_options','parser.py',122),
-  ('integral_options -> integral_options INTEGRAL_OPTION','integral_options',2,'p_integral_options','parser.py',123),
-  ('expression -> CMD_LIST LPAREN list_elements RPAREN','expression',4,'p_expression_list','parser.py',131),
-  ('list_elements -> expression','list_elements',1,'p_list_elements','parser.py',136),
-  ('list_elements -> list_elements COMMA expression','list_elements',3,'p_list_elements','parser.py',137),
-  ('list_elements -> list_elements SEMICOLON expression','list_elements',3,'p_list_elements','parser.py',138),
-  ('expression -> CMD_OVERSTRIKE LPAREN overstrike_elements RPAREN','expression',4,'p_expression_overstrike_simple','parser.py',148),
-  ('expression -> CMD_OVERSTRIKE overstrike_options LPAREN overstrike_elements RPAREN','expression',5,'p_expression_overstrike_with_options','parser.py',153),
-  ('overstrike_options -> ALIGNMENT_OPTION','overstrike_options',1,'p_overstrike_options','parser.py',160),
-  ('overstrike_options -> overstrike_options ALIGNMENT_OPTION','overstrike_options',2,'p_overstrike_options','parser.py',161),
-  ('overstrike_elements -> expression','overstrike_elements',1,'p_overstrike_elements','parser.py',169),
-  ('overstrike_elements -> overstrike_elements COMMA expression','overstrike_elements',3,'p_overstrike_elements','parser.py',170),
-  ('expression -> CMD_ARRAY LPAREN array_elements RPAREN','expression',4,'p_expression_array_simple','parser.py',180),
-  ('expression -> CMD_ARRAY array_options LPAREN array_elements RPAREN','expression',5,'p_expression_array_with_options','parser.py',185),
-  ('array_options -> ALIGNMENT_OPTION','array_options',1,'p_array_options','parser.py',192),
-  ('array_options -> ARRAY_OPTION','array_options',1,'p_array_options','parser.py',193),
-  ('array_options -> array_options ALIGNMENT_OPTION','array_options',2,'p_array_options','parser.py',194),
-  ('array_options -> array_options ARRAY_OPTION','array_options',2,'p_array_options','parser.py',195),
-  ('array_elements -> expression','array_elements',1,'p_array_elements','parser.py',203),
-  ('array_elements -> array_elements COMMA expression','array_elements',3,'p_array_elements','parser.py',204),
-  ('expression -> CMD_BOX LPAREN expression RPAREN','expression',4,'p_expression_box_simple','parser.py',214),
-  ('expression -> CMD_BOX box_options LPAREN expression RPAREN','expression',5,'p_expression_box_with_options','parser.py',219),
-  ('box_options -> BOX_OPTION','box_options',1,'p_box_options','parser.py',226),
-  ('box_options -> box_options BOX_OPTION','box_options',2,'p_box_options','parser.py',227),
-  ('expression -> TEXT','expression',1,'p_expression_text','parser.py',235),
-  ('expression -> OPERATOR','expression',1,'p_expression_operator','parser.py',239),
+  ('eq_field -> LBRACE EQ expression RBRACE','eq_field',4,'p_eq_field','parser.py',16),
+  ('expression -> term','expression',1,'p_expression_term','parser.py',20),
+  ('expression -> expression term','expression',2,'p_expression_sequence','parser.py',24),
+  ('term -> CMD_FRACTION LPAREN expression COMMA expression RPAREN','term',6,'p_expression_fraction','parser.py',40),
+  ('term -> CMD_FRACTION LPAREN expression SEMICOLON expression RPAREN','term',6,'p_expression_fraction','parser.py',41),
+  ('term -> IDENTIFIER','term',1,'p_expression_identifier','parser.py',45),
+  ('term -> NUMBER','term',1,'p_expression_number','parser.py',49),
+  ('term -> CMD_RADICAL LPAREN expression COMMA expression RPAREN','term',6,'p_expression_radical','parser.py',53),
+  ('term -> CMD_RADICAL LPAREN expression RPAREN','term',4,'p_expression_radical','parser.py',54),
+  ('term -> CMD_SUP LPAREN expression RPAREN','term',4,'p_expression_superscript','parser.py',61),
+  ('term -> CMD_SUB LPAREN expression RPAREN','term',4,'p_expression_subscript','parser.py',65),
+  ('term -> CMD_ALIGN_INC LPAREN expression RPAREN','term',4,'p_expression_space_ai','parser.py',69),
+  ('term -> CMD_ALIGN_DEC LPAREN expression RPAREN','term',4,'p_expression_space_di','parser.py',73),
+  ('term -> CMD_BRACKET LPAREN expression RPAREN','term',4,'p_expression_bracket_simple','parser.py',77),
+  ('term -> CMD_BRACKET bracket_options LPAREN expression RPAREN','term',5,'p_expression_bracket_with_options','parser.py',82),
+  ('bracket_options -> BRACKET_OPTION','bracket_options',1,'p_bracket_options','parser.py',89),
+  ('bracket_options -> bracket_options BRACKET_OPTION','bracket_options',2,'p_bracket_options','parser.py',90),
+  ('term -> CMD_DISPLACE LPAREN RPAREN','term',3,'p_expression_displace_simple','parser.py',98),
+  ('term -> CMD_DISPLACE LPAREN expression RPAREN','term',4,'p_expression_displace_with_content','parser.py',103),
+  ('term -> CMD_DISPLACE displace_options LPAREN RPAREN','term',4,'p_expression_displace_with_options','parser.py',108),
+  ('term -> CMD_DISPLACE displace_options LPAREN expression RPAREN','term',5,'p_expression_displace_with_options','parser.py',109),
+  ('displace_options -> DISPLACE_OPTION','displace_options',1,'p_displace_options','parser.py',121),
+  ('displace_options -> displace_options DISPLACE_OPTION','displace_options',2,'p_displace_options','parser.py',122),
+  ('term -> CMD_INTEGRAL LPAREN expression COMMA expression COMMA expression RPAREN','term',8,'p_expression_integral_simple','parser.py',130),
+  ('term -> CMD_INTEGRAL integral_options LPAREN expression COMMA expression COMMA expression RPAREN','term',9,'p_expression_integral_with_options','parser.py',135),
+  ('integral_options -> INTEGRAL_OPTION','integral_options',1,'p_integral_options','parser.py',142),
+  ('integral_options -> integral_options INTEGRAL_OPTION','integral_options',2,'p_integral_options','parser.py',143),
+  ('term -> CMD_LIST LPAREN list_elements RPAREN','term',4,'p_expression_list','parser.py',151),
+  ('list_elements -> expression','list_elements',1,'p_list_elements','parser.py',156),
+  ('list_elements -> list_elements COMMA expression','list_elements',3,'p_list_elements','parser.py',157),
+  ('list_elements -> list_elements SEMICOLON expression','list_elements',3,'p_list_elements','parser.py',158),
+  ('term -> CMD_OVERSTRIKE LPAREN overstrike_elements RPAREN','term',4,'p_expression_overstrike_simple','parser.py',168),
+  ('term -> CMD_OVERSTRIKE overstrike_options LPAREN overstrike_elements RPAREN','term',5,'p_expression_overstrike_with_options','parser.py',173),
+  ('overstrike_options -> ALIGNMENT_OPTION','overstrike_options',1,'p_overstrike_options','parser.py',180),
+  ('overstrike_options -> overstrike_options ALIGNMENT_OPTION','overstrike_options',2,'p_overstrike_options','parser.py',181),
+  ('overstrike_elements -> expression','overstrike_elements',1,'p_overstrike_elements','parser.py',189),
+  ('overstrike_elements -> overstrike_elements COMMA expression','overstrike_elements',3,'p_overstrike_elements','parser.py',190),
+  ('term -> CMD_ARRAY LPAREN array_elements RPAREN','term',4,'p_expression_array_simple','parser.py',200),
+  ('term -> CMD_ARRAY array_options LPAREN array_elements RPAREN','term',5,'p_expression_array_with_options','parser.py',205),
+  ('array_options -> ALIGNMENT_OPTION','array_options',1,'p_array_options','parser.py',212),
+  ('array_options -> ARRAY_OPTION','array_options',1,'p_array_options','parser.py',213),
+  ('array_options -> array_options ALIGNMENT_OPTION','array_options',2,'p_array_options','parser.py',214),
+  ('array_options -> array_options ARRAY_OPTION','array_options',2,'p_array_options','parser.py',215),
+  ('array_elements -> expression','array_elements',1,'p_array_elements','parser.py',223),
+  ('array_elements -> array_elements COMMA expression','array_elements',3,'p_array_elements','parser.py',224),
+  ('term -> CMD_BOX LPAREN expression RPAREN','term',4,'p_expression_box_simple','parser.py',234),
+  ('term -> CMD_BOX box_options LPAREN expression RPAREN','term',5,'p_expression_box_with_options','parser.py',239),
+  ('box_options -> BOX_OPTION','box_options',1,'p_box_options','parser.py',246),
+  ('box_options -> box_options BOX_OPTION','box_options',2,'p_box_options','parser.py',247),
+  ('term -> TEXT','term',1,'p_expression_text','parser.py',255),
+  ('term -> OPERATOR','term',1,'p_expression_operator','parser.py',259),
+  ('term -> error','term',1,'p_expression_error','parser.py',263),
 ]
@@ -0,0 +1,415 @@
+"""可断点续跑的目录级批量转换流水线
+
+发现、提取、转换、写出四个阶段由有界队列串联，各阶段的并发数分别设置，内存占用与文件数无关：
+- 发现：遍历输入目录，跳过清单中已完成且未修改的文件（一个线程）
+- 提取：读取 .docx（见 docx）或文本文件（见 stream）中的EQ域
+- 转换：在进程池中转换，工作进程每处理 recycle_after 个任务后整体更换，限制长时间运行的内存增长
+- 写出：每个输入文件写出一个JSONL结果文件，写完后在清单中追加一条记录
+
+清单是追加写入的JSONL，每完成一个文件立即落盘；中途崩溃后重新运行，已完成的文件直接跳过。
+"""
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import batch
+from .docx import iter_eq_fields
+from .index import _map
+from .stream import DEFAULT_MAX_FIELD_SIZE, iter_field_spans
+
+DEFAULT_EXTENSIONS = ('.docx', '.txt', '.md')
+MANIFEST_NAME = 'manifest.jsonl'
+# 阶段之间每个队列最多容纳的文件数
+DEFAULT_QUEUE_SIZE = 64
+# 进度行的输出间隔（秒）
+DEFAULT_PROGRESS_INTERVAL = 5.0
+
+# 队列结束标记
+_DONE = object()
+
+
+class _Job:
+    """流水线中的一个输入文件"""
+    __slots__ = ('path', 'relative', 'size', 'mtime_ns', 'locations', 'codes', 'results', 'error')
+
+    def __init__(self, path, relative, stat):
+        self.path = path
+        self.relative = relative
+        # 无法取得文件信息（如失效的符号链接）时 stat 为 None，该文件直接记为失败
+        self.size = stat.st_size if stat is not None else None
+        self.mtime_ns = stat.st_mtime_ns if stat is not None else None
+        self.locations = None   # 每个域在文件中的位置（字典）
+        self.codes = None       # 每个域的EQ域文本
+        self.results = None     # 每个域的 (LaTeX, is_block, 错误信息, 错误列表)
+        self.error = None       # 提取或转换整个文件失败时的错误信息
+
+
+class Manifest:
+    """已完成文件的清单：每行一个JSON对象，按路径、大小与修改时间判断文件是否需要重新处理"""
+
+    def __init__(self, path):
+        self.path = path
+        self._completed = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 崩溃时可能留下写了一半的最后一行
+                        continue
+                    if entry.get('error') is None:
+                        self._completed[entry['path']] = (entry['size'], entry['mtime_ns'])
+        self._file = None
+
+    def __len__(self):
+        return len(self._completed)
+
+    def is_done(self, path, stat):
+        return self._completed.get(path) == (stat.st_size, stat.st_mtime_ns)
+
+    def record(self, entry):
+        """追加一条记录并立即落盘"""
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(entry, ensure_ascii=False))
+            self._file.write('\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            if entry.get('error') is None:
+                self._completed[entry['path']] = (entry['size'], entry['mtime_ns'])
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class _RecyclingPool:
+    """进程池：提交的任务数达到 工作进程数×recycle_after 后换用新的进程池
+
+    旧进程池不再接收任务，已提交的任务照常完成后退出。recycle_after 为 None 时一直使用同一个进程池。
+    """
+
+    def __init__(self, workers, options, recycle_after=None):
+        self.workers = workers
+        self.options = options
+        self.limit = workers * recycle_after if recycle_after else None
+        self.generations = 0
+        self._lock = threading.Lock()
+        self._pool = None
+        self._submitted = 0
+
+    def submit(self, function, *args):
+        with self._lock:
+            if self._pool is None or (self.limit is not None and self._submitted >= self.limit):
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=batch._init_worker,
+                                                 initargs=(self.options,))
+                self._submitted = 0
+                self.generations += 1
+            self._submitted += 1
+            return self._pool.submit(function, *args)
+
+    def shutdown(self, cancel=False):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=cancel)
+                self._pool = None
+
+
+class Progress:
+    """流水线的计数与进度行：吞吐按已完成的文件与域计算，剩余时间按已发现但未完成的文件估算"""
+
+    def __init__(self, stream=None, interval=DEFAULT_PROGRESS_INTERVAL):
+        self.stream = stream
+        self.interval = interval
+        self.discovered = 0
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+        self.fields = 0
+        self.discovering = True
+        self.start = time.monotonic()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def line(self):
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        finished = self.completed + self.failed
+        file_rate = finished / elapsed
+        field_rate = self.fields / elapsed
+        remaining = self.discovered - finished
+        total = f"{'≥' if self.discovering else ''}{self.discovered}"
+        if file_rate > 0:
+            eta = _format_duration(remaining / file_rate)
+        else:
+            eta = '未知'
+        return (f"已处理 {finished}/{total} 个文件（跳过 {self.skipped}，失败 {self.failed}），"
+                f"{self.fields} 个域，{file_rate:.1f} 文件/秒，{field_rate:.0f} 域/秒，"
+                f"已用 {_format_duration(elapsed)}，预计剩余 {eta}")
+
+    def _report(self):
+        while not self._stopped.wait(self.interval):
+            print(self.line(), file=self.stream, flush=True)
+
+    def __enter__(self):
+        if self.stream is not None:
+            self._thread = threading.Thread(target=self._report, name='mseq2latex-progress', daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            print(self.line(), file=self.stream, flush=True)
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m{seconds:02d}s"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+def _discover(inputs, extensions, manifest, progress, out):
+    """遍历输入，把需要处理的文件放入提取队列"""
+    # 输出路径（相对于输出目录）-> 占用它的输入文件；不同输入根下的同名文件会写到同一个输出
+    claimed = {}
+    for root in inputs:
+        if os.path.isdir(root):
+            for directory, subdirectories, files in os.walk(root):
+                subdirectories.sort()
+                for name in sorted(files):
+                    path = os.path.join(directory, name)
+                    if name.lower().endswith(extensions):
+                        _offer(path, os.path.relpath(path, root), manifest, progress, out, claimed)
+        else:
+            _offer(root, os.path.basename(root), manifest, progress, out, claimed)
+
+
+def _offer(path, relative, manifest, progress, out, claimed):
+    path = os.path.abspath(path)
+    key = os.path.normcase(relative)
+    owner = claimed.get(key)
+    if owner == path:
+        # 同一个文件被重复列出
+        return
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        # 失效的符号链接、遍历后被删除的文件等只记为该文件失败，不中断整个运行
+        stat = None
+        error = f"无法读取文件: {e}"
+    else:
+        error = None
+    if owner is None:
+        claimed[key] = path
+        if stat is not None and manifest.is_done(path, stat):
+            progress.add(skipped=1)
+            return
+    else:
+        # 先发现的文件占用输出路径，后来的同名文件记为失败，不覆盖前者的结果
+        error = f"输出路径与 {owner} 冲突: {relative}.jsonl"
+    progress.add(discovered=1)
+    job = _Job(path, relative, stat)
+    job.error = error
+    out.put(job)
+
+
+def _extract_text(path, max_field_size):
+    data = _map(path)
+    locations = []
+    codes = []
+    spans = iter_field_spans(data, max_field_size)
+    try:
+        # 出错时也要先释放视图，映射才能关闭（否则 close 抛出 BufferError）
+        with memoryview(data) as view:
+            for start, end in spans:
+                try:
+                    codes.append(str(view[start:end], 'utf-8'))
+                except UnicodeDecodeError:
+                    continue
+                locations.append({'offset': start, 'length': end - start})
+    finally:
+        spans.close()
+        if not isinstance(data, bytes):
+            data.close()
+    return locations, codes
+
+
+def _extract(job, max_field_size):
+    if job.path.lower().endswith('.docx'):
+        fields = list(iter_eq_fields(job.path))
+        job.locations = [{'paragraph': field.paragraph, 'run': field.run} for field in fields]
+        job.codes = [field.code for field in fields]
+    else:
+        job.locations, job.codes = _extract_text(job.path, max_field_size)
+
+
+def _convert_local(converter, job):
+    job.results = [item[1:] for item in batch._convert_chunk(converter, 0, job.codes)]
+
+
+def _convert_pooled(converter, pool, job, chunksize):
+    futures = [pool.submit(batch._run_chunk, start, job.codes[start:start + chunksize])
+               for start in range(0, len(job.codes), chunksize)]
+    job.results = [item[1:] for future in futures for item in batch._chunk_result(converter, future)]
+
+
+def _write(job, output_dir):
+    """写出一个文件的全部结果：先写临时文件再替换，崩溃时不会留下被当作已完成的半个文件"""
+    target = os.path.join(output_dir, job.relative + '.jsonl')
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    # 同一个目标文件只由一个写出线程处理；中断后遗留的临时文件在重新运行时被覆盖
+    temporary = target + '.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        for i, (location, code, (latex, is_block, error, errors)) in enumerate(
+                zip(job.locations, job.codes, job.results)):
+            record = {'index': i, **location, 'code': code, 'latex': latex, 'is_block': is_block,
+                      'error': error, 'errors': [e._asdict() for e in errors]}
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write('\n')
+    os.replace(temporary, target)
+    return target
+
+
+def _stage(source, workers, handle, sink):
+    """启动 workers 个线程，从 source 取文件交给 handle 处理后放入 sink，取到结束标记时退出"""
+    def run():
+        while True:
+            job = source.get()
+            if job is _DONE:
+                return
+            try:
+                handle(job)
+            except KeyboardInterrupt:
+                # Ctrl-C 同时中断了工作进程，主线程会收到同样的中断并结束流水线
+                return
+            except Exception as e:
+                # handle 自行记录预期的失败；其余异常也不能让线程退出，否则上游会一直阻塞在有界队列上
+                print(f"处理 {job.path} 失败: {e}", file=sys.stderr)
+                if job.error is None:
+                    job.error = f"处理失败: {e}"
+            if sink is not None:
+                sink.put(job)
+
+    threads = [threading.Thread(target=run, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _finish(threads, sink, downstream_workers):
+    """等待一个阶段的全部线程退出，再为下游阶段的每个线程放入一个结束标记"""
+    for thread in threads:
+        thread.join()
+    if sink is not None:
+        for _ in range(downstream_workers):
+            sink.put(_DONE)
+
+
+def run_pipeline(inputs, output_dir, converter, manifest_path=None, extensions=DEFAULT_EXTENSIONS,
+                 extract_workers=2, convert_workers=None, write_workers=1, queue_size=DEFAULT_QUEUE_SIZE,
+                 recycle_after=None, chunksize=None, max_field_size=DEFAULT_MAX_FIELD_SIZE,
+                 progress=None):
+    """转换 inputs（文件或目录）中全部 .docx/文本文件里的EQ域，每个文件在 output_dir 下写出一个JSONL
+
+    manifest_path 默认为 output_dir/manifest.jsonl，已记录且大小与修改时间未变的文件会被跳过。
+    convert_workers 为转换进程数（默认为CPU核数），为 0 时在当前进程中转换；
+    recycle_after 为每个工作进程处理多少个任务后更换进程池。progress 为 Progress 实例，默认不输出进度行。
+    返回 Progress（其中的计数即本次运行的统计）。
+    """
+    if convert_workers is None:
+        convert_workers = os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = batch.DEFAULT_CHUNKSIZE
+    if manifest_path is None:
+        manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    os.makedirs(output_dir, exist_ok=True)
+    extensions = tuple(extension.lower() for extension in extensions)
+    if progress is None:
+        progress = Progress()
+
+    manifest = Manifest(manifest_path)
+    pool = _RecyclingPool(convert_workers, converter._worker_options(), recycle_after) if convert_workers else None
+    to_extract = queue.Queue(queue_size)
+    to_convert = queue.Queue(queue_size)
+    to_write = queue.Queue(queue_size)
+
+    def extract(job):
+        if job.error is not None:
+            return
+        try:
+            _extract(job, max_field_size)
+        except Exception as e:
+            job.error = f"提取失败: {e}"
+
+    def convert(job):
+        if job.error is not None:
+            return
+        try:
+            if pool is None:
+                _convert_local(converter, job)
+            else:
+                _convert_pooled(converter, pool, job, chunksize)
+        except Exception as e:
+            job.error = f"转换失败: {e}"
+
+    def write(job):
+        entry = {'path': job.path, 'size': job.size, 'mtime_ns': job.mtime_ns}
+        if job.error is None:
+            try:
+                entry['output'] = _write(job, output_dir)
+            except Exception as e:
+                # 任何异常（如无法编码的字符）都只记为该文件失败，写出线程继续处理后续文件
+                job.error = f"写出失败: {e}"
+        if job.error is None:
+            entry['fields'] = len(job.codes)
+            entry['errors'] = sum(1 for result in job.results if result[2] is not None)
+            progress.add(completed=1, fields=len(job.codes))
+        else:
+            entry['error'] = job.error
+            progress.add(failed=1)
+        manifest.record(entry)
+
+    convert_threads = max(convert_workers, 1)
+    completed = False
+    try:
+        with progress:
+            extractors = _stage(to_extract, extract_workers, extract, to_convert)
+            converters = _stage(to_convert, convert_threads, convert, to_write)
+            writers = _stage(to_write, write_workers, write, None)
+            _discover(inputs, extensions, manifest, progress, to_extract)
+            progress.discovering = False
+            for _ in range(extract_workers):
+                to_extract.put(_DONE)
+            _finish(extractors, to_convert, convert_threads)
+            _finish(converters, to_write, write_workers)
+            _finish(writers, None, 0)
+        completed = True
+    finally:
+        # 中断（如 Ctrl-C）时不再等待排队的任务，阶段线程随进程退出；已写入清单的文件下次运行时跳过
+        if pool is not None:
+            pool.shutdown(cancel=not completed)
+        manifest.close()
+    return progress
@@ -0,0 +1,397 @@
+"""常驻转换服务：HTTP 接口，监听本地端口或 Unix 套接字
+
+服务启动时一次性创建并预热工作进程（各自构建好词法/语法分析器），之后每个请求只有一次本地往返，
+不再有启动解释器、导入 ply 与构建分析表的开销。
+
+并发到达的请求先进入等待队列，合并为微批次交给工作进程：队列中凑满 max_batch 个域，
+或最早的域已等待 max_delay 秒时发出一批；工作进程都在忙时继续积累，负载越高批次越大。
+已接受但尚未返回的域数达到 max_queue 时，新请求立即以 503 拒绝，不再排队；
+单个请求的域数超过 max_queue 时永远无法接受，以 413 拒绝。
+
+接口：
+- POST /convert：请求体为 {"eq": "..."} 时返回单个结果，为 {"fields": [...]} 时返回 {"results": [...]}；
+  每个结果包含 latex、is_block、error、errors，与 convert 子命令的输出相同
+- GET /health：服务状态
+- GET /stats：请求数、批次数、平均批大小、拒绝数、队列深度等统计
+"""
+import asyncio
+import json
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from . import batch
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# 每个微批次最多包含的域数
+DEFAULT_MAX_BATCH = 64
+# 凑不满一批时，最早的域最多等待的时间（秒）
+DEFAULT_MAX_DELAY = 0.002
+# 已接受但尚未返回的域数上限
+DEFAULT_MAX_QUEUE = 4096
+# 请求头与请求体的大小上限
+_MAX_HEADER_LINES = 100
+_MAX_BODY = 16 * 1024 * 1024
+# 拒绝请求后关闭连接前，最多丢弃的剩余输入字节数与等待时间（秒）
+_LINGER_BYTES = 1 << 20
+_LINGER_SECONDS = 1.0
+# 用于预热工作进程的域
+_WARMUP_FIELD = '{EQ \\f(1,2)}'
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class QueueFull(Exception):
+    """等待中的域数已达上限"""
+
+
+class _BadRequest(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _record(item):
+    return {'latex': item.latex, 'is_block': item.is_block, 'error': item.error,
+            'errors': [error._asdict() for error in item.errors]}
+
+
+def _run_local(converter, texts):
+    """在当前进程中转换一个批次，返回值与 batch._run_chunk 相同（指标已直接记录在转换器上）"""
+    return batch._convert_chunk(converter, 0, texts), None
+
+
+def _fail(chunk, error):
+    """以 error 结束 chunk 中尚未完成的请求"""
+    for _, future in chunk:
+        if not future.done():
+            future.set_exception(error)
+
+
+class MicroBatcher:
+    """把并发提交的域合并为微批次，交给预热好的工作进程（workers 为 0 时在当前进程的一个线程中）转换"""
+
+    def __init__(self, converter, workers=None, max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY,
+                 max_queue=DEFAULT_MAX_QUEUE):
+        if max_batch < 1:
+            raise ValueError("max_batch 必须为正整数")
+        if workers is None:
+            workers = os.cpu_count() or 1
+        self.converter = converter
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_queue = max_queue
+        self._executor = None
+        self._slots = max(workers, 1)
+        # 等待发出的 (域文本, future)
+        self._pending = []
+        self._timer = None
+        self._in_flight = 0
+        # 已接受但尚未返回的域数（等待中与转换中）
+        self.depth = 0
+        self.requests = 0
+        self.fields = 0
+        self.batches = 0
+        self.rejected = 0
+        self.started = None
+
+    async def start(self):
+        """创建工作进程并等待它们全部完成预热"""
+        loop = asyncio.get_running_loop()
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=batch._init_worker,
+                                                 initargs=(self.converter._worker_options(),))
+            function = batch._run_chunk
+            warmups = [loop.run_in_executor(self._executor, function, 0, [_WARMUP_FIELD])
+                       for _ in range(self.workers)]
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mseq2latex-serve')
+            warmups = [loop.run_in_executor(self._executor, _run_local, self.converter, [_WARMUP_FIELD])]
+        await asyncio.gather(*warmups)
+        self.started = time.monotonic()
+
+    async def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # 尚未发出的域不会再发出
+        _fail(self._pending, RuntimeError("服务正在关闭，转换已取消"))
+        self._pending = []
+        if self._executor is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+            self._executor = None
+
+    async def convert(self, texts):
+        """转换一组域，按顺序返回 BatchItem；队列已满时立即抛出 QueueFull"""
+        if self.depth + len(texts) > self.max_queue:
+            self.rejected += 1
+            raise QueueFull(f"等待转换的域已达上限 {self.max_queue}")
+        self.requests += 1
+        self.fields += len(texts)
+        self.depth += len(texts)
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        self._pending.extend(zip(texts, futures))
+        if len(self._pending) >= self.max_batch:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._on_timer)
+        try:
+            return await asyncio.gather(*futures)
+        finally:
+            self.depth -= len(texts)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self):
+        """在有空闲工作进程时发出批次；都在忙时等待中的域留到下一个批次完成时再发出"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        loop = asyncio.get_running_loop()
+        while self._pending and self._in_flight < self._slots:
+            chunk = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            texts = [text for text, _ in chunk]
+            if self.workers > 0:
+                future = loop.run_in_executor(self._executor, batch._run_chunk, 0, texts)
+            else:
+                future = loop.run_in_executor(self._executor, _run_local, self.converter, texts)
+            self._in_flight += 1
+            self.batches += 1
+            future.add_done_callback(lambda done, chunk=chunk: self._complete(done, chunk))
+
+    def _complete(self, done, chunk):
+        self._in_flight -= 1
+        if done.cancelled():
+            # 关闭服务时线程池/进程池撤销了尚未执行的批次；此后也不能再提交，等待中的域一并失败
+            error = RuntimeError("服务正在关闭，转换已取消")
+            _fail(chunk, error)
+            _fail(self._pending, error)
+            self._pending = []
+            return
+        try:
+            items, metrics = done.result()
+        except Exception as e:
+            _fail(chunk, e)
+        else:
+            if metrics is not None:
+                self.converter.metrics.merge(metrics)
+            for (_, future), item in zip(chunk, items):
+                if not future.done():
+                    future.set_result(item)
+        if self._pending:
+            self._dispatch()
+
+    def stats(self):
+        uptime = time.monotonic() - self.started if self.started is not None else 0.0
+        stats = {
+            'workers': self.workers,
+            'uptime_seconds': uptime,
+            'requests': self.requests,
+            'fields': self.fields,
+            'batches': self.batches,
+            'mean_batch_size': self.fields / self.batches if self.batches else 0.0,
+            'rejected': self.rejected,
+            'queue_depth': self.depth,
+            'in_flight_batches': self._in_flight,
+            'max_batch': self.max_batch,
+            'max_delay': self.max_delay,
+            'max_queue': self.max_queue,
+        }
+        # 进程池模式下各工作进程的缓存互不可见，只报告当前进程转换时使用的缓存
+        if self.workers == 0 and self.converter.cache is not None:
+            stats['cache'] = self.converter.cache.stats()
+        return stats
+
+
+async def _readline(reader, status, message):
+    """读取一行；超过 StreamReader 的长度上限（64 KiB）时 readline 抛出 ValueError，改为以 status 拒绝请求"""
+    try:
+        return await reader.readline()
+    except ValueError:
+        raise _BadRequest(status, message) from None
+
+
+async def _read_request(reader):
+    """读取一个HTTP/1.1请求，连接关闭时返回 None"""
+    line = await _readline(reader, 400, "请求行过长")
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise _BadRequest(400, "请求行格式错误")
+    headers = {}
+    for _ in range(_MAX_HEADER_LINES):
+        line = await _readline(reader, 431, "请求头过长")
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise _BadRequest(400, "请求头过多")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise _BadRequest(400, "Content-Length 格式错误")
+    if length < 0:
+        raise _BadRequest(400, "Content-Length 不能为负数")
+    if length > _MAX_BODY:
+        raise _BadRequest(413, "请求体过大")
+    body = await reader.readexactly(length) if length else b''
+    return method, target.split('?', 1)[0], headers, body
+
+
+async def _linger(reader, writer):
+    """发送错误响应后先关闭写方向，再丢弃客户端尚未读完的输入
+
+    直接关闭仍有未读数据的套接字会发送 RST，客户端可能因此收不到已经发出的错误响应。
+    """
+    async def discard():
+        remaining = _LINGER_BYTES
+        while remaining > 0:
+            data = await reader.read(min(remaining, 1 << 16))
+            if not data:
+                return
+            remaining -= len(data)
+
+    if writer.can_write_eof():
+        writer.write_eof()
+    try:
+        await asyncio.wait_for(discard(), _LINGER_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+
+
+def _response(status, payload, keep_alive=True):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode('latin-1') + body
+
+
+class ConversionServer:
+    """HTTP 转换服务：解析请求并把域交给 MicroBatcher"""
+
+    def __init__(self, batcher):
+        self.batcher = batcher
+        self._server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """预热工作进程后开始监听，返回监听地址（(host, port) 或 Unix 套接字路径）"""
+        await self.batcher.start()
+        if unix_path is not None:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            self._server = await asyncio.start_unix_server(self._handle, unix_path)
+            return unix_path
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.close()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except _BadRequest as e:
+                    writer.write(_response(e.status, {'error': str(e)}, keep_alive=False))
+                    await writer.drain()
+                    await _linger(reader, writer)
+                    return
+                if request is None:
+                    return
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                status, payload = await self._route(method, path, body)
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        if path == '/convert':
+            if method != 'POST':
+                return 405, {'error': "只支持 POST"}
+            return await self._convert(body)
+        if path in ('/health', '/stats'):
+            if method != 'GET':
+                return 405, {'error': "只支持 GET"}
+            if path == '/health':
+                return 200, {'status': 'ok', 'queue_depth': self.batcher.depth}
+            return 200, self.batcher.stats()
+        return 404, {'error': f"未知的路径: {path}"}
+
+    async def _convert(self, body):
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return 400, {'error': "请求体不是有效的JSON"}
+        single = isinstance(request, dict) and isinstance(request.get('eq'), str)
+        if single:
+            texts = [request['eq']]
+        elif (isinstance(request, dict) and isinstance(request.get('fields'), list)
+              and all(isinstance(text, str) for text in request['fields'])):
+            texts = request['fields']
+        else:
+            return 400, {'error': '请求体应为 {"eq": "..."} 或 {"fields": [...]}'}
+        if len(texts) > self.batcher.max_queue:
+            # 队列空闲时也无法接受，重试没有意义，因此不返回 503
+            return 413, {'error': f"单个请求的域数超过上限 {self.batcher.max_queue}"}
+        try:
+            items = await self.batcher.convert(texts)
+        except QueueFull as e:
+            return 503, {'error': str(e)}
+        except Exception as e:
+            # 如工作进程异常退出
+            return 500, {'error': str(e) or type(e).__name__}
+        if single:
+            return 200, _record(items[0])
+        return 200, {'results': [_record(item) for item in items]}
+
+
+async def serve(converter, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, workers=None,
+                max_batch=DEFAULT_MAX_BATCH, max_delay=DEFAULT_MAX_DELAY, max_queue=DEFAULT_MAX_QUEUE,
+                on_ready=None):
+    """启动转换服务并一直运行；开始监听后以监听地址调用 on_ready。收到 SIGTERM 时关闭监听与工作进程后返回"""
+    server = ConversionServer(MicroBatcher(converter, workers, max_batch, max_delay, max_queue))
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    try:
+        loop.add_signal_handler(signal.SIGTERM, task.cancel)
+    except (NotImplementedError, RuntimeError):
+        # Windows 的事件循环不支持信号处理
+        pass
+    try:
+        address = await server.start(host, port, unix_path)
+        if on_ready is not None:
+            on_ready(address)
+        await server.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.close()
+        if unix_path is not None and os.path.exists(unix_path):
+            os.unlink(unix_path)
@@ -0,0 +1,229 @@
+"""在任意大小的文本流中查找并替换 EQ 域
+
+按块读取字节流，用字节级的正则预筛出 "{" 后跟 "EQ" 的位置，跨块跟踪花括号的嵌套找到域的结尾，
+把每个域替换为转换后的LaTeX（与 convert 的输出相同），域以外的内容按原字节原样输出。
+内存占用只取决于最大的单个域与块大小，与流的总长度无关。
+"""
+import codecs
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# 每次读取的字节数
+DEFAULT_CHUNK_SIZE = 1 << 16
+# 单个域的最大字节数；超过时视为普通文本，避免未闭合的 "{ EQ" 使缓冲区无限增长
+DEFAULT_MAX_FIELD_SIZE = 1 << 20
+
+# 域的开头：左花括号、可选的空白（与词法分析器忽略的字符一致，含换行）、EQ 关键字
+_FIELD_START = re.compile(rb'\{[ \t\n]*(?:EQ|eq)')
+# 可能是被块边界截断的域开头
+_PARTIAL_START = re.compile(rb'\{[ \t\n]*[Ee]?')
+# 域内影响嵌套的字节：反斜杠转义其后的一个字符（如 \bc\{），花括号改变嵌套深度
+_FIELD_SPECIAL = re.compile(rb'[{}\\]')
+
+# 替换统计：fields 为找到的域数，replaced 为成功替换的域数，其余的域原样保留
+StreamStats = namedtuple('StreamStats', ['fields', 'replaced', 'bytes_in', 'bytes_out'])
+
+
+# 常用且确定满足要求的编码，不必逐字符检查
+_KNOWN_TRANSPARENT = frozenset({'utf-8', 'ascii', 'iso8859-1'})
+
+
+@lru_cache(maxsize=None)
+def _check_encoding(encoding):
+    """确认 encoding 与ASCII透明兼容，返回规范的编码名，否则抛出 ValueError
+
+    域是直接在字节上按 "{"、"}"、"\\" 查找的，要求ASCII字符编码为相同的单个字节，
+    其他字符的多字节编码中不出现小于 0x80 的字节（EUC-JP 把 "¥" 编码为单个 0x5C 这类别名不影响查找）。
+    UTF-8、Latin-1、cp1252、EUC-JP、EUC-KR 等满足；
+    GBK、Big5、Shift_JIS 的尾字节、UTF-16 与 ISO-2022 的编码都可能与这些字符的字节相同，不能使用。
+    """
+    name = codecs.lookup(encoding).name
+    if name in _KNOWN_TRANSPARENT:
+        return name
+    ascii = ''.join(map(chr, range(0x80)))
+    try:
+        transparent = ascii.encode(name) == ascii.encode('ascii')
+    except UnicodeError:
+        transparent = False
+    code = 0x80
+    while transparent and code < 0x10000:
+        if not 0xd800 <= code < 0xe000:
+            try:
+                data = chr(code).encode(name)
+                transparent = len(data) == 1 or min(data) >= 0x80
+            except UnicodeError:
+                pass
+        code += 1
+    if not transparent:
+        raise ValueError(f"不支持的编码 {encoding}：多字节字符中可能出现 '{{'、'}}'、'\\' 等ASCII字节，"
+                         "无法在字节上查找EQ域")
+    return name
+
+
+def _track(data, scan, depth, endpos):
+    """从 scan 开始跟踪花括号的嵌套深度，直到 endpos
+
+    返回 (域结尾之后的位置, 下次继续的位置, 深度)；endpos 之前未闭合时第一项为 None。
+    """
+    search = _FIELD_SPECIAL.search
+    while True:
+        match = search(data, scan, endpos)
+        if match is None:
+            return None, endpos, depth
+        position = match.start()
+        byte = data[position]
+        if byte == 0x5c:        # 反斜杠
+            if position + 1 >= endpos:
+                # 被转义的字符还没读到，下次从反斜杠处继续
+                return None, position, depth
+            scan = position + 2
+        elif byte == 0x7b:      # {
+            depth += 1
+            scan = position + 1
+        else:                   # }
+            depth -= 1
+            scan = position + 1
+            if depth == 0:
+                return scan, scan, 0
+
+
+def iter_field_spans(data, max_field_size=DEFAULT_MAX_FIELD_SIZE):
+    """在完整的字节缓冲区（bytes、mmap 等）中按顺序产出每个EQ域的 (起点, 终点)，规则与 FieldReplacer 相同"""
+    size = len(data)
+    pos = 0
+    while True:
+        match = _FIELD_START.search(data, pos)
+        if match is None:
+            return
+        start = match.start()
+        end, _, _ = _track(data, match.end(), 1, min(size, start + max_field_size))
+        if end is None:
+            # 未闭合或过长，从下一个字节继续查找
+            pos = start + 1
+            continue
+        yield start, end
+        pos = end
+
+
+class FieldReplacer:
+    """增量的EQ域替换器：feed 输入字节块，返回可以确定的输出字节；输入结束时调用 close 取回剩余输出
+
+    UTF-8 等与ASCII透明兼容的编码中，多字节字符不会包含 "{"、"}"、"\\" 的字节，因此可以直接在字节上查找；
+    只有域本身按 encoding 解码后交给转换器。无法解码或无法转换的域原样保留。
+    GBK、Big5、Shift_JIS、UTF-16 等不满足这一点的编码会被拒绝（ValueError），需先转码为UTF-8。
+    """
+
+    def __init__(self, converter, max_field_size=DEFAULT_MAX_FIELD_SIZE, encoding='utf-8'):
+        self.converter = converter
+        self.max_field_size = max_field_size
+        self.encoding = _check_encoding(encoding)
+        self.fields = 0
+        self.replaced = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._buffer = bytearray()
+        # 正在读取的域在缓冲区中的起点，不在域内时为 None
+        self._field_start = None
+        # 域内下一个待检查的位置与当前的嵌套深度
+        self._scan = 0
+        self._depth = 0
+
+    def stats(self):
+        return StreamStats(self.fields, self.replaced, self.bytes_in, self.bytes_out)
+
+    def feed(self, data):
+        """输入一块字节，返回已经确定的输出"""
+        self.bytes_in += len(data)
+        self._buffer += data
+        return self._drain(False)
+
+    def close(self):
+        """输入结束，返回剩余的输出；未闭合的域按普通文本输出"""
+        return self._drain(True)
+
+    def _drain(self, final):
+        buffer = self._buffer
+        out = []
+        pos = 0
+        while True:
+            if self._field_start is None:
+                match = _FIELD_START.search(buffer, pos)
+                if match is None:
+                    # 末尾可能是被截断的域开头，留到下一块再判断
+                    keep = len(buffer)
+                    if not final:
+                        brace = buffer.rfind(b'{', pos)
+                        if brace >= 0 and _PARTIAL_START.fullmatch(buffer, brace):
+                            keep = brace
+                    out.append(buffer[pos:keep])
+                    pos = keep
+                    break
+                out.append(buffer[pos:match.start()])
+                pos = self._field_start = match.start()
+                self._scan = match.end()
+                self._depth = 1
+
+            # 域的长度不超过 max_field_size：结尾必须在 limit 之前
+            limit = self._field_start + self.max_field_size
+            end, self._scan, self._depth = _track(buffer, self._scan, self._depth,
+                                                  min(len(buffer), limit))
+            if end is None:
+                if not final and len(buffer) < limit:
+                    break
+                # 未闭合或过长的域：左花括号按普通文本输出，从下一个字节继续查找
+                out.append(buffer[pos:pos + 1])
+                pos += 1
+                self._field_start = None
+                continue
+
+            self.fields += 1
+            out.append(self._replacement(buffer[pos:end]))
+            pos = end
+            self._field_start = None
+
+        # 释放已输出的部分，缓冲区中只保留未完成的域或可能的域开头
+        del buffer[:pos]
+        if self._field_start is not None:
+            self._scan -= pos
+            self._field_start = 0
+        output = b''.join(out)
+        self.bytes_out += len(output)
+        return output
+
+    def _replacement(self, field):
+        """转换一个域，返回替换它的字节；失败时返回原字节"""
+        try:
+            eq_text = field.decode(self.encoding)
+        except UnicodeDecodeError:
+            return bytes(field)
+        latex, is_block, _ = self.converter.convert_result(eq_text)
+        if latex is None:
+            return bytes(field)
+        self.replaced += 1
+        if is_block:
+            return f"\\[ {latex} \\]".encode(self.encoding)
+        return f"$ {latex} $".encode(self.encoding)
+
+
+def replace_stream(source, destination, converter, chunk_size=DEFAULT_CHUNK_SIZE,
+                   max_field_size=DEFAULT_MAX_FIELD_SIZE, encoding='utf-8'):
+    """从二进制文件对象 source 按块读取，把其中的EQ域替换为LaTeX后写入 destination，返回 StreamStats"""
+    replacer = FieldReplacer(converter, max_field_size, encoding)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        output = replacer.feed(chunk)
+        if output:
+            destination.write(output)
+    output = replacer.close()
+    if output:
+        destination.write(output)
+    return replacer.stats()
+
+
+def replace_text(text, converter, max_field_size=DEFAULT_MAX_FIELD_SIZE):
+    """替换字符串中的全部EQ域，返回新的字符串"""
+    replacer = FieldReplacer(converter, max_field_size)
+    return (replacer.feed(text.encode('utf-8')) + replacer.close()).decode('utf-8')
@@ -0,0 +1,34 @@
+"""异步接口测试
+
+运行（在仓库根目录）：python -m unittest
+"""
+import asyncio
+import unittest
+
+from src.mseq2latex.converter import MSEQToLatexConverter
+
+
+class AconvertStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.converter = MSEQToLatexConverter()
+
+    def tearDown(self):
+        self.converter.close()
+
+    def _collect(self, *args, **kwargs):
+        async def run():
+            return [latex async for latex in self.converter.aconvert_stream(*args, **kwargs)]
+        return asyncio.run(run())
+
+    def test_default_limit(self):
+        fields = ["{ EQ \\f(1,2) }", "{ EQ \\r(x) }"] * 20
+        expected = [self.converter.convert(field) for field in fields]
+        self.assertEqual(self._collect(fields), expected)
+
+    def test_invalid_limit(self):
+        with self.assertRaises(ValueError):
+            self._collect(["{ EQ \\f(1,2) }"], limit=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
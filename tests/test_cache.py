@@ -0,0 +1,46 @@
+"""持久转换缓存测试
+
+运行（在仓库根目录）：python -m unittest
+"""
+import gc
+import os
+import shutil
+import tempfile
+import unittest
+import weakref
+
+from src.mseq2latex.cache import PersistentCache
+
+
+class PersistentCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'cache.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_unreferenced_cache_is_collected_and_flushed(self):
+        """不再被引用的缓存可以被回收，回收时写入累积的条目"""
+        cache = PersistentCache(self.path, write_batch=1000)
+        cache.put('{EQ a}', ('a', False))
+        reference = weakref.ref(cache)
+        del cache
+        gc.collect()
+        self.assertIsNone(reference())
+
+        reopened = PersistentCache(self.path)
+        try:
+            self.assertEqual(reopened.get('{EQ a}'), ('a', False))
+        finally:
+            reopened.close()
+
+    def test_close(self):
+        cache = PersistentCache(self.path, write_batch=1000)
+        cache.put('{EQ b}', ('b', True))
+        cache.close()
+        self.assertEqual(len(PersistentCache(self.path)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
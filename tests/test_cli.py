@@ -0,0 +1,49 @@
+"""命令行输入读取测试
+
+运行（在仓库根目录）：python -m unittest
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from src.mseq2latex.cli import read_fields
+
+
+class ReadFieldsTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.jsonl')
+        with os.fdopen(handle, 'w', encoding='utf-8') as f:
+            f.write('"{ EQ a }"\n{bad json\n\n{"other": 1}\n{"eq": 5}\n{"eq": "{ EQ b }"}\n')
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_invalid_lines_are_recorded(self):
+        invalid = {}
+        fields = list(read_fields([self.path], 'jsonl', 'eq', invalid))
+        self.assertEqual(fields, ["{ EQ a }", None, None, None, "{ EQ b }"])
+        self.assertEqual(sorted(invalid), [1, 2, 3])
+        self.assertTrue(invalid[1].startswith(f"{self.path}:2: "))
+        self.assertTrue(invalid[2].startswith(f"{self.path}:4: "))
+        self.assertTrue(invalid[3].startswith(f"{self.path}:5: "))
+
+    def test_invalid_lines_raise_by_default(self):
+        with self.assertRaises(ValueError):
+            list(read_fields([self.path], 'jsonl'))
+
+
+class StartupTest(unittest.TestCase):
+    def test_import_is_lazy(self):
+        """导入命令行模块不加载服务、索引与流水线模块（及其依赖的 asyncio 与进程池）"""
+        heavy = ('asyncio', 'concurrent.futures.process', 'src.mseq2latex.server',
+                 'src.mseq2latex.index', 'src.mseq2latex.pipeline')
+        code = f"import sys, src.mseq2latex.cli; print([m for m in {heavy!r} if m in sys.modules])"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), '[]')
+
+
+if __name__ == '__main__':
+    unittest.main()
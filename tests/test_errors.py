@@ -0,0 +1,91 @@
+"""错误收集与错误恢复测试
+
+运行（在仓库根目录）：python -m unittest
+"""
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from src.mseq2latex.cache import ConversionCache
+from src.mseq2latex.converter import MSEQToLatexConverter
+from src.mseq2latex import parser as eq_parser
+from src.mseq2latex.errors import EXCEPTION
+from src.mseq2latex.lexer import TableLexer, get_lexer
+
+
+class NonStringInputTest(unittest.TestCase):
+    """非字符串输入与其他转换失败一样记录为错误，不抛出异常"""
+
+    def test_convert(self):
+        for options in ({}, {'cache': ConversionCache()}, {'engine': 'descent'}, {'lexer_mode': 'table'}):
+            converter = MSEQToLatexConverter(**options)
+            for eq_text in (None, 123, ['x']):
+                with redirect_stdout(io.StringIO()) as out:
+                    self.assertIsNone(converter.convert(eq_text))
+                self.assertIn("转换错误", out.getvalue())
+                errors = converter.convert_result(eq_text).errors
+                self.assertEqual([error.kind for error in errors], [EXCEPTION])
+
+    def test_convert_many(self):
+        converter = MSEQToLatexConverter()
+        items = list(converter.convert_many(["{ EQ \\f(1,2) }", None, ['x'], "{ EQ \\r(x) }"], workers=1))
+        self.assertEqual([item.latex for item in items], ["\\frac{1}{2}", None, None, "\\sqrt{x}"])
+        self.assertIsNotNone(items[1].error)
+        self.assertIsNotNone(items[2].error)
+
+
+class IntegralRecoveryTest(unittest.TestCase):
+    """错误恢复时，积分上下限中的出错部分不留下空的上下标"""
+
+    def test_error_in_limits(self):
+        for lexer_mode in ('ply', 'table'):
+            converter = MSEQToLatexConverter(recover=True, lexer_mode=lexer_mode)
+            cases = {
+                "{ EQ \\i(),b,x) }": "\\int^{b} {x}",
+                "{ EQ \\i(a,),x) }": "\\int_{a} {x}",
+                "{ EQ \\i(,,x) }": "\\int {x}",
+            }
+            for eq_text, expected in cases.items():
+                result = converter.convert_result(eq_text)
+                self.assertEqual(result.latex, expected)
+                self.assertTrue(result.errors)
+
+
+class DefaultAbortTest(unittest.TestCase):
+    """默认不开启错误恢复：第一个语法错误即终止转换，convert2 返回 (None, None)
+
+    引入错误恢复前，PLY自带的恢复会悄悄丢弃标记，部分非法域仍得到LaTeX；
+    现在需要 recover=True 才会转换这些域，并同时报告错误。
+    """
+
+    def test_first_error_aborts(self):
+        eq_text = "({ eq n a }"
+        for options in ({}, {'lexer_mode': 'table'}, {'engine': 'descent'}):
+            with self.subTest(**options):
+                converter = MSEQToLatexConverter(**options)
+                with redirect_stdout(io.StringIO()) as out:
+                    self.assertEqual(converter.convert2(eq_text), (None, None))
+                self.assertEqual(out.getvalue(), "语法错误在标记 LPAREN\n")
+                result = converter.convert_result(eq_text)
+                self.assertIsNone(result.latex)
+                self.assertEqual([error.token for error in result.errors], ['LPAREN'])
+
+                recovered = converter.convert_result(eq_text, recover=True)
+                self.assertEqual((recovered.latex, recovered.is_block), ('n a', False))
+                self.assertEqual(recovered.errors, result.errors)
+
+
+class DirectParseTest(unittest.TestCase):
+    """不经过转换器、直接调用模块级 parser.parse 时，语法错误只打印，parse 返回 None"""
+
+    def test_syntax_error(self):
+        for lexer in (get_lexer().clone(), TableLexer()):
+            for eq_text, message in (("{ EQ \\f(1,,2) }", "语法错误在标记 COMMA"),
+                                     ("{ EQ ", "语法错误在文件末尾")):
+                with redirect_stdout(io.StringIO()) as out:
+                    self.assertIsNone(eq_parser.parser.parse(eq_text, lexer=lexer))
+                self.assertEqual(out.getvalue().split("\n")[0], message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""EQ域索引测试
+
+运行（在仓库根目录）：python -m unittest
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.mseq2latex import index as index_module
+from src.mseq2latex.index import MAX_FIELD_SIZE_LIMIT, build_index, load_index, open_index
+
+
+class LoadIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, 'corpus.txt.idx')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_truncated_index_is_closed(self):
+        """比文件头还短的索引文件视为无效，并关闭其映射"""
+        with open(self.path, 'wb') as f:
+            f.write(b'MSEQ')
+        mappings = []
+        open_map = index_module._map
+
+        def record(path):
+            mapping = open_map(path)
+            mappings.append(mapping)
+            return mapping
+
+        with mock.patch.object(index_module, '_map', record):
+            self.assertIsNone(load_index(self.path))
+        self.assertEqual(len(mappings), 1)
+        self.assertTrue(mappings[0].closed)
+
+    def test_empty_index(self):
+        open(self.path, 'wb').close()
+        self.assertIsNone(load_index(self.path))
+
+    def test_missing_index(self):
+        self.assertIsNone(load_index(self.path))
+
+
+class MaxFieldSizeTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.root, 'corpus.txt')
+        with open(self.corpus, 'w', encoding='utf-8') as f:
+            f.write('x {EQ \\f(1,2)} y\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_limit_is_rejected_beyond_length_range(self):
+        """域的长度以32位无符号整数保存，max_field_size 超出其范围时报错而不是在扫描中途溢出"""
+        with self.assertRaises(ValueError):
+            build_index(self.corpus, MAX_FIELD_SIZE_LIMIT + 1)
+        with self.assertRaises(ValueError):
+            open_index(self.corpus, max_field_size=1 << 32)
+        self.assertFalse(os.path.exists(self.corpus + index_module.INDEX_SUFFIX))
+
+    def test_limit_is_accepted(self):
+        index = build_index(self.corpus, MAX_FIELD_SIZE_LIMIT)
+        try:
+            self.assertEqual(len(index), 1)
+        finally:
+            index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
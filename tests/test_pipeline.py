@@ -0,0 +1,112 @@
+"""目录流水线测试
+
+运行（在仓库根目录）：python -m unittest
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from src.mseq2latex import pipeline
+from src.mseq2latex.converter import MSEQToLatexConverter
+
+
+class PipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.output = os.path.join(self.root, 'out')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write_inputs(self, directory, count):
+        os.makedirs(directory, exist_ok=True)
+        for i in range(count):
+            with open(os.path.join(directory, f"f{i}.txt"), 'w', encoding='utf-8') as f:
+                f.write(f"text {{EQ \\f({i},2)}} more\n")
+
+    def _run(self, inputs, **kwargs):
+        """在线程中运行流水线，超时视为阻塞"""
+        outcome = []
+        thread = threading.Thread(target=lambda: outcome.append(pipeline.run_pipeline(
+            inputs, self.output, MSEQToLatexConverter(), convert_workers=0, queue_size=2, **kwargs)),
+            daemon=True)
+        thread.start()
+        thread.join(60)
+        self.assertFalse(thread.is_alive(), "流水线阻塞")
+        return outcome[0]
+
+    def _manifest(self):
+        with open(os.path.join(self.output, pipeline.MANIFEST_NAME), encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_write_failure_is_recorded(self):
+        directory = os.path.join(self.root, 'in')
+        self._write_inputs(directory, 20)
+        write = pipeline._write
+
+        def failing_write(job, output_dir):
+            if job.relative == 'f3.txt':
+                raise UnicodeEncodeError('utf-8', 'x', 0, 1, 'surrogates not allowed')
+            return write(job, output_dir)
+
+        with mock.patch.object(pipeline, '_write', failing_write):
+            progress = self._run([directory])
+        self.assertEqual((progress.completed, progress.failed), (19, 1))
+        failed = [entry for entry in self._manifest() if 'error' in entry]
+        self.assertEqual([os.path.basename(entry['path']) for entry in failed], ['f3.txt'])
+
+    def test_output_collision_is_refused(self):
+        first = os.path.join(self.root, 'a')
+        second = os.path.join(self.root, 'b')
+        self._write_inputs(first, 2)
+        self._write_inputs(second, 3)
+        progress = self._run([first, second, first])
+        self.assertEqual((progress.completed, progress.failed), (3, 2))
+        owners = {entry['output']: entry['path'] for entry in self._manifest() if 'output' in entry}
+        self.assertEqual(owners[os.path.join(self.output, 'f0.txt.jsonl')], os.path.join(first, 'f0.txt'))
+        self.assertEqual(owners[os.path.join(self.output, 'f2.txt.jsonl')], os.path.join(second, 'f2.txt'))
+
+    @unittest.skipUnless(hasattr(os, 'symlink'), "需要符号链接")
+    def test_broken_symlink_is_recorded(self):
+        directory = os.path.join(self.root, 'in')
+        self._write_inputs(directory, 3)
+        try:
+            os.symlink(os.path.join(self.root, 'missing.txt'), os.path.join(directory, 'broken.txt'))
+        except OSError:
+            self.skipTest("无法创建符号链接")
+        progress = self._run([directory])
+        self.assertEqual((progress.completed, progress.failed), (3, 1))
+        failed = [entry for entry in self._manifest() if 'error' in entry]
+        self.assertEqual([os.path.basename(entry['path']) for entry in failed], ['broken.txt'])
+
+    def test_extract_error_releases_mapping(self):
+        path = os.path.join(self.root, 'fields.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("{EQ \\f(1,2)} {EQ \\r(x)} {EQ b}\n")
+        spans = pipeline.iter_field_spans
+        open_map = pipeline._map
+        mappings = []
+
+        def failing_spans(data, max_field_size):
+            for i, span in enumerate(spans(data, max_field_size)):
+                if i == 1:
+                    raise MemoryError("boom")
+                yield span
+
+        def tracking_map(path):
+            mappings.append(open_map(path))
+            return mappings[-1]
+
+        with mock.patch.object(pipeline, 'iter_field_spans', failing_spans), \
+                mock.patch.object(pipeline, '_map', tracking_map):
+            with self.assertRaises(MemoryError):
+                pipeline._extract_text(path, pipeline.DEFAULT_MAX_FIELD_SIZE)
+        self.assertTrue(mappings[0].closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""转换服务测试
+
+运行（在仓库根目录）：python -m unittest
+"""
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+from src.mseq2latex.converter import MSEQToLatexConverter
+from src.mseq2latex.server import MicroBatcher, serve
+
+
+def _post(payload):
+    body = json.dumps(payload).encode('utf-8')
+    return b"POST /convert HTTP/1.1\r\nContent-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body
+
+
+class ServerTest(unittest.TestCase):
+    def _exchange(self, requests, max_queue=4):
+        """在当前进程中启动服务（workers=0），依次发送原始请求，返回 (状态码, JSON) 列表"""
+        async def run():
+            loop = asyncio.get_running_loop()
+            ready = loop.create_future()
+            task = asyncio.create_task(serve(MSEQToLatexConverter(), port=0, workers=0, max_queue=max_queue,
+                                             on_ready=ready.set_result))
+            host, port = await ready
+            responses = []
+            try:
+                for raw in requests:
+                    reader, writer = await asyncio.open_connection(host, port)
+                    writer.write(raw)
+                    await writer.drain()
+                    data = await reader.read()
+                    writer.close()
+                    head, _, body = data.partition(b'\r\n\r\n')
+                    responses.append((int(head.split()[1]), json.loads(body)))
+            finally:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+            return responses
+        return asyncio.run(run())
+
+    def test_negative_content_length(self):
+        [(status, _)] = self._exchange([b"POST /convert HTTP/1.1\r\nContent-Length: -1\r\n\r\n"])
+        self.assertEqual(status, 400)
+
+    def test_oversized_lines(self):
+        long_line = b"x" * (1 << 17)
+        (line_status, _), (header_status, _), (status, _) = self._exchange([
+            b"GET /" + long_line + b" HTTP/1.1\r\n\r\n",
+            b"GET /health HTTP/1.1\r\nX-Long: " + long_line + b"\r\n\r\n",
+            b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n",
+        ])
+        self.assertEqual((line_status, header_status, status), (400, 431, 200))
+
+    def test_request_larger_than_queue(self):
+        (status, _), (accepted, payload) = self._exchange([
+            _post({'fields': ["{ EQ \\f(1,2) }"] * 5}),
+            _post({'fields': ["{ EQ \\f(1,2) }"] * 4}),
+        ])
+        self.assertEqual(status, 413)
+        self.assertEqual(accepted, 200)
+        self.assertEqual(len(payload['results']), 4)
+
+    def test_response_shape(self):
+        (status, batch), (_, single) = self._exchange([
+            _post({'eq': 5, 'fields': ["{ EQ \\r(x) }"]}),
+            _post({'eq': "{ EQ \\r(x) }"}),
+        ])
+        self.assertEqual(status, 200)
+        self.assertEqual([result['latex'] for result in batch['results']], ["\\sqrt{x}"])
+        self.assertEqual(single['latex'], "\\sqrt{x}")
+
+
+class MicroBatcherTest(unittest.TestCase):
+    def test_cancelled_batch_fails_requests(self):
+        """执行器撤销批次（如关闭服务时）后，批次中与等待中的请求都以错误结束，不会一直挂起"""
+        async def run():
+            loop = asyncio.get_running_loop()
+            batcher = MicroBatcher(MSEQToLatexConverter(), workers=0, max_batch=1)
+            batcher._executor = mock.Mock()
+            batches = []
+
+            def submit(executor, function, *args):
+                batches.append(loop.create_future())
+                return batches[-1]
+
+            with mock.patch.object(loop, 'run_in_executor', submit):
+                first = asyncio.ensure_future(batcher.convert(["{ EQ a }"]))
+                second = asyncio.ensure_future(batcher.convert(["{ EQ b }"]))
+                await asyncio.sleep(0)
+                batches[0].cancel()
+                results = await asyncio.wait_for(asyncio.gather(first, second, return_exceptions=True), 5)
+            return results, batcher.depth
+
+        results, depth = asyncio.run(run())
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(depth, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
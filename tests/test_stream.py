@@ -0,0 +1,38 @@
+"""流式替换测试
+
+运行（在仓库根目录）：python -m unittest
+"""
+import io
+import unittest
+
+from src.mseq2latex.converter import MSEQToLatexConverter
+from src.mseq2latex.stream import FieldReplacer, replace_stream
+
+
+class EncodingTest(unittest.TestCase):
+    def setUp(self):
+        self.converter = MSEQToLatexConverter()
+
+    def _replace(self, data, encoding):
+        out = io.BytesIO()
+        replace_stream(io.BytesIO(data), out, self.converter, chunk_size=7, encoding=encoding)
+        return out.getvalue()
+
+    def test_ascii_transparent_encodings(self):
+        for encoding in ('utf-8', 'cp1252', 'euc_jp', 'gb2312'):
+            text = "café 数 { EQ \\f(1,2) } fin" if encoding != 'cp1252' else "café { EQ \\f(1,2) } fin"
+            with self.subTest(encoding=encoding):
+                data = text.encode(encoding)
+                expected = text.replace("{ EQ \\f(1,2) }", "$ \\frac{1}{2} $").encode(encoding)
+                self.assertEqual(self._replace(data, encoding), expected)
+
+    def test_other_encodings_are_rejected(self):
+        # 如 GBK 中 "亄" 的尾字节为 0x7B（"{"），Shift_JIS 中 "表" 的尾字节为 0x5C（"\"）
+        for encoding in ('gbk', 'big5', 'shift_jis', 'utf-16', 'iso2022_jp'):
+            with self.subTest(encoding=encoding):
+                with self.assertRaises(ValueError):
+                    FieldReplacer(self.converter, encoding=encoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""多线程共享转换器测试
+
+运行（在仓库根目录）：python -m unittest
+更长时间的压力测试见 python -m benchmarks.thread_stress。
+"""
+import io
+import random
+import sys
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+from src.mseq2latex.converter import MSEQToLatexConverter
+
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.differential import mutate
+
+_THREADS = 8
+
+
+def _fields(count=150, seed=0):
+    rng = random.Random(seed)
+    fields = []
+    for eq_text in CorpusGenerator(seed=seed).fields(count):
+        if rng.random() < 0.2:
+            eq_text = mutate(rng, eq_text)
+        fields.append(eq_text)
+    return fields
+
+
+class SharedConverterTest(unittest.TestCase):
+    """多个线程同时使用同一个转换器，结果与单线程的 convert2 逐一致"""
+
+    def setUp(self):
+        # 缩短线程切换间隔，让转换尽可能在分析中途被打断
+        self._interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+
+    def tearDown(self):
+        sys.setswitchinterval(self._interval)
+
+    def _check(self, **options):
+        fields = _fields()
+        reference = MSEQToLatexConverter(**options)
+        with redirect_stdout(io.StringIO()):
+            expected = [reference.convert2(eq_text) for eq_text in fields]
+
+        shared = MSEQToLatexConverter(**options)
+        barrier = threading.Barrier(_THREADS)
+        results = [None] * _THREADS
+
+        def work(number):
+            # 各线程以不同的顺序转换全部输入
+            order = list(range(len(fields)))
+            order = order[number:] + order[:number]
+            actual = [None] * len(fields)
+            barrier.wait()
+            for i in order:
+                actual[i] = shared.convert2(fields[i])
+            results[number] = actual
+
+        threads = [threading.Thread(target=work, args=(number,)) for number in range(_THREADS)]
+        # convert2 逐条打印错误信息
+        with redirect_stdout(io.StringIO()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        for actual in results:
+            self.assertEqual(actual, expected)
+
+    def test_ply(self):
+        for lexer_mode in ('ply', 'table'):
+            with self.subTest(lexer_mode=lexer_mode):
+                self._check(engine='ply', lexer_mode=lexer_mode)
+
+    def test_descent(self):
+        self._check(engine='descent')
+
+
+if __name__ == '__main__':
+    unittest.main()